@@ -0,0 +1,76 @@
+"""
+Microbenchmark: serializing a 21-day history record.
+
+Compares the old storage path (json.dump(indent=2) / json.load) with the
+orjson-based utils.json_store, and the stdlib JSONResponse with FastAPI's
+ORJSONResponse (the app's default response class), on a synthetic 21-day
+chat history with roadmap text.
+
+Usage (from backend/):
+    python benchmarks/history_serialization.py
+    python benchmarks/history_serialization.py --days 21 --turns 12 --repeat 200
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from fastapi.responses import JSONResponse, ORJSONResponse  # noqa: E402
+
+from utils import json_store  # noqa: E402
+
+
+def history_record(days, turns):
+    entries = []
+    for day in range(1, days + 1):
+        for turn in range(turns):
+            entries.append({
+                "timestamp": f"2025-03-{day:02d}T09:{turn:02d}:00",
+                "question": f"Day {day}: how did step {turn} of your plan go? Anything getting in the way?",
+                "answer": "I managed most of it, but work ran late and I skipped the evening walk. " * 3,
+                "bot_reply": "Great progress! Try moving the walk to lunchtime and keep the savings transfer automatic. " * 6,
+            })
+    roadmap = "\n\n".join(
+        f"## Day {day}: Focus\nGoal: build the habit\n" + "\n".join(f"- Action {i} for day {day}, with details" for i in range(6))
+        for day in range(1, days + 1)
+    )
+    return {"user_id": "client-21", "plan_type": "21day", "entries": entries, "final_roadmap": roadmap}
+
+
+def bench(label, fn, repeat):
+    seconds = min(timeit.repeat(fn, number=repeat, repeat=3)) / repeat
+    print(f"{label:<38} {seconds * 1e6:10.1f} µs")
+    return seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=21)
+    parser.add_argument("--turns", type=int, default=12)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    record = history_record(args.days, args.turns)
+    pretty = json.dumps(record, indent=2)
+    compact = json_store.dumps(record)
+    assert json_store.loads(pretty) == json_store.loads(compact) == record
+
+    print(f"{len(record['entries'])} entries; json indent=2: {len(pretty) / 1024:.0f} KiB, "
+          f"orjson compact: {len(compact) / 1024:.0f} KiB")
+    dump_old = bench("encode  json.dumps(indent=2)", lambda: json.dumps(record, indent=2), args.repeat)
+    dump_new = bench("encode  json_store.dumps", lambda: json_store.dumps(record), args.repeat)
+    load_old = bench("decode  json.loads", lambda: json.loads(pretty), args.repeat)
+    load_new = bench("decode  json_store.loads (legacy file)", lambda: json_store.loads(pretty), args.repeat)
+    bench("decode  json_store.loads (compact)", lambda: json_store.loads(compact), args.repeat)
+    resp_old = bench("response JSONResponse", lambda: JSONResponse(record), args.repeat)
+    resp_new = bench("response ORJSONResponse", lambda: ORJSONResponse(record), args.repeat)
+    print(f"speedup: encode {dump_old / dump_new:.1f}x, decode {load_old / load_new:.1f}x, "
+          f"response {resp_old / resp_new:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Peak-RSS benchmark: buffered vs streaming roadmap PDF downloads.
+
+Each mode runs in a fresh subprocess that renders N concurrent downloads of
+a ~P-page roadmap (distinct texts, so nothing is served from the PDF cache)
+and consumes them like a slow client reading 64 KiB at a time.
+
+- buffered:  generate_roadmap_pdf_with_letterhead() -> bytes -> Response body
+- streaming: services.pdf_cache.iter_roadmap_pdf() -> StreamingResponse chunks
+
+Usage (from backend/):
+    python benchmarks/pdf_memory.py
+    python benchmarks/pdf_memory.py --downloads 100 --pages 30 --client-delay 0.002
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LINES_PER_PAGE = 38
+CHUNK = 64 * 1024
+
+
+def roadmap_text(index, pages):
+    lines = []
+    for i in range(pages * LINES_PER_PAGE):
+        if i % 20 == 0:
+            lines.append(f"Day {i // 20 + 1}:")
+        else:
+            lines.append(f"- Client {index}: step {i} towards the savings and homeownership goals for this week")
+    return "\n".join(lines)
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_child(mode, downloads, pages, client_delay):
+    sys.path.insert(0, BACKEND_DIR)
+    from services.pdf_cache import iter_roadmap_pdf
+    from utils.pdf_letterhead import generate_roadmap_pdf_with_letterhead
+
+    # Warm up imports, fonts and the template cache before the baseline.
+    generate_roadmap_pdf_with_letterhead(roadmap_text(-1, 1))
+    baseline = peak_rss_mb()
+
+    barrier = threading.Barrier(downloads)
+
+    def consume(chunks):
+        total = 0
+        for chunk in chunks:
+            total += len(chunk)
+            if client_delay:
+                time.sleep(client_delay)
+        return total
+
+    def buffered(i):
+        barrier.wait()
+        body = generate_roadmap_pdf_with_letterhead(roadmap_text(i, pages))
+        return consume(body[o:o + CHUNK] for o in range(0, len(body), CHUNK))
+
+    def streaming(i):
+        barrier.wait()
+        return consume(iter_roadmap_pdf(roadmap_text(i, pages)))
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=downloads) as pool:
+        sizes = list(pool.map(buffered if mode == "buffered" else streaming, range(downloads)))
+    elapsed = time.perf_counter() - started
+
+    print(json.dumps({
+        "mode": mode,
+        "downloads": downloads,
+        "avg_pdf_kb": round(sum(sizes) / len(sizes) / 1024, 1),
+        "baseline_rss_mb": round(baseline, 1),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "delta_rss_mb": round(peak_rss_mb() - baseline, 1),
+        "seconds": round(elapsed, 2),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--downloads", type=int, default=100)
+    parser.add_argument("--pages", type=int, default=30)
+    parser.add_argument("--client-delay", type=float, default=0.002, help="seconds a client spends per 64 KiB chunk")
+    parser.add_argument("--child", choices=["buffered", "streaming"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.downloads, args.pages, args.client_delay)
+        return
+
+    results = []
+    with tempfile.TemporaryDirectory() as cache_dir:
+        env = {**os.environ, "PDF_CACHE_DIR": cache_dir}
+        for mode in ("buffered", "streaming"):
+            proc = subprocess.run(
+                [sys.executable, __file__, "--child", mode, "--downloads", str(args.downloads),
+                 "--pages", str(args.pages), "--client-delay", str(args.client_delay)],
+                cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+            )
+            results.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+    print(f"{args.downloads} concurrent downloads of ~{args.pages}-page roadmaps")
+    print(f"{'mode':<10} {'avg PDF':>9} {'peak RSS':>10} {'delta RSS':>10} {'time':>7}")
+    for r in results:
+        print(f"{r['mode']:<10} {r['avg_pdf_kb']:>7.0f}KB {r['peak_rss_mb']:>8.1f}MB "
+              f"{r['delta_rss_mb']:>8.1f}MB {r['seconds']:>6.2f}s")
+
+
+if __name__ == "__main__":
+    main()
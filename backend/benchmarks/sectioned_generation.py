@@ -0,0 +1,191 @@
+"""
+Benchmark: single-call vs sectioned generation of the 21-day and 3-day plans.
+
+Generates each plan for a sample profile in both modes (see
+services.sectioned_roadmap) and reports median wall time, Gemini calls and
+output tokens, and quality markers of the stitched roadmap:
+
+- days:       day numbers present / expected (each day exactly once)
+- goal%:      phases with a goal
+- acts/day:   actionable tasks per day
+- tips%:      phases with tips
+- reflect%:   phases with a reflection question (a "?" in tasks or tips)
+- milestone%: phases mentioning a milestone
+- dup%:       phase goals repeated elsewhere in the plan (repetition across sections)
+
+Runs against Gemini (GEMINI_API_KEY) by default. --simulate replaces the
+model with one whose latency is a fixed first-token delay plus output tokens
+at a fixed rate, which shows the wall-time effect without an API key (its
+quality markers only check the stitching).
+
+Usage (from backend/):
+    python benchmarks/sectioned_generation.py --plans 21day,3day --repeat 3
+    python benchmarks/sectioned_generation.py --simulate --tokens-per-second 120
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+os.environ.setdefault("CACHE_BACKEND", "memory")
+os.environ.setdefault("LLM_USAGE_DB", os.path.join(tempfile.mkdtemp(), "llm_usage.db"))
+
+from routers.lifeplanner21day import gemini_21day_roadmap  # noqa: E402
+from routers.lifeplanner3day import gemini_3day_roadmap  # noqa: E402
+from services import gemini, roadmaps  # noqa: E402
+from services.prompts import estimate_tokens  # noqa: E402
+
+PROFILE_21DAY = {
+    "name": "Maria",
+    "main_goal": "Build a consistent morning routine and finish my certification course",
+    "obstacles": "Late work shifts, low energy in the mornings, phone distractions",
+    "support": "My sister checks in weekly; a study group meets on Thursdays",
+    "relationship": "Spend more present, phone-free time with my partner",
+    "wellness": "Sleep by 11pm, walk 30 minutes a day, cook at home four nights a week",
+    "personal_life": "Journal and read fiction again",
+    "notes": "Budget is tight this month",
+}
+PROFILE_3DAY = {
+    "Name": "Maria",
+    "Main Goal": "Prepare for Friday's job interview",
+    "Obstacles": "Nervous about the technical questions; busy with work until Thursday",
+    "Support": "A friend who works in the same field offered a mock interview",
+    "Other Notes": "The interview is on video",
+}
+PLANS = {
+    "21day": (lambda mode: gemini_21day_roadmap(PROFILE_21DAY, {}, "en", mode), 21),
+    "3day": (lambda mode: gemini_3day_roadmap(dict(PROFILE_3DAY), None, "en", mode), 3),
+}
+MODES = ("single", "sectioned")
+
+_counts = {"calls": 0, "output_tokens": 0}
+_counts_lock = threading.Lock()
+
+
+class _Usage:
+    def __init__(self, prompt_tokens, output_tokens):
+        self.prompt_token_count = prompt_tokens
+        self.candidates_token_count = output_tokens
+
+
+class _Response:
+    def __init__(self, text, prompt):
+        self.text = text
+        self.usage_metadata = _Usage(estimate_tokens(prompt), estimate_tokens(text))
+
+
+class SimulatedModel:
+    """Answers roadmap prompts with plausible JSON, taking as long as a model streaming it would."""
+
+    def __init__(self, first_token_seconds, tokens_per_second):
+        self.first_token_seconds = first_token_seconds
+        self.tokens_per_second = tokens_per_second
+
+    def generate_content(self, prompt, **kwargs):
+        if "give only its outline" in prompt:
+            sections = re.findall(r"^- (.+?) \(", prompt, re.MULTILINE)
+            document = {
+                "title": "Your plan", "summary": "A short overview of the plan. " * 3, "closing": "Keep going.",
+                "phases": [{"title": label, "goal": "Focus of this section.", "actions": ["Theme A", "Theme B"]}
+                           for label in sections],
+            }
+        else:
+            match = re.search(r"Day (\d+) to Day (\d+)", prompt) or re.search(r"Day (\d+)", prompt)
+            first, last = int(match.group(1)), int(match.group(match.lastindex))
+            if "Day 1, Day 2, and Day 3" in prompt:
+                first, last = 1, 3
+            document = {"phases": [{
+                "title": f"Day {day}: Step {day}", "day": day, "goal": f"Goal for day {day}.",
+                "actions": [f"Task {i} for day {day}, working towards the milestone." for i in range(4)]
+                + [f"Reflection: what went well on day {day}?"],
+                "tips": [f"Tip for day {day}: plan around the obstacles."] * 2,
+            } for day in range(first, last + 1)]}
+            if "Leave the title, summary and closing empty" not in prompt:
+                document.update(title="Your plan", summary="A short overview of the plan. " * 3, closing="Keep going.")
+        text = json.dumps(document)
+        time.sleep(self.first_token_seconds + estimate_tokens(text) / self.tokens_per_second)
+        return _Response(text, prompt)
+
+
+def _count_calls(get_model):
+    def counted(model_name):
+        model = get_model(model_name)
+
+        class Counted:
+            def generate_content(self, prompt, **kwargs):
+                response = model.generate_content(prompt, **kwargs)
+                metadata = getattr(response, "usage_metadata", None)
+                with _counts_lock:
+                    _counts["calls"] += 1
+                    _counts["output_tokens"] += getattr(metadata, "candidates_token_count", 0) or 0
+                return response
+        return Counted()
+    return counted
+
+
+def quality(roadmap, expected_days):
+    phases = roadmap.phases or []
+    n = len(phases) or 1
+    days = [phase.day for phase in phases]
+    goals = [phase.goal.strip().lower() for phase in phases if phase.goal.strip()]
+    return {
+        "days": f"{len(set(days) & set(range(1, expected_days + 1)))}/{expected_days}"
+                + ("" if len(days) == len(set(days)) else " (dups)"),
+        "goal%": round(100 * sum(bool(phase.goal) for phase in phases) / n),
+        "acts/day": round(sum(len(phase.actions) for phase in phases) / n, 1),
+        "tips%": round(100 * sum(bool(phase.tips) for phase in phases) / n),
+        "reflect%": round(100 * sum(any("?" in item for item in phase.actions + phase.tips) for phase in phases) / n),
+        "milestone%": round(100 * sum(
+            "milestone" in " ".join([phase.goal, *phase.actions, *phase.tips]).lower() for phase in phases
+        ) / n),
+        "dup%": round(100 * (len(goals) - len(set(goals))) / n),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--plans", default="21day,3day")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--simulate", action="store_true", help="simulated model instead of Gemini")
+    parser.add_argument("--first-token-seconds", type=float, default=0.6)
+    parser.add_argument("--tokens-per-second", type=float, default=150)
+    args = parser.parse_args()
+
+    get_model = gemini.get_model
+    if args.simulate:
+        simulated = SimulatedModel(args.first_token_seconds, args.tokens_per_second)
+        get_model = lambda model_name: simulated  # noqa: E731
+    gemini.get_model = _count_calls(get_model)
+
+    headers = ["plan", "mode", "wall s", "calls", "out tok", "days", "goal%", "acts/day", "tips%", "reflect%",
+               "milestone%", "dup%"]
+    rows = []
+    for plan in [name.strip() for name in args.plans.split(",") if name.strip()]:
+        generate, expected_days = PLANS[plan]
+        for mode in MODES:
+            times = []
+            for _ in range(args.repeat):
+                with _counts_lock:
+                    _counts.update(calls=0, output_tokens=0)
+                started = time.perf_counter()
+                text = generate(mode)
+                times.append(time.perf_counter() - started)
+            markers = quality(roadmaps.structured_roadmap(text), expected_days)
+            rows.append({"plan": plan, "mode": mode, "wall s": f"{statistics.median(times):.2f}",
+                         "calls": _counts["calls"], "out tok": _counts["output_tokens"], **markers})
+
+    widths = [max(len(header), *(len(str(row[header])) for row in rows)) for header in headers]
+    print("  ".join(header.ljust(width) for header, width in zip(headers, widths)).rstrip())
+    for row in rows:
+        print("  ".join(str(row[header]).ljust(width) for header, width in zip(headers, widths)).rstrip())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Microbenchmark: extracting search results from a saved results page.
+
+Compares the old BeautifulSoup(html.parser) tree walk in scrape_web with
+services.serp_parser's streaming extractor (and BeautifulSoup with lxml when
+it is installed) on the HTML fixtures in benchmarks/fixtures/. Reports
+median parse time and tracemalloc peak memory per page, and checks that
+every variant extracts the same results as the old code.
+
+Usage (from backend/):
+    python benchmarks/serp_parsing.py
+    python benchmarks/serp_parsing.py --repeat 50 --max-results 10
+"""
+import argparse
+import glob
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+from services.serp_parser import SNIPPET_CLASS, TITLE_CLASS, extract_results  # noqa: E402
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def soup_results(html, max_results, features="html.parser"):
+    """The extraction scrape_web used to do, over a full parse tree."""
+    soup = BeautifulSoup(html, features)
+    results = []
+    for g in soup.find_all("div", class_=TITLE_CLASS):
+        title = g.get_text()
+        parent = g.find_parent("a")
+        link = parent["href"] if parent else None
+        sibling = g.find_next_sibling("div", class_=SNIPPET_CLASS)
+        snippet = sibling.get_text() if sibling else None
+        if title and snippet:
+            results.append({"title": title, "snippet": snippet, "link": link})
+            if len(results) >= max_results:
+                break
+    return results
+
+
+def variants():
+    found = {
+        "bs4 html.parser (old)": lambda html, n: soup_results(html, n),
+        "streaming extractor": extract_results,
+    }
+    try:
+        import lxml  # noqa: F401
+        found["bs4 lxml"] = lambda html, n: soup_results(html, n, "lxml")
+    except ImportError:
+        pass
+    return found
+
+
+def measure(fn, html, max_results, repeat):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(html, max_results)
+        times.append(time.perf_counter() - started)
+    tracemalloc.start()
+    fn(html, max_results)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(times), peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--max-results", type=int, default=10)
+    args = parser.parse_args()
+
+    fixtures = sorted(glob.glob(os.path.join(FIXTURES_DIR, "serp_*.html")))
+    print(f"{'fixture':<18} {'variant':<24} {'results':>7} {'ms/page':>9} {'peak KiB':>9} {'speedup':>8}")
+    for path in fixtures:
+        with open(path, encoding="utf-8") as f:
+            html = f.read()
+        name = os.path.basename(path)
+        expected = soup_results(html, args.max_results)
+        baseline = None
+        for label, fn in variants().items():
+            results = fn(html, args.max_results)
+            if results != expected:
+                raise SystemExit(f"{label} extracted different results from {name}")
+            seconds, peak = measure(fn, html, args.max_results, args.repeat)
+            baseline = baseline or seconds
+            print(f"{name:<18} {label:<24} {len(results):>7} {seconds * 1000:>9.2f} {peak / 1024:>9.0f} {baseline / seconds:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
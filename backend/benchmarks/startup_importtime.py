@@ -0,0 +1,90 @@
+"""
+Startup benchmark for the interactive CLI.
+
+Runs `python -X importtime -c "import main"` from the backend directory and
+checks the cumulative import time of `main` against a checked-in budget. It
+also fails if any heavy dependency is imported before the first prompt.
+
+Usage (from backend/):
+    python benchmarks/startup_importtime.py
+    python benchmarks/startup_importtime.py --budget-ms 50 --runs 7
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Budget for the cumulative import time of `main` (median of several runs).
+STARTUP_BUDGET_MS = 50
+
+# Modules the CLI must not import before the language prompt is shown.
+FORBIDDEN_MODULES = [
+    "fastapi",
+    "google.generativeai",
+    "bs4",
+    "fpdf",
+    "reportlab",
+    "pypdf",
+    "routers.life_planner",
+    "routers.lifeplanner21day",
+    "routers.lifeplanner3day",
+]
+
+
+def run_importtime():
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    imported = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = line.split("|")
+        try:
+            cumulative_us = int(parts[1].strip())
+        except ValueError:
+            continue  # header line
+        imported[parts[2].strip()] = cumulative_us
+    return imported
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("STARTUP_BUDGET_MS", STARTUP_BUDGET_MS)))
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    samples = []
+    imported = {}
+    for _ in range(args.runs):
+        imported = run_importtime()
+        samples.append(imported.get("main", 0) / 1000)
+
+    median_ms = statistics.median(samples)
+    slowest = sorted(imported.items(), key=lambda kv: kv[1], reverse=True)[:10]
+    print(f"import main: median {median_ms:.1f} ms over {args.runs} runs (budget {args.budget_ms:.0f} ms)")
+    print("slowest cumulative imports:")
+    for name, us in slowest:
+        print(f"  {us / 1000:8.1f} ms  {name}")
+
+    failures = []
+    leaked = [m for m in FORBIDDEN_MODULES if m in imported]
+    if leaked:
+        failures.append(f"heavy modules imported at startup: {', '.join(leaked)}")
+    if median_ms > args.budget_ms:
+        failures.append(f"startup {median_ms:.1f} ms exceeds budget {args.budget_ms:.0f} ms")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,51 @@
+"""
+Throughput benchmark: tax analysis report batches, in-process vs process pool.
+
+Renders N synthetic questionnaires with services.tax_reports.render_tax_reports
+into a temporary directory (or ZIP) and reports reports per second for each
+worker count.
+
+Usage (from backend/):
+    python benchmarks/tax_report_batch.py
+    python benchmarks/tax_report_batch.py --reports 500 --workers 1 4 8 --zip
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from services.tax_reports import render_tax_reports  # noqa: E402
+from tax_analysis import TAX_ANALYSIS_FIELDS  # noqa: E402
+
+
+def synthetic_records(count):
+    for i in range(count):
+        answers = {field: f"Answer {i} for {field.replace('_', ' ')}" for field in TAX_ANALYSIS_FIELDS}
+        answers["full_name"] = f"Client {i}"
+        answers["debts"] = f"Student loans and a car note totalling ${1000 + i * 37:,}. " * 4
+        yield {"id": i + 1, "answers": answers}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reports", type=int, default=200)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, os.cpu_count() or 2])
+    parser.add_argument("--zip", action="store_true", help="write a ZIP archive instead of a directory")
+    args = parser.parse_args()
+
+    print(f"{args.reports} reports, {os.cpu_count()} CPUs")
+    for workers in args.workers:
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, "reports.zip" if args.zip else "reports")
+            started = time.perf_counter()
+            counts = render_tax_reports(synthetic_records(args.reports), output, workers=workers)
+            elapsed = time.perf_counter() - started
+        print(f"workers={workers:<3} {counts}  {elapsed:6.2f}s  {counts['rendered'] / elapsed:7.1f} reports/s")
+
+
+if __name__ == "__main__":
+    main()
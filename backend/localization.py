@@ -1,3 +1,5 @@
+from typing import Literal
+
 translations = {
     "en": {
         "welcome": "Welcome to TaxNerdGPT with Life-Planner!",
@@ -113,4 +115,8 @@ translations = {
         "planner_21day_title": "Planificador de Vida de 21 Días:",
         "planner_3day_title": "Planificador de Vida de 3 Días:"
     }
-}
\ No newline at end of file
+}
+
+# Languages the planners can write roadmaps in (the keys of `translations`).
+LANGUAGE_NAMES = {"en": "English", "es": "Spanish"}
+Language = Literal["en", "es"]
@@ -1,52 +1,112 @@
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
 import os
 from dotenv import load_dotenv
 
 # Load environment variables FIRST, before importing other modules
 load_dotenv()
 
-from routers.life_planner import router as full_planner_router
-from routers.lifeplanner21day import router as planner21day_router  # Make sure this import works
-from routers.lifeplanner3day import router as planner3day_router
-from routers import pdf
-from routers import history_router 
-from routers.reminders_router import router as reminders_router
-
-from routers.email_roadmap_router import email_roadmap
 from localization import translations
-from tax_analysis import get_tax_analysis, display_tax_analysis
-from routers.life_planner import get_user_input, get_category_insights, gemini_generate_roadmap
-from routers.lifeplanner21day import get_user_input as get_21day_input, gemini_21day_roadmap
-from routers.lifeplanner3day import get_user_input as get_3day_input, gemini_3day_roadmap
-from fpdf import FPDF
+
+# FastAPI, the routers and the Gemini SDK are imported lazily: the CLI only
+# needs them once a menu option is chosen, and `uvicorn main:app` builds the
+# app on first attribute access (see __getattr__ below).
+_app = None
 
 # -------------------- FastAPI Setup -------------------- #
-app = FastAPI(
-    title="Perpetual Life Planner API",
-    version="1.0.0",
-    description="Supports Full, 21-Day, and 3-Day roadmap planners"
-)
-
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["http://localhost:3000", "https://ai.taxnerd.us", "https://app.taxnerd.us", "http://127.0.0.1:3000"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Mount API routers
-app.include_router(full_planner_router, prefix="/planner")
-app.include_router(planner21day_router, prefix="/planner")  # This should add /planner/21day
-app.include_router(planner3day_router, prefix="/planner")
-app.include_router(history_router.router, prefix="/history")
-app.include_router(reminders_router)
-app.include_router(pdf.router)
-
-@app.get("/")
-def root():
-    return {"message": "Perpetual Life Planner API is running!"}
+def create_app():
+    import asyncio
+    import math
+    from contextlib import asynccontextmanager
+
+    from fastapi import FastAPI
+    from fastapi.middleware.cors import CORSMiddleware
+    from fastapi.responses import ORJSONResponse
+
+    from routers.life_planner import router as full_planner_router, resume_planner_jobs
+    from routers.lifeplanner21day import router as planner21day_router  # Make sure this import works
+    from routers.lifeplanner3day import router as planner3day_router
+    from routers import pdf
+    from routers import history_router
+    from routers.reminders_router import router as reminders_router
+    from routers.email_roadmap_router import router as email_roadmap_router
+    from routers import tax_intake_router
+    from routers import admin_router
+    from routers import translation_router
+    from services.circuit_breaker import breaker_states
+    from services.llm_usage import UsageContextMiddleware
+    from services.rate_limit import QuotaExceeded
+    from services.warmup import readiness, stop_warm_up, warm_up
+
+    @asynccontextmanager
+    async def lifespan(app):
+        # Warm up in the background so "/" answers liveness checks right away;
+        # "/ready" only reports 200 once warm-up is over ("status" says
+        # whether every step succeeded or the worker is degraded).
+        warmup_task = asyncio.create_task(asyncio.to_thread(warm_up))
+        resume_planner_jobs()
+        yield
+        stop_warm_up()
+        if not warmup_task.done():
+            warmup_task.cancel()
+
+    app = FastAPI(
+        title="Perpetual Life Planner API",
+        version="1.0.0",
+        description="Supports Full, 21-Day, and 3-Day roadmap planners",
+        lifespan=lifespan,
+        default_response_class=ORJSONResponse,
+    )
+
+    # Tags Gemini calls with the endpoint and request they ran for.
+    app.add_middleware(UsageContextMiddleware)
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["http://localhost:3000", "https://ai.taxnerd.us", "https://app.taxnerd.us", "http://127.0.0.1:3000"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    # Mount API routers
+    app.include_router(full_planner_router, prefix="/planner")
+    app.include_router(planner21day_router, prefix="/planner")  # This should add /planner/21day
+    app.include_router(planner3day_router, prefix="/planner")
+    app.include_router(translation_router.router, prefix="/planner")
+    app.include_router(history_router.router, prefix="/history")
+    app.include_router(reminders_router)
+    app.include_router(pdf.router)
+    app.include_router(email_roadmap_router)
+    app.include_router(tax_intake_router.router)
+    app.include_router(admin_router.router)
+
+    @app.exception_handler(QuotaExceeded)
+    async def quota_exceeded(request, exc):
+        return ORJSONResponse(
+            status_code=429,
+            content={"detail": str(exc), "tier": exc.tier, "unit": exc.unit},
+            headers={"Retry-After": str(math.ceil(exc.retry_after))},
+        )
+
+    @app.get("/")
+    def root():
+        return {"message": "Perpetual Life Planner API is running!"}
+
+    @app.get("/ready")
+    def ready():
+        # Open breakers mean degraded responses, not an unready worker.
+        state = {**readiness(), "breakers": breaker_states()}
+        return ORJSONResponse(status_code=200 if state["ready"] else 503, content=state)
+
+    return app
+
+def __getattr__(name):
+    # PEP 562 hook so `uvicorn main:app` keeps working without paying for
+    # FastAPI and every router on the CLI path.
+    global _app
+    if name == "app":
+        if _app is None:
+            _app = create_app()
+        return _app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # -------------------- CLI Helper Logic (Optional) -------------------- #
 def clean_text(text):
@@ -56,6 +116,7 @@ def clean_text(text):
     return text
 
 def save_roadmap_to_pdf(roadmap_text, filename="roadmap.pdf"):
+    from fpdf import FPDF
     pdf = FPDF()
     pdf.add_page()
     pdf.set_font("Arial", size=12)
@@ -68,6 +129,7 @@ def save_roadmap_to_pdf(roadmap_text, filename="roadmap.pdf"):
 def main():
     GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
     GOOGLE_CSE_ID = os.getenv("GOOGLE_CSE_ID")
+    PLANNER_CLI_TIMEOUT = float(os.getenv("PLANNER_CLI_TIMEOUT", "0"))  # seconds, 0 = no limit
 
     print("Select your language / Seleccione su idioma:")
     print("1. English")
@@ -97,40 +159,56 @@ def main():
     while True:
         choice = input("\n> ").strip()
         if choice == "1":
+            from tax_analysis import get_tax_analysis, display_tax_analysis
+            from services.tax_reports import send_email_with_pdf
             print(t["tax_analysis_start"])
-            customer_data = get_tax_analysis({})
+            customer_data = get_tax_analysis()
             display_tax_analysis(customer_data)
             recipient_email = input("\n" + t["tax_analysis_email"]).strip()
             if recipient_email:
-                send_email_with_pdf(customer_data, recipient_email)
-                print(t["tax_analysis_sent"])
+                try:
+                    send_email_with_pdf(customer_data, recipient_email)
+                    print(t["tax_analysis_sent"])
+                except Exception as e:
+                    print(f"Failed to email the tax analysis: {e}")
 
         elif choice == "2" and "full" in user_access:
+            from routers.life_planner import get_user_input, plan_with_insights
+            from services import deadline, llm_usage
             print(t["roadmap_title"])
             user_data = get_user_input(t, language)
-            category_insights = get_category_insights(user_data, GOOGLE_API_KEY, GOOGLE_CSE_ID)
+            user_data["language"] = language
+            # Optional time budget for the search/summary/roadmap pipeline.
+            budget = deadline.Deadline(PLANNER_CLI_TIMEOUT) if PLANNER_CLI_TIMEOUT else None
+            with deadline.scope(budget), llm_usage.request_scope("cli:full", language):
+                category_insights, roadmap_text = plan_with_insights(user_data, GOOGLE_API_KEY, GOOGLE_CSE_ID)
             for cat, replies in category_insights.items():
                 print(f"\n{t['insights_title'].format(category=cat)}\n{replies['insight']}")
                 print(f"{t['summary_title'].format(category=cat)}\n{replies['foresight']}")
-            roadmap_text = gemini_generate_roadmap(user_data, category_insights)
             print("\n" + t["roadmap_title"])
             print(roadmap_text)
             if input(t["save_pdf_prompt"]).strip().lower() in [t["yes"], "si", "sí"]:
                 save_roadmap_to_pdf(roadmap_text, "full_life_planner_roadmap.pdf")
 
         elif choice == "2" and "21day" in user_access:
+            from routers.lifeplanner21day import get_user_input as get_21day_input, gemini_21day_roadmap
+            from services import llm_usage
             print(t["planner_21day_title"])
             user_data = get_21day_input(t, language)
-            roadmap = gemini_21day_roadmap(user_data, t, language)
+            with llm_usage.request_scope("cli:21day", language):
+                roadmap = gemini_21day_roadmap(user_data, t, language)
             print("\n" + t["planner_21day_title"] + "\n")
             print(roadmap)
             if input(t["save_pdf_prompt"]).strip().lower() in [t["yes"], "si", "sí"]:
                 save_roadmap_to_pdf(roadmap, "21day_roadmap.pdf")
 
         elif choice == "2" and "3day" in user_access:
+            from routers.lifeplanner3day import get_user_input as get_3day_input, gemini_3day_roadmap
+            from services import llm_usage
             print(t["planner_3day_title"])
             user_data = get_3day_input(t, language)
-            roadmap = gemini_3day_roadmap(user_data, t, language)
+            with llm_usage.request_scope("cli:3day", language):
+                roadmap = gemini_3day_roadmap(user_data, t, language)
             print("\n" + t["planner_3day_title"] + "\n")
             print(roadmap)
             if input(t["save_pdf_prompt"]).strip().lower() in [t["yes"], "si", "sí"]:
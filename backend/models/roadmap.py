@@ -0,0 +1,207 @@
+import re
+from pydantic import BaseModel
+from typing import List, Optional
+
+# Plain-text roadmap parsing (Roadmap.from_text)
+HR_RE = re.compile(r"^(-{3,}|\*{3,}|_{3,})$")
+BULLET_RE = re.compile(r"^(?:[-*•]|\d+[.)])\s+(.*)$")
+HEADING_RE = re.compile(r"^(#{1,6})\s*(.+)$")
+PHASE_RE = re.compile(r"^(day|d[ií]a|week|semana|phase|fase|year|a[nñ]o|ages?)\s+\d", re.IGNORECASE)
+DAY_RE = re.compile(r"^(?:day|d[ií]a)\s+(\d+)", re.IGNORECASE)
+TIPS_RE = re.compile(r"\b(tips?|consejos?)\b", re.IGNORECASE)
+SUBSECTION_RE = re.compile(
+    r"^(goal|action steps?|actions?|milestones?|using support|reflection|objetivo|acciones|pasos)\b", re.IGNORECASE
+)
+
+
+class RoadmapPhase(BaseModel):
+    title: str                 # e.g. "Day 1: Foundations" or "Ages 30-35: Build savings"
+    day: Optional[int] = None  # day number, for day-by-day plans
+    goal: str = ""
+    actions: List[str] = []
+    tips: List[str] = []
+
+
+class Roadmap(BaseModel):
+    """
+    Structured roadmap, parsed once (from Gemini's JSON response, or from
+    plain text for older roadmaps) and shared by every consumer: the text
+    returned by the API, the PDF layout and reminder extraction.
+    """
+    title: str = ""
+    summary: str = ""
+    phases: List[RoadmapPhase] = []
+    closing: str = ""
+
+    def compact(self):
+        """Dict without empty fields, for caching and storage."""
+        return self.model_dump(exclude_defaults=True)
+
+    def to_markdown(self):
+        parts = []
+        if self.title:
+            parts.append(f"# {self.title}")
+        if self.summary:
+            parts.append(self.summary)
+        for phase in self.phases:
+            lines = [f"## {phase.title}"]
+            if phase.goal:
+                lines.append(f"Goal: {phase.goal}")
+            lines.extend(f"- {action}" for action in phase.actions)
+            if phase.tips:
+                lines.append("Tips:")
+                lines.extend(f"- {tip}" for tip in phase.tips)
+            parts.append("\n".join(lines))
+        if self.closing:
+            parts.append(self.closing)
+        return "\n\n".join(parts)
+
+    @classmethod
+    def from_text(cls, text):
+        """
+        Best-effort parse of a plain-text roadmap (markdown headings, "Day 1"
+        or "Week 2" lines, "Heading:" lines and bullets). Only used for
+        roadmaps that were not generated as JSON.
+        """
+        roadmap = cls()
+        phase = None
+        in_tips = False
+        prose = []
+
+        def flush_prose():
+            if not prose:
+                return
+            paragraph = " ".join(prose)
+            prose.clear()
+            if phase is None:
+                roadmap.summary = f"{roadmap.summary}\n\n{paragraph}".strip()
+            elif not phase.actions and not phase.tips:
+                phase.goal = f"{phase.goal} {paragraph}".strip()
+            else:
+                (phase.tips if in_tips else phase.actions).append(paragraph)
+
+        for raw in (text or "").replace("\r\n", "\n").split("\n"):
+            line = raw.strip().replace("**", "").replace("__", "")
+            if not line or HR_RE.match(line):
+                flush_prose()
+                continue
+            bullet = BULLET_RE.match(line)
+            if bullet:
+                flush_prose()
+                item = bullet.group(1).strip()
+                if phase is None:
+                    phase = RoadmapPhase(title=roadmap.title or "Overview")
+                    roadmap.phases.append(phase)
+                (phase.tips if in_tips else phase.actions).append(item)
+                continue
+            heading = HEADING_RE.match(line)
+            if heading or PHASE_RE.match(line) or (line.endswith(":") and len(line) <= 80):
+                flush_prose()
+                title = (heading.group(2) if heading else line).strip().rstrip(":").strip()
+                if heading and len(heading.group(1)) == 1 and not roadmap.title and not roadmap.phases:
+                    roadmap.title = title
+                    continue
+                if TIPS_RE.search(title) and phase is not None:
+                    in_tips = True
+                    continue
+                if phase is not None and SUBSECTION_RE.match(title) and not PHASE_RE.match(title):
+                    # Sub-headings such as "Action Steps" stay within the phase.
+                    in_tips = False
+                    continue
+                day = DAY_RE.match(title)
+                phase = RoadmapPhase(title=title, day=int(day.group(1)) if day else None)
+                roadmap.phases.append(phase)
+                in_tips = False
+                continue
+            if phase is not None and line.lower().startswith(("goal:", "objetivo:")):
+                flush_prose()
+                phase.goal = line.split(":", 1)[1].strip()
+                continue
+            prose.append(line)
+        flush_prose()
+        return roadmap
+
+
+class RoadmapRevision(BaseModel):
+    phase: int                 # index into the drafted phases
+    goal: str = ""
+    tips: List[str] = []
+
+
+class RoadmapOverview(BaseModel):
+    """
+    The reduce step of a map-reduce roadmap: the overview written across
+    independently drafted phases, their order, and revisions that reconcile
+    conflicting phases. Phases are referred to by index, so the answer stays
+    short.
+    """
+    title: str = ""
+    summary: str = ""
+    closing: str = ""
+    order: List[int] = []
+    revisions: List[RoadmapRevision] = []
+
+    def apply(self, phases):
+        """Roadmap of phases in this order (any left out keep their place at the end), revised."""
+        phases = [phase.model_copy(deep=True) for phase in phases]
+        for revision in self.revisions:
+            if 0 <= revision.phase < len(phases):
+                if revision.goal:
+                    phases[revision.phase].goal = revision.goal
+                if revision.tips:
+                    phases[revision.phase].tips = revision.tips
+        order = list(dict.fromkeys(i for i in self.order if 0 <= i < len(phases)))
+        order += [i for i in range(len(phases)) if i not in order]
+        return Roadmap(
+            title=self.title, summary=self.summary, phases=[phases[i] for i in order], closing=self.closing
+        )
+
+
+# JSON schema (Gemini's OpenAPI subset) for response_schema; mirrors Roadmap.
+ROADMAP_RESPONSE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "title": {"type": "string"},
+        "summary": {"type": "string"},
+        "phases": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "title": {"type": "string"},
+                    "day": {"type": "integer", "nullable": True},
+                    "goal": {"type": "string"},
+                    "actions": {"type": "array", "items": {"type": "string"}},
+                    "tips": {"type": "array", "items": {"type": "string"}},
+                },
+                "required": ["title", "actions"],
+            },
+        },
+        "closing": {"type": "string"},
+    },
+    "required": ["title", "phases"],
+}
+
+# Mirrors RoadmapOverview.
+ROADMAP_OVERVIEW_RESPONSE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "title": {"type": "string"},
+        "summary": {"type": "string"},
+        "closing": {"type": "string"},
+        "order": {"type": "array", "items": {"type": "integer"}},
+        "revisions": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "phase": {"type": "integer"},
+                    "goal": {"type": "string"},
+                    "tips": {"type": "array", "items": {"type": "string"}},
+                },
+                "required": ["phase"],
+            },
+        },
+    },
+    "required": ["title", "summary", "order"],
+}
@@ -0,0 +1,49 @@
+import hmac
+import os
+import time
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException, Query
+
+from services import llm_usage, model_routing
+
+router = APIRouter(
+    prefix="/admin",
+    tags=["Admin"]
+)
+
+# Admin endpoints are disabled unless ADMIN_TOKEN is set.
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+
+def _require_admin(token):
+    if not ADMIN_TOKEN or not token or not hmac.compare_digest(token, ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+
+@router.get("/llm-usage")
+def get_llm_usage(
+    since_hours: float = Query(24, ge=0, description="0 for everything kept"),
+    group_by: str = Query("endpoint,call_site,model", description="comma-separated: endpoint, call_site, model, tier, language"),
+    endpoint: Optional[str] = None,
+    admin_token: Optional[str] = Header(None, alias="X-Admin-Token"),
+):
+    """Gemini calls, tokens and latency (p50/p95) per group, busiest first."""
+    _require_admin(admin_token)
+    columns = [column.strip() for column in group_by.split(",") if column.strip()]
+    unknown = [column for column in columns if column not in llm_usage.GROUP_COLUMNS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown group_by columns: {', '.join(unknown)}")
+    since = time.time() - since_hours * 3600 if since_hours else None
+    return {
+        "since_hours": since_hours,
+        "group_by": columns,
+        "groups": llm_usage.rollup(since, columns, endpoint),
+    }
+
+
+@router.get("/model-routing")
+def get_model_routing(admin_token: Optional[str] = Header(None, alias="X-Admin-Token")):
+    """Model tier per call site, each tier's recent p95 and demotion, and routing decision counts."""
+    _require_admin(admin_token)
+    return model_routing.snapshot()
@@ -1,31 +1,37 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-import os
-import json
+from typing import Any, Dict, Optional
 from datetime import datetime
 
-router = APIRouter()
+from services.document_store import HISTORY, get_document_store
+from services.roadmaps import structured_roadmap
 
-HISTORY_DIR = "history_logs"
-os.makedirs(HISTORY_DIR, exist_ok=True)
+router = APIRouter()
 
 class HistoryEntry(BaseModel):
     user_id: str
     plan_type: str
     entries: list  # Each entry should be a dict with timestamp, question, answer, bot_reply
     final_roadmap: str
+    # Structured form of final_roadmap (models.roadmap.Roadmap); filled in on save
+    roadmap_structured: Optional[Dict[str, Any]] = None
 
 @router.post("/history/save")
 def save_history(data: HistoryEntry):
-    file_path = os.path.join(HISTORY_DIR, f"{data.user_id}.json")
-    with open(file_path, "w") as f:
-        json.dump(data.dict(), f, indent=2)
+    if data.roadmap_structured is None and data.final_roadmap:
+        data.roadmap_structured = structured_roadmap(data.final_roadmap).compact()
+    try:
+        get_document_store().put(HISTORY, data.user_id, data.dict())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     return {"message": "History saved successfully"}
 
 @router.get("/history/{user_id}")
 def get_history(user_id: str):
-    file_path = os.path.join(HISTORY_DIR, f"{user_id}.json")
-    if not os.path.exists(file_path):
+    try:
+        history = get_document_store().get(HISTORY, user_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if history is None:
         raise HTTPException(status_code=404, detail="History not found")
-    with open(file_path, "r") as f:
-        return json.load(f)
+    return history
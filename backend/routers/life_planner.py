@@ -1,12 +1,28 @@
-from bs4 import BeautifulSoup
 import requests
 from dotenv import load_dotenv
+import contextvars
+import functools
+import hashlib
+import json
+import math
 import os
-import google.generativeai as genai
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from typing import Dict, Any
+import time
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import APIRouter, Header, HTTPException, Request
+from pydantic import BaseModel, ValidationError
+from typing import Dict, Any, List, Optional
 
+from services import (
+    deadline, job_store, llm_usage, location_index, model_routing, prompts, rate_limit, roadmaps,
+    sectioned_roadmap, serp_parser, snippet_ranking,
+)
+from services.cache_backend import get_cache_backend
+from services.circuit_breaker import CircuitOpenError, get_breaker
+from services.deadline import DEADLINE_HEADER, DeadlineExceeded, RequestCancelled
+from services.gemini import generate_routed
+from services.http import get_session
+from localization import LANGUAGE_NAMES, Language
+from models.roadmap import ROADMAP_OVERVIEW_RESPONSE_SCHEMA, RoadmapOverview
 
 router = APIRouter()
 
@@ -21,14 +37,39 @@ class PlannerRequest(BaseModel):
     goals: str
     challenges: str
     support: str
+    # Per-category answers keyed like the CLI, e.g. "Investment Insight"
+    answers: Dict[str, str] = {}
+    # Drop memoized category replies for these answers before generating
+    refresh: bool = False
+    # Chat session that prefetched category insights (see /prefetch)
+    session_id: Optional[str] = None
+    # Language the roadmap is written in; category insights are shared across languages
+    language: Language = "en"
+    # "single" or "sectioned" (map-reduce over CATEGORY_GROUPS); default PLANNER_FULL_MODE
+    generation_mode: Optional[sectioned_roadmap.GenerationMode] = None
+
+class InvalidateInsightsRequest(BaseModel):
+    categories: Optional[List[str]] = None
+
+class PrefetchRequest(BaseModel):
+    session_id: str
+    category: str  # one of CATEGORIES
+    insight: str = ""  # answer to the category's Insight question
+    foresight: str = ""  # answer to the category's Foresight question
+    age: int
+    career: str
+    desired_location: str
+
+def planner_user_data(request):
+    """Flatten a PlannerRequest into the user_data dict the planner functions use."""
+    user_data = request.dict(exclude={"answers", "refresh", "session_id"})
+    user_data.update(request.answers)
+    return user_data
 
 # Load environment variables from .env file
 load_dotenv()
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 GOOGLE_CSE_ID = os.getenv("GOOGLE_CSE_ID")
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-
-genai.configure(api_key=GEMINI_API_KEY)
 
 CATEGORIES = {
     "Education/Career Path": {},
@@ -78,7 +119,41 @@ LIFE_PLANNER_QUESTIONS = [
     ("Retirement Path Foresight", "What is your retirement vision?"),
 ]
 
-def google_custom_search(query, api_key=None, cse_id=None, num_results=3):
+# Candidates fetched per search; snippet_ranking picks the few worth summarizing.
+SEARCH_CANDIDATES = 10
+SEARCH_TIMEOUT = float(os.getenv("SEARCH_TIMEOUT", "8"))
+
+# Default /generate deadline (X-Request-Timeout overrides it) and the share
+# of it the category insights may use before the roadmap is generated.
+PLANNER_GENERATE_TIMEOUT = float(os.getenv("PLANNER_GENERATE_TIMEOUT", "120"))
+INSIGHTS_STAGE_SHARE = float(os.getenv("INSIGHTS_STAGE_SHARE", "0.6"))
+
+# Circuit breakers for the web dependencies (see services.circuit_breaker).
+CSE_BREAKER = "search:cse"
+SCRAPE_BREAKER = "search:scrape"
+
+def _guarded_get(breaker_name, url, **kwargs):
+    """
+    GET through the dependency's circuit breaker; HTTP errors count as
+    failures. Within a request deadline the timeout is cut to the time left.
+    """
+    timeout = deadline.call_timeout(SEARCH_TIMEOUT, breaker_name)
+
+    def fetch():
+        try:
+            response = get_session().get(url, timeout=timeout, **kwargs)
+            response.raise_for_status()
+        except requests.exceptions.RequestException:
+            deadline.check(breaker_name)  # out of time budget, not a search failure
+            raise
+        return response
+    return get_breaker(breaker_name).call(fetch)
+
+def web_insights_available():
+    """False while search, or every model the summaries can use, is behind an open breaker."""
+    return not get_breaker(CSE_BREAKER).is_open() and model_routing.available("search_summary")
+
+def google_custom_search(query, api_key=None, cse_id=None, num_results=SEARCH_CANDIDATES):
     url = "https://www.googleapis.com/customsearch/v1"
     params = {
         "q": query,
@@ -86,7 +161,7 @@ def google_custom_search(query, api_key=None, cse_id=None, num_results=3):
         "cx": cse_id or GOOGLE_CSE_ID,
         "num": num_results
     }
-    response = requests.get(url, params=params)
+    response = _guarded_get(CSE_BREAKER, url, params=params)
     data = response.json()
     results = []
     for item in data.get("items", []):
@@ -95,9 +170,10 @@ def google_custom_search(query, api_key=None, cse_id=None, num_results=3):
             "snippet": item.get("snippet"),
             "link": item.get("link")
         })
-    combined_snippets = " ".join([r["snippet"] for r in results])
+    results = snippet_ranking.rank_snippets(query, results)
+    combined_snippets = snippet_ranking.combine_snippets(results)
     if combined_snippets:
-        summary = gemini_summarize(combined_snippets)
+        summary = gemini_summarize(combined_snippets, call_site="search_summary")
     else:
         summary = "No insights available to summarize."
     return {"results": results, "summary": summary}
@@ -108,33 +184,24 @@ def scrape_web(query):
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
     }
     try:
-        response = requests.get(search_url, headers=headers)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, "html.parser")
-        results = []
-        for g in soup.find_all("div", class_="BNeawe vvjwJb AP7Wnd"):
-            title = g.get_text()
-            parent = g.find_parent("a")
-            link = parent["href"] if parent else None
-            snippet = g.find_next_sibling("div", class_="BNeawe s3v9rd AP7Wnd").get_text() if g.find_next_sibling("div", class_="BNeawe s3v9rd AP7Wnd") else None
-            if title and snippet:
-                results.append({
-                    "title": title,
-                    "snippet": snippet,
-                    "link": f"https://www.google.com{link}" if link else "No link available"
-                })
-                if len(results) >= 3:
-                    break
-        combined_snippets = " ".join([result["snippet"] for result in results])
+        response = _guarded_get(SCRAPE_BREAKER, search_url, headers=headers)
+        results = [
+            {**result, "link": f"https://www.google.com{result['link']}" if result["link"] else "No link available"}
+            for result in serp_parser.extract_results(response.text, SEARCH_CANDIDATES)
+        ]
+        results = snippet_ranking.rank_snippets(query, results)
+        combined_snippets = snippet_ranking.combine_snippets(results)
         if combined_snippets:
-            summarized_text = gemini_summarize(combined_snippets)
+            summarized_text = gemini_summarize(combined_snippets, call_site="scrape_summary")
         else:
             summarized_text = "No insights available to summarize."
         return {
             "results": results,
             "summary": summarized_text
         }
-    except requests.exceptions.RequestException as e:
+    except (requests.exceptions.RequestException, CircuitOpenError, DeadlineExceeded) as e:
+        if isinstance(e, RequestCancelled):
+            raise
         print(f"Error during web scraping: {e}")
         return {
             "results": [{"title": "Error", "snippet": "No insights available from web scraping.", "link": ""}],
@@ -194,8 +261,7 @@ def get_user_input(t, language="en"):
         user_data[f"{cat} Foresight"] = foresight
 
     # Step 4: Fetch and summarize location insights
-    location_query = f"{'Costo de vida en' if language == 'es' else 'Cost of living in'} {user_data['Desired Location']}"
-    location_data = scrape_web(location_query)
+    location_data = location_index.get_location_summary(user_data["Desired Location"], language)
     print(f"\n{t['summary_title'].format(category='Ubicación' if language == 'es' else 'Location')}")
     print(location_data["summary"])
     user_data["Location Summary"] = location_data["summary"]
@@ -212,86 +278,576 @@ def get_user_input(t, language="en"):
 
     return user_data
 
-def get_category_insights(user_data, api_key=None, cse_id=None):
-    insights = {}
-    user_career = user_data.get("Career", "")
-    user_location = user_data.get("Desired Location", "")
-    user_age = user_data.get("Current Age", "")
+# Per-category replies are memoized in the shared cache backend, keyed on
+# the inputs each category depends on.
+CATEGORY_MEMO_PREFIX = "planner:category:"
+CATEGORY_MEMO_TTL = int(os.getenv("CATEGORY_MEMO_TTL", str(7 * 24 * 3600)))
+# How long to wait for another worker already computing the same category.
+CATEGORY_LOCK_WAIT = float(os.getenv("CATEGORY_LOCK_WAIT", "60"))
 
-    for cat in CATEGORIES.keys():
-        insight_base = user_data.get(f"{cat} Insight", "").strip() or cat
-        foresight_base = user_data.get(f"{cat} Foresight", "").strip() or cat
+def _first_value(user_data, *keys):
+    for key in keys:
+        value = str(user_data.get(key) or "").strip()
+        if value:
+            return value
+    return ""
 
-        insight_query = f"{insight_base} for {user_career} in {user_location} at age {user_age}"
-        foresight_query = f"{foresight_base} for {user_career} in {user_location} at age {user_age}"
+def _category_basics(user_data):
+    """Career, location and age, accepting both CLI keys and API request fields."""
+    return (
+        _first_value(user_data, "Career", "career"),
+        _first_value(user_data, "Desired Location", "desired_location"),
+        _first_value(user_data, "Current Age", "age"),
+    )
 
-        insight_data = google_custom_search(insight_query, api_key, cse_id)
-        foresight_data = google_custom_search(foresight_query, api_key, cse_id)
+def category_memo_key(cat, user_data):
+    career, location, age = _category_basics(user_data)
+    payload = json.dumps([
+        cat,
+        (user_data.get(f"{cat} Insight") or "").strip(),
+        (user_data.get(f"{cat} Foresight") or "").strip(),
+        career,
+        location,
+        age,
+    ])
+    return f"{CATEGORY_MEMO_PREFIX}{cat}:{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
 
-        insight_reply = conversational_life_plan_reply(user_data, insight_data["summary"], cat + " (Insight)")
-        foresight_reply = conversational_life_plan_reply(user_data, foresight_data["summary"], cat + " (Foresight)")
+def invalidate_category_insights(user_data=None, categories=None):
+    """
+    Drop memoized category replies.
 
-        insights[cat] = {
-            "insight": insight_reply,
-            "foresight": foresight_reply
-        }
+    - user_data: only drop the entries computed from these answers (default: any)
+    - categories: only drop these categories (default: all)
+    Returns the number of entries removed.
+    """
+    cache = get_cache_backend()
+    cats = categories or list(CATEGORIES.keys())
+    if user_data is not None:
+        return cache.delete(*[category_memo_key(cat, user_data) for cat in cats])
+    return sum(cache.delete_prefix(f"{CATEGORY_MEMO_PREFIX}{cat}:") for cat in cats)
+
+def _compute_category(cat, user_data, api_key=None, cse_id=None):
+    user_career, user_location, user_age = _category_basics(user_data)
+
+    insight_base = (user_data.get(f"{cat} Insight") or "").strip() or cat
+    foresight_base = (user_data.get(f"{cat} Foresight") or "").strip() or cat
+
+    insight_query = f"{insight_base} for {user_career} in {user_location} at age {user_age}"
+    foresight_query = f"{foresight_base} for {user_career} in {user_location} at age {user_age}"
+
+    insight_data = google_custom_search(insight_query, api_key, cse_id)
+    foresight_data = google_custom_search(foresight_query, api_key, cse_id)
+
+    insight_reply = conversational_life_plan_reply(user_data, insight_data["summary"], cat + " (Insight)")
+    foresight_reply = conversational_life_plan_reply(user_data, foresight_data["summary"], cat + " (Foresight)")
+
+    return {
+        "insight": insight_reply,
+        "foresight": foresight_reply
+    }
+
+def get_category_insights(user_data, api_key=None, cse_id=None, on_category=None, completed=None, recomputed=None,
+                          skipped=None):
+    """
+    Search and summarize insight/foresight replies for every category.
+
+    Each category is memoized in the shared cache backend on its own
+    insight/foresight answers plus career, location and age, so editing one
+    answer only recomputes that category. Use invalidate_category_insights()
+    to drop memoized entries.
+
+    A category whose search or summary fails is left out rather than failing
+    the whole plan, and once a search/summary circuit breaker is open or the
+    request deadline (services.deadline) is nearly spent, the remaining
+    categories are only taken from the memo, so an outage costs no waiting.
+    The roadmap is then generated from the profile alone (degraded). A
+    cancelled request (client gone) stops here with RequestCancelled.
+
+    - on_category: optional callback(category, replies) called as each category finishes
+    - completed: optional {category: replies} already computed (e.g. a resumed job); reused as-is
+    - recomputed: optional list; categories that were actually searched and summarized are appended
+    - skipped: optional list; categories left out because a dependency failed are appended
+    """
+    insights = {}
+    for cat in CATEGORIES.keys():
+        if completed and cat in completed:
+            insights[cat] = completed[cat]
+        else:
+            deadline.check_cancelled("insights")
+            memo_only = not web_insights_available() or not deadline.has_time()
+            try:
+                replies = get_category_reply(cat, user_data, api_key, cse_id, recomputed=recomputed, memo_only=memo_only)
+            except RequestCancelled:
+                raise
+            except Exception as e:
+                print(f"Skipping web insights for {cat}: {e}")
+                replies = None
+            if replies is None:
+                if skipped is not None:
+                    skipped.append(cat)
+                continue
+            insights[cat] = replies
+        if on_category:
+            on_category(cat, insights[cat])
     return insights
 
-def conversational_life_plan_reply(user_data, web_summary, topic):
-    user_facts = []
-    for k, v in user_data.items():
-        if isinstance(v, str) and v.strip() and k.lower() not in ["location summary"]:
-            user_facts.append(f"{k}: {v}")
-    combined = (
-        f"Based on what you've shared about your {topic}, here's a personalized summary:\n"
-        + "\n".join(user_facts)
-        + f"\n\nHere's what I found from my research: {web_summary}"
+def get_category_reply(cat, user_data, api_key=None, cse_id=None, recomputed=None, memo_only=False):
+    """Memoized insight/foresight replies for one category (None if memo_only and not memoized)."""
+    cache = get_cache_backend()
+    key = category_memo_key(cat, user_data)
+    replies = cache.get(key)
+    if replies is None and not memo_only:
+        # Only one worker computes a given category at a time; the others
+        # (including a prefetch still in flight) wait for its result instead
+        # of repeating the LLM work.
+        wait = deadline.call_timeout(CATEGORY_LOCK_WAIT, "insights")
+        with cache.lock(key, ttl=CATEGORY_LOCK_WAIT * 2, wait=wait):
+            replies = cache.get(key)
+            if replies is None:
+                replies = _compute_category(cat, user_data, api_key, cse_id)
+                cache.set(key, replies, ttl=CATEGORY_MEMO_TTL)
+                if recomputed is not None:
+                    recomputed.append(cat)
+    return replies
+
+def conversational_life_plan_reply(user_data, web_summary, topic, category=None):
+    # Replies are memoized and shared under category_memo_key, so the prompt
+    # may only use the inputs that key hashes: this category's answers plus
+    # career, location and age. Any other fact would leak into other users'
+    # replies.
+    category = category or topic.split(" (")[0]
+    user_facts = prompts.category_answers(user_data, category) + prompts.profile_facts(
+        user_data, labels=prompts.CATEGORY_BASICS
     )
-    import re
-    combined = re.sub(r'http\S+', '', combined)
-    summary = gemini_summarize(combined)
+    combined = prompts.build_prompt("category_reply", [
+        prompts.section(
+            "instructions",
+            f"Based on what you've shared about your {topic}, here's a personalized summary:",
+            prompts.PRIORITY_INSTRUCTIONS,
+        ),
+        prompts.section("user_facts", prompts.format_facts(user_facts), prompts.PRIORITY_CATEGORY_ANSWERS),
+        prompts.section(
+            "research",
+            f"Here's what I found from my research: {prompts.clean_text(web_summary)}",
+            prompts.PRIORITY_RESEARCH,
+        ),
+    ])
+    summary = gemini_summarize(combined, call_site="category_reply")
     return f"Here's my advice for you: {summary}"
 
-def gemini_summarize(prompt):
-    model = genai.GenerativeModel('models/gemini-2.5-flash-preview-05-20')
-    response = model.generate_content(prompt)
+def gemini_summarize(prompt, call_site="summarize"):
+    response = generate_routed(call_site, prompt)
     return response.text.strip()
 
-def gemini_generate_roadmap(user_data, category_insights):
-    prompt = (
-        "You are a life planning assistant. "
-        "Given the following user profile and research insights, generate a step-by-step roadmap for the user's success. "
-        "The roadmap should be actionable, personalized, and cover all major life categories. "
-        "Include milestones, recommended actions, and tips for each phase of life.\n\n"
-        "User Profile:\n"
+def _roadmap_context_sections(user_data, categories, category_insights):
+    """Profile, answers, location and web insights for categories, as prompt sections."""
+    profile = prompts.profile_facts(user_data)
+    answers = prompts.all_category_answers(user_data, categories, seen=[v.lower() for _, v in profile])
+    sections = [
+        prompts.section("profile", "User Profile:\n" + prompts.format_facts(profile), prompts.PRIORITY_PROFILE),
+        prompts.section(
+            "answers", "User Answers by Category:\n" + prompts.format_facts(answers) if answers else "",
+            prompts.PRIORITY_CATEGORY_ANSWERS,
+        ),
+    ]
+    if user_data.get("Location Summary"):
+        sections.append(prompts.section(
+            "location",
+            "Location Summary: " + prompts.clean_text(user_data["Location Summary"]),
+            prompts.PRIORITY_LOCATION,
+        ))
+    insights = [(cat, category_insights[cat]) for cat in categories if cat in category_insights]
+    if insights:
+        sections.append(prompts.section("insights_heading", "Web Insights by Category:", prompts.PRIORITY_INSTRUCTIONS))
+    for cat, insight in insights:
+        for kind in ("insight", "foresight"):
+            sections.append(prompts.section(
+                f"{kind}:{cat}",
+                f"{cat} {kind.capitalize()}: {prompts.clean_text(insight[kind])}",
+                prompts.PRIORITY_INSIGHTS,
+            ))
+    return sections
+
+def _language_sections(language):
+    if language == "en":
+        return []
+    return [prompts.section(
+        "language", f"Write the entire roadmap in {LANGUAGE_NAMES[language]}.", prompts.PRIORITY_INSTRUCTIONS
+    )]
+
+def gemini_generate_roadmap(user_data, category_insights, language=None, mode=None):
+    """
+    Full roadmap text, in one call or (mode "sectioned", default
+    PLANNER_FULL_MODE) map-reduced over CATEGORY_GROUPS.
+    """
+    language = language or user_data.get("language") or "en"
+    mode = sectioned_roadmap.resolve_mode(mode or user_data.get("generation_mode"), PLANNER_FULL_MODE)
+    if mode == sectioned_roadmap.SECTIONED:
+        return map_reduce_roadmap(user_data, category_insights, language)
+    sections = [
+        prompts.section(
+            "instructions",
+            "You are a life planning assistant. "
+            "Given the following user profile and research insights, generate a step-by-step roadmap for the user's success. "
+            "The roadmap should be actionable, personalized, and cover all major life categories. "
+            "Include milestones, recommended actions, and tips for each phase of life.",
+            prompts.PRIORITY_INSTRUCTIONS,
+        ),
+        *_roadmap_context_sections(user_data, CATEGORIES.keys(), category_insights),
+        prompts.section(
+            "format",
+            "Organize the roadmap year-by-year or phase-by-phase: give it a title and a short summary, "
+            "then for each phase a title, its goal, the recommended actions and tips, and end with a closing note.",
+            prompts.PRIORITY_INSTRUCTIONS,
+        ),
+        *_language_sections(language),
+    ]
+    prompt = prompts.build_prompt("roadmap", sections)
+
+    roadmap_text, _ = roadmaps.generate_roadmap_text(prompt)
+    return roadmap_text
+
+# -------------------- Map-Reduce Roadmap -------------------- #
+# One huge roadmap answer is the slowest call in the planner. In map-reduce
+# mode each group of related categories is drafted in parallel from its own
+# answers and insights (map), then a short call writes the overview, orders
+# the phases and revises the ones that conflict (reduce), referring to
+# phases by index so its answer stays small.
+PLANNER_FULL_MODE = os.getenv("PLANNER_FULL_MODE", sectioned_roadmap.SINGLE)
+
+CATEGORY_GROUPS = {
+    "Career and Business": ["Education/Career Path", "Business Development"],
+    "Money, Taxes and Investing": ["Money Management", "Tax Planning", "Investment"],
+    "Home and Assets": ["Homeownership", "Asset and Property Acquisition"],
+    "Personal Life, Health and Family": [
+        "Individual Life Goals", "Health and Wellness", "Family Planning", "Philanthropy & Missionary",
+    ],
+    "Retirement": ["Retirement Path"],
+}
+
+ROADMAP_OVERVIEW_GENERATION_CONFIG = {
+    "response_mime_type": "application/json",
+    "response_schema": ROADMAP_OVERVIEW_RESPONSE_SCHEMA,
+}
+
+def generate_roadmap_section(user_data, group, categories, category_insights, language):
+    """Drafted phases of the roadmap for one category group (map step)."""
+    deadline.check_cancelled("roadmap")
+    sections = [
+        prompts.section(
+            "instructions",
+            "You are a life planning assistant. "
+            f"Write the {group} part of a step-by-step life roadmap for this user ({', '.join(categories)}); "
+            "the other areas of their life are planned separately. Give its phases year-by-year or by life "
+            "stage, each with a title naming its timeframe (ages or years), its goal, the recommended "
+            "actions including milestones, and tips. Leave the title, summary and closing empty.",
+            prompts.PRIORITY_INSTRUCTIONS,
+        ),
+        *_roadmap_context_sections(user_data, categories, category_insights),
+        *_language_sections(language),
+    ]
+    prompt = prompts.build_prompt("roadmap_section", sections)
+    return roadmaps.generate_structured_roadmap(prompt, "roadmap_section").phases
+
+def reduce_roadmap_sections(user_data, phases, groups, language):
+    """Overview, order and revisions across the drafted phases (reduce step)."""
+    drafts = "\n".join(
+        f"[{index}] ({group}) {phase.title}: {phase.goal} Actions: {'; '.join(phase.actions)}"
+        for index, (group, phase) in enumerate(zip(groups, phases))
     )
-    for k, v in user_data.items():
-        prompt += f"- {k}: {v}\n"
-    prompt += "\nWeb Insights by Category:\n"
-    for cat, insight in category_insights.items():
-        prompt += f"{cat} Insight: {insight['insight']}\n"
-        prompt += f"{cat} Foresight: {insight['foresight']}\n"
-    prompt += (
-        "\nPlease present the roadmap in a clear, year-by-year or phase-by-phase format, "
-        "with bullet points for each recommended action."
+    sections = [
+        prompts.section(
+            "instructions",
+            "You are a life planning assistant. These roadmap phases were drafted separately for each area of "
+            "the user's life. Write the roadmap's title, a short summary of the whole plan and a closing note. "
+            "Give the order of the phases (by number) as one timeline, earliest first. Where phases conflict "
+            "(money, time or timing) or build on each other, give a revised goal and tips for the phases "
+            "involved; leave the other phases out of the revisions.",
+            prompts.PRIORITY_INSTRUCTIONS,
+        ),
+        prompts.section(
+            "profile", "User Profile:\n" + prompts.format_facts(prompts.profile_facts(user_data)),
+            prompts.PRIORITY_PROFILE,
+        ),
+        prompts.section("drafts", "Drafted phases:\n" + drafts, prompts.PRIORITY_RESEARCH),
+        *_language_sections(language),
+    ]
+    prompt = prompts.build_prompt("roadmap_overview", sections)
+    response = generate_routed("roadmap_overview", prompt, generation_config=ROADMAP_OVERVIEW_GENERATION_CONFIG)
+    try:
+        return RoadmapOverview.model_validate_json(response.text)
+    except ValidationError as e:
+        print(f"Roadmap overview did not validate, keeping the drafted order: {e.error_count()} errors")
+        return RoadmapOverview(title=f"Life Roadmap for {user_data.get('name') or user_data.get('Name') or 'You'}")
+
+def map_reduce_roadmap(user_data, category_insights, language="en"):
+    """Roadmap text drafted per CATEGORY_GROUPS in parallel, then reconciled in one short call."""
+    drafted = sectioned_roadmap.run_concurrently(
+        generate_roadmap_section,
+        [(user_data, group, categories, category_insights, language) for group, categories in CATEGORY_GROUPS.items()],
     )
+    groups = [group for group, phases in zip(CATEGORY_GROUPS, drafted) for _ in phases]
+    phases = [phase for group_phases in drafted for phase in group_phases]
+    overview = reduce_roadmap_sections(user_data, phases, groups, language)
+    return roadmaps.remember_roadmap(overview.apply(phases))
 
-    model = genai.GenerativeModel('models/gemini-2.5-flash-preview-05-20')
-    response = model.generate_content(prompt)
-    return response.text.strip()
+def plan_with_insights(user_data, api_key=None, cse_id=None, recomputed=None, skipped=None):
+    """
+    Category insights, then the roadmap. Under a request deadline the
+    insights stage gets INSIGHTS_STAGE_SHARE of the time and the roadmap
+    whatever is left. Returns (insights, roadmap_text).
+    """
+    with deadline.stage("insights", INSIGHTS_STAGE_SHARE):
+        insights = get_category_insights(user_data, api_key, cse_id, recomputed=recomputed, skipped=skipped)
+    with deadline.stage("roadmap"):
+        roadmap = generate_life_roadmap(user_data, insights)
+    return insights, roadmap
 
 # Add this function to match what main.py expects:
 def generate_life_roadmap(user_data, category_insights):
     """Wrapper function to match the expected name in main.py"""
     return gemini_generate_roadmap(user_data, category_insights)
 
-@router.post("/generate")
 def generate_full_roadmap(request: PlannerRequest) -> Dict[str, Any]:
+    user_data = planner_user_data(request)
+    if request.refresh:
+        invalidate_category_insights(user_data)
+    recomputed = []
+    skipped = []
+    _, roadmap = plan_with_insights(user_data, GOOGLE_API_KEY, GOOGLE_CSE_ID, recomputed=recomputed, skipped=skipped)
+    return {
+        "roadmap": roadmap,
+        "roadmap_structured": roadmaps.structured_roadmap(roadmap).compact(),
+        "recomputed_categories": recomputed,
+        "prefetched_categories": prefetched_categories(request.session_id, user_data),
+        "degraded": bool(skipped),
+        "skipped_categories": skipped,
+    }
+
+@router.post("/generate")
+async def generate_full_roadmap_api(
+    request: PlannerRequest,
+    http_request: Request,
+    request_timeout: Optional[str] = Header(None, alias=DEADLINE_HEADER),
+) -> Dict[str, Any]:
+    """
+    Full roadmap within a deadline: the X-Request-Timeout header (seconds) or
+    PLANNER_GENERATE_TIMEOUT. Work stops if the client disconnects. Counts
+    against the caller's "full" plan quota (429 when exhausted).
+    """
     try:
-        user_data = request.dict()
-        insights = get_category_insights(user_data, GOOGLE_API_KEY, GOOGLE_CSE_ID)
-        # Use the consistent function name
-        roadmap = generate_life_roadmap(user_data, insights)
-        return {"roadmap": roadmap}
+        budget = deadline.from_header(request_timeout, PLANNER_GENERATE_TIMEOUT)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    subject = rate_limit.admit(rate_limit.request_user_id(http_request), "full")
+    llm_usage.set_language(request.language)
+    try:
+        with rate_limit.scope(subject):
+            return await deadline.run_until_disconnect(http_request, budget, generate_full_roadmap, request)
+    except CircuitOpenError as e:
+        raise dependency_unavailable(e)
+    except DeadlineExceeded as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+def dependency_unavailable(e):
+    """503 for a request that cannot be served while e's breaker is open."""
+    return HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(math.ceil(e.retry_after))})
+
+@router.get("/quota")
+def get_quota(http_request: Request) -> Dict[str, Any]:
+    """The caller's LLM usage and limits per plan tier in the current window."""
+    user_id = rate_limit.request_user_id(http_request)
+    return {"user": user_id, "window_seconds": rate_limit.RATE_LIMIT_WINDOW, "tiers": rate_limit.quota_status(user_id)}
+
+def in_current_context(fn):
+    """fn bound to a copy of the current context (deadline, quota) for another thread."""
+    return functools.partial(contextvars.copy_context().run, fn)
+
+@router.post("/insights/invalidate")
+def invalidate_insights(request: InvalidateInsightsRequest) -> Dict[str, Any]:
+    removed = invalidate_category_insights(categories=request.categories)
+    return {"message": "Category insights invalidated", "removed": removed}
+
+
+# -------------------- Speculative Prefetch -------------------- #
+# While the chat collects answers, the frontend calls /prefetch as soon as a
+# category's insight/foresight pair and the career/location/age basics are
+# known. The category is searched and summarized in the background into the
+# same memo that /generate reads, so by the end only the roadmap call is left.
+# Per-session status lives in the cache backend so any worker can report it.
+PREFETCH_PREFIX = "planner:prefetch:"
+PREFETCH_SESSION_TTL = int(os.getenv("PREFETCH_SESSION_TTL", str(2 * 3600)))
+PREFETCH_WORKERS = int(os.getenv("PREFETCH_WORKERS", "4"))
+
+PREFETCH_RUNNING = "running"
+PREFETCH_READY = "ready"
+PREFETCH_FAILED = "failed"
+
+_prefetch_executor = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix="planner-prefetch")
+
+def _prefetch_key(session_id, cat):
+    return f"{PREFETCH_PREFIX}{session_id}:{cat}"
+
+def _set_prefetch_state(session_id, cat, memo_key, status, error=None):
+    get_cache_backend().set(
+        _prefetch_key(session_id, cat),
+        {"status": status, "memo_key": memo_key, "error": error, "updated_at": time.time()},
+        ttl=PREFETCH_SESSION_TTL,
+    )
+
+def _run_prefetch(session_id, cat, user_data, memo_key):
+    try:
+        get_category_reply(cat, user_data, GOOGLE_API_KEY, GOOGLE_CSE_ID)
+        _set_prefetch_state(session_id, cat, memo_key, PREFETCH_READY)
+    except Exception as e:
+        print(f"Prefetch failed for {cat} (session {session_id}): {e}")
+        _set_prefetch_state(session_id, cat, memo_key, PREFETCH_FAILED, error=str(e))
+
+def prefetch_category(session_id, cat, user_data):
+    """Start computing one category in the background unless it already is (or is done)."""
+    cache = get_cache_backend()
+    memo_key = category_memo_key(cat, user_data)
+    state = cache.get(_prefetch_key(session_id, cat))
+    if state and state["memo_key"] == memo_key and state["status"] != PREFETCH_FAILED:
+        return state["status"]
+    if cache.get(memo_key) is not None:
+        _set_prefetch_state(session_id, cat, memo_key, PREFETCH_READY)
+        return PREFETCH_READY
+    _set_prefetch_state(session_id, cat, memo_key, PREFETCH_RUNNING)
+    # The copied context charges the prefetch to the caller's quota.
+    _prefetch_executor.submit(in_current_context(_run_prefetch), session_id, cat, user_data, memo_key)
+    return PREFETCH_RUNNING
+
+def prefetch_status(session_id):
+    cache = get_cache_backend()
+    states = {}
+    for cat in CATEGORIES:
+        state = cache.get(_prefetch_key(session_id, cat))
+        if state is not None:
+            states[cat] = {"status": state["status"], "error": state["error"]}
+    return states
+
+def prefetched_categories(session_id, user_data):
+    """Categories this session prefetched for exactly these answers."""
+    if not session_id:
+        return []
+    cache = get_cache_backend()
+    prefetched = []
+    for cat in CATEGORIES:
+        state = cache.get(_prefetch_key(session_id, cat))
+        if state and state["status"] == PREFETCH_READY and state["memo_key"] == category_memo_key(cat, user_data):
+            prefetched.append(cat)
+    return prefetched
+
+@router.post("/prefetch", status_code=202)
+def prefetch_category_insights(request: PrefetchRequest, http_request: Request) -> Dict[str, Any]:
+    if request.category not in CATEGORIES:
+        raise HTTPException(status_code=400, detail=f"Unknown category: {request.category}")
+    subject = rate_limit.admit(rate_limit.request_user_id(http_request), "full", reserve=False)
+    user_data = {
+        "age": request.age,
+        "career": request.career,
+        "desired_location": request.desired_location,
+        f"{request.category} Insight": request.insight,
+        f"{request.category} Foresight": request.foresight,
+    }
+    with rate_limit.scope(subject):
+        status = prefetch_category(request.session_id, request.category, user_data)
+    return {"session_id": request.session_id, "category": request.category, "status": status}
+
+@router.get("/prefetch/{session_id}")
+def get_prefetch_status(session_id: str) -> Dict[str, Any]:
+    return {"session_id": session_id, "categories": prefetch_status(session_id)}
+
+
+# -------------------- Background Jobs -------------------- #
+PLANNER_JOB_KIND = "full_planner"
+
+def _run_planner_job(job_id):
+    if not job_store.claim_job(job_id):
+        return
+    job = job_store.get_job(job_id)
+    user_data = job["request"]
+    insights = job["result"].get("insights", {})
+    recomputed = job["result"].get("recomputed_categories", [])
+    skipped = []
+    total = len(CATEGORIES)
+
+    def on_category(cat, replies):
+        insights[cat] = replies
+        job_store.update_job(
+            job_id,
+            progress={"completed": list(insights), "total": total, "stage": "insights"},
+            result={"insights": insights, "recomputed_categories": recomputed},
+        )
+
+    try:
+        with job_store.heartbeat(job_id):
+            insights = get_category_insights(
+                user_data, GOOGLE_API_KEY, GOOGLE_CSE_ID,
+                on_category=on_category, completed=insights, recomputed=recomputed, skipped=skipped,
+            )
+            job_store.update_job(job_id, progress={"completed": list(insights), "total": total, "stage": "roadmap"})
+            roadmap = generate_life_roadmap(user_data, insights)
+        job_store.update_job(
+            job_id,
+            status=job_store.SUCCEEDED,
+            progress={"completed": list(insights), "total": total, "stage": "done"},
+            result={
+                "insights": insights,
+                "roadmap": roadmap,
+                "roadmap_structured": roadmaps.structured_roadmap(roadmap).compact(),
+                "recomputed_categories": recomputed,
+                "degraded": bool(skipped),
+                "skipped_categories": skipped,
+            },
+        )
+    except Exception as e:
+        job_store.update_job(job_id, status=job_store.FAILED, error=str(e))
+
+def resume_planner_jobs():
+    """Re-submit planner jobs left queued or running by a previous worker."""
+    for job in job_store.unfinished_jobs(PLANNER_JOB_KIND):
+        job_store.submit(_run_planner_job, job["job_id"])
+
+def _job_response(job):
+    return {
+        "job_id": job["job_id"],
+        "status": job["status"],
+        "progress": job["progress"],
+        "insights": job["result"].get("insights", {}),
+        "roadmap": job["result"].get("roadmap"),
+        "roadmap_structured": job["result"].get("roadmap_structured"),
+        "recomputed_categories": job["result"].get("recomputed_categories", []),
+        "degraded": job["result"].get("degraded", False),
+        "skipped_categories": job["result"].get("skipped_categories", []),
+        "error": job["error"],
+    }
+
+@router.post("/generate/jobs", status_code=202)
+def create_full_roadmap_job(request: PlannerRequest, http_request: Request) -> Dict[str, Any]:
+    subject = rate_limit.admit(rate_limit.request_user_id(http_request), "full", reserve=False)
+    llm_usage.set_language(request.language)
+    user_data = planner_user_data(request)
+    if request.refresh:
+        invalidate_category_insights(user_data)
+    job_id = job_store.create_job(
+        PLANNER_JOB_KIND,
+        user_data,
+        progress={"completed": [], "total": len(CATEGORIES), "stage": "queued"},
+    )
+    with rate_limit.scope(subject):
+        job_store.submit(in_current_context(_run_planner_job), job_id)
+    return {"job_id": job_id, "status": job_store.QUEUED}
+
+@router.get("/generate/jobs/{job_id}")
+def get_full_roadmap_job(job_id: str) -> Dict[str, Any]:
+    job = job_store.get_job(job_id)
+    if not job or job["kind"] != PLANNER_JOB_KIND:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job_store.is_stale(job):
+        # The worker that owned this job went away; pick it up here.
+        job_store.submit(_run_planner_job, job_id)
+    return _job_response(job)
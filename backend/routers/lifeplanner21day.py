@@ -1,18 +1,10 @@
 
+import math
 import os
-from dotenv import load_dotenv
-import google.generativeai as genai
-from localization import translations
-from services.gemini import gemini_21day_roadmap
 
-# Load environment variables
-load_dotenv()
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-
-if GEMINI_API_KEY:
-    genai.configure(api_key=GEMINI_API_KEY)
-else:
-    raise ValueError("GEMINI_API_KEY not found in environment variables")
+from localization import LANGUAGE_NAMES, Language, translations
+from services import deadline, llm_usage, rate_limit, roadmaps, sectioned_roadmap
+from services.gemini import gemini_21day_roadmap, generate_routed
 
 LIFE_PLANNER_21DAY_QUESTIONS = [
     ("Name", "What is your name?"),
@@ -41,8 +33,6 @@ def get_user_input(t, language="en"):
 
 def gemini_21day_roadmap(user_data, category_insights, language="en"):
     """Generate 21-day roadmap using Gemini"""
-    model = genai.GenerativeModel('models/gemini-2.0-flash-exp')
-    
     prompt = f"""
     Create a detailed 21-day personal development roadmap for {user_data.get('name', 'the user')}.
     
@@ -69,7 +59,7 @@ def gemini_21day_roadmap(user_data, category_insights, language="en"):
     Make it practical, achievable, and motivating.
     """
     
-    response = model.generate_content(prompt)
+    response = generate_routed("roadmap_21day", prompt)
     return response.text.strip()
 
 def main():
@@ -103,24 +93,27 @@ def main():
 if __name__ == "__main__":
     main()
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Header, HTTPException, Request
 from pydantic import BaseModel
-from typing import Dict, Any
-import os
-from dotenv import load_dotenv
-import google.generativeai as genai
+from typing import Dict, Any, Optional
 
-# Load environment variables
-load_dotenv()
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-
-if GEMINI_API_KEY:
-    genai.configure(api_key=GEMINI_API_KEY)
-else:
-    raise ValueError("GEMINI_API_KEY not found in environment variables")
+from services.circuit_breaker import CircuitOpenError
+from services.deadline import DEADLINE_HEADER, DeadlineExceeded
 
 router = APIRouter()
 
+PLANNER_21DAY_TIMEOUT = float(os.getenv("PLANNER_21DAY_TIMEOUT", "90"))
+# "single" (one call for the whole plan) or "sectioned" (an outline, then the
+# weeks concurrently; see services.sectioned_roadmap). Requests may override it.
+PLANNER_21DAY_MODE = os.getenv("PLANNER_21DAY_MODE", sectioned_roadmap.SINGLE)
+
+# (label, first day, last day, theme) of each section of the plan
+WEEKS_21DAY = [
+    ("Week 1", 1, 7, "Foundation Building"),
+    ("Week 2", 8, 14, "Momentum Building"),
+    ("Week 3", 15, 21, "Mastery and Integration"),
+]
+
 class Planner21Request(BaseModel):
     name: str
     main_goal: str
@@ -131,12 +124,13 @@ class Planner21Request(BaseModel):
     personal_life: str
     notes: str
     plan_type: str = "21day"
+    language: Language = "en"
+    generation_mode: Optional[sectioned_roadmap.GenerationMode] = None
 
-def gemini_21day_roadmap(user_data, category_insights=None, language="en"):
-    """Generate 21-day roadmap using Gemini"""
-    model = genai.GenerativeModel('models/gemini-2.0-flash-exp')
-    
-    prompt = f"""
+def gemini_21day_roadmap(user_data, category_insights=None, language="en", mode=None):
+    """Generate 21-day roadmap using Gemini, in one call or in sections (mode, default PLANNER_21DAY_MODE)"""
+
+    context = f"""
     Create a detailed 21-day personal development roadmap for {user_data.get('name', 'the user')}.
     
     User Goals and Information:
@@ -148,38 +142,60 @@ def gemini_21day_roadmap(user_data, category_insights=None, language="en"):
     - Personal Development: {user_data.get('personal_life', 'Not specified')}
     - Additional Notes: {user_data.get('notes', 'Not specified')}
     
+    Make it practical, achievable, and motivating."""
+    if sectioned_roadmap.resolve_mode(mode, PLANNER_21DAY_MODE) == sectioned_roadmap.SECTIONED:
+        roadmap = sectioned_roadmap.generate_sectioned(context, WEEKS_21DAY, "roadmap_21day", language)
+        return roadmaps.remember_roadmap(roadmap)
+
+    prompt = f"""{context}
+    
     Create a comprehensive 21-day plan with:
     1. Week 1 (Days 1-7): Foundation Building
     2. Week 2 (Days 8-14): Momentum Building
     3. Week 3 (Days 15-21): Mastery and Integration
     
-    For each week, provide:
-    - Daily actionable tasks
-    - Progress milestones
-    - Reflection questions
-    - Potential challenges and solutions
+    Give one phase per day (Day 1 to Day 21) with its day number, the day's
+    goal, its actionable tasks (including progress milestones and a reflection
+    question) and tips covering potential challenges and solutions.
     
-    Make it practical, achievable, and motivating.
+    Write the entire plan in {LANGUAGE_NAMES.get(language, "English")}.
     """
     
-    response = model.generate_content(prompt)
-    return response.text.strip()
+    roadmap_text, _ = roadmaps.generate_roadmap_text(prompt, call_site="roadmap_21day")
+    return roadmap_text
+
+def generate_21day_roadmap(request: Planner21Request) -> Dict[str, Any]:
+    user_data = {
+        "name": request.name,
+        "main_goal": request.main_goal,
+        "obstacles": request.obstacles,
+        "support": request.support,
+        "relationship": request.relationship,
+        "wellness": request.wellness,
+        "personal_life": request.personal_life,
+        "notes": request.notes
+    }
+    roadmap = gemini_21day_roadmap(user_data, {}, request.language, request.generation_mode)
+    return {"roadmap": roadmap, "roadmap_structured": roadmaps.structured_roadmap(roadmap).compact()}
 
 @router.post("/21day")
-def generate_21day_roadmap_api(request: Planner21Request) -> Dict[str, Any]:
+async def generate_21day_roadmap_api(
+    request: Planner21Request,
+    http_request: Request,
+    request_timeout: Optional[str] = Header(None, alias=DEADLINE_HEADER),
+) -> Dict[str, Any]:
+    try:
+        budget = deadline.from_header(request_timeout, PLANNER_21DAY_TIMEOUT)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    subject = rate_limit.admit(rate_limit.request_user_id(http_request), "21day")
+    llm_usage.set_language(request.language)
     try:
-        user_data = {
-            "name": request.name,
-            "main_goal": request.main_goal,
-            "obstacles": request.obstacles,
-            "support": request.support,
-            "relationship": request.relationship,
-            "wellness": request.wellness,
-            "personal_life": request.personal_life,
-            "notes": request.notes
-        }
-        
-        roadmap = gemini_21day_roadmap(user_data, {}, "en")
-        return {"roadmap": roadmap}
+        with rate_limit.scope(subject):
+            return await deadline.run_until_disconnect(http_request, budget, generate_21day_roadmap, request)
+    except CircuitOpenError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(math.ceil(e.retry_after))})
+    except DeadlineExceeded as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
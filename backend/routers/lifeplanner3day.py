@@ -1,24 +1,18 @@
+import math
 import os
-from dotenv import load_dotenv
-import google.generativeai as genai
-from localization import translations
 
-from fastapi import APIRouter, HTTPException
-from typing import Dict, Any
+from localization import LANGUAGE_NAMES, translations
+from services import deadline, llm_usage, rate_limit, roadmaps, sectioned_roadmap
+from services.circuit_breaker import CircuitOpenError
+from services.deadline import DEADLINE_HEADER, DeadlineExceeded
+
+from fastapi import APIRouter, Header, HTTPException, Request
+from typing import Dict, Any, Optional
 
 # ------------------------------------------------------------------------------
 # Gemini / 3-Day Planner Core Logic
 # ------------------------------------------------------------------------------
 
-# Load environment variables
-load_dotenv()
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-
-if GEMINI_API_KEY:
-    genai.configure(api_key=GEMINI_API_KEY)
-else:
-    raise ValueError("GEMINI_API_KEY not found in environment variables")
-
 
 def get_user_input(t, language="en"):
     print(t["planner_3day_title"])
@@ -43,13 +37,22 @@ def get_user_input(t, language="en"):
     return user_data
 
 
-def gemini_3day_roadmap(user_data: Dict[str, Any], t=None, language: str = "en") -> str:
+# "single" (one call for the whole plan) or "sectioned" (an outline, then the
+# days concurrently; see services.sectioned_roadmap). Requests may override it.
+PLANNER_3DAY_MODE = os.getenv("PLANNER_3DAY_MODE", sectioned_roadmap.SINGLE)
+
+# (label, first day, last day, theme) of each section of the plan
+DAYS_3DAY = [(f"Day {day}", day, day, None) for day in (1, 2, 3)]
+
+
+def gemini_3day_roadmap(user_data: Dict[str, Any], t=None, language: str = "en", mode=None) -> str:
     """
     Core 3-day roadmap generator used by both CLI and API.
 
     - user_data: dict of user fields (Name, Main Goal, Obstacles, Support, Other Notes, etc.)
     - t: optional translation dict; if None, it will use translations[language]
     - language: "en" or "es"
+    - mode: "single" or "sectioned" (default PLANNER_3DAY_MODE)
     """
     if t is None:
         t = translations.get(language, translations["en"])
@@ -72,37 +75,29 @@ def gemini_3day_roadmap(user_data: Dict[str, Any], t=None, language: str = "en")
     for k, v in user_data.items():
         prompt += f"- {k}: {v}\n"
 
+    if sectioned_roadmap.resolve_mode(mode, PLANNER_3DAY_MODE) == sectioned_roadmap.SECTIONED:
+        roadmap = sectioned_roadmap.generate_sectioned(prompt, DAYS_3DAY, "roadmap_3day", language)
+        return roadmaps.remember_roadmap(roadmap)
+
     prompt += (
-        "\nPresenta la hoja de ruta como Día 1, Día 2 y Día 3, con viñetas para las acciones de cada día."
+        "\nPresenta la hoja de ruta como Día 1, Día 2 y Día 3: para cada día, su número, el objetivo, "
+        "las acciones (incluido cómo usar el apoyo disponible) y consejos para superar los obstáculos."
         if language == "es"
-        else "\nPlease present the roadmap as Day 1, Day 2, and Day 3, with bullet points for each day's actions. "
-             "Use clear headings for each day and ensure the content is concise and easy to read. "
-             "Format the roadmap like a professional report, with sections for 'Goal', 'Action Steps', 'Tips for Obstacles', and 'Using Support'."
+        else "\nPresent the roadmap as Day 1, Day 2, and Day 3: for each day give its number, the goal, "
+             "the action steps (including how to use available support) and tips for overcoming obstacles. "
+             "Keep it concise and easy to read, like a professional report."
     )
 
-    model = genai.GenerativeModel("gemini-2.0-flash-exp")
-    response = model.generate_content(prompt)
-
-    # Format the roadmap for better readability
-    formatted_roadmap = format_roadmap(response.text.strip())
-    return formatted_roadmap
+    roadmap_text, _ = roadmaps.generate_roadmap_text(prompt, call_site="roadmap_3day")
+    return roadmap_text
 
 
 def format_roadmap(roadmap_text: str) -> str:
     """
-    Take a raw roadmap text and format it into sections with bullets.
+    Render a roadmap as markdown with one section per day, from its structured
+    form (cached when it was generated here, parsed once otherwise).
     """
-    sections = roadmap_text.split("---")
-    formatted_sections = []
-
-    for section in sections:
-        lines = section.strip().split("\n")
-        if lines:
-            heading = lines[0].strip()
-            content = "\n".join(f"• {line.strip()}" for line in lines[1:] if line.strip())
-            formatted_sections.append(f"{heading}\n{content}")
-
-    return "\n".join(formatted_sections)
+    return roadmaps.structured_roadmap(roadmap_text).to_markdown()
 
 
 def main():
@@ -146,19 +141,52 @@ if __name__ == "__main__":
 
 router = APIRouter()
 
+PLANNER_3DAY_TIMEOUT = float(os.getenv("PLANNER_3DAY_TIMEOUT", "60"))
+
 
 @router.post("/3day")
-async def generate_3day_plan(user_data: Dict[str, Any]):
+async def generate_3day_plan(
+    user_data: Dict[str, Any],
+    http_request: Request,
+    request_timeout: Optional[str] = Header(None, alias=DEADLINE_HEADER),
+):
     """
     FastAPI endpoint used by the React frontend.
 
-    Expects a JSON object from the chat (whatever fields you collected).
+    Expects a JSON object from the chat (whatever fields you collected); an
+    optional "language" field ("en" or "es") picks the plan's language and an
+    optional "generation_mode" ("single" or "sectioned") how it is generated.
     Returns: { "roadmap": "<formatted roadmap text>" }
+    Runs within the X-Request-Timeout header (seconds) or PLANNER_3DAY_TIMEOUT,
+    against the caller's "3day" plan quota.
     """
     try:
-        # Call the same core function used by CLI
-        roadmap_text = gemini_3day_roadmap(user_data)
-        return {"roadmap": roadmap_text}
+        budget = deadline.from_header(request_timeout, PLANNER_3DAY_TIMEOUT)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    language = user_data.pop("language", None) or "en"
+    if language not in LANGUAGE_NAMES:
+        raise HTTPException(status_code=400, detail=f"Unsupported language: {language}")
+    try:
+        mode = sectioned_roadmap.resolve_mode(user_data.pop("generation_mode", None), PLANNER_3DAY_MODE)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    subject = rate_limit.admit(rate_limit.request_user_id(http_request), "3day")
+    llm_usage.set_language(language)
+    try:
+        # Call the same core function used by CLI, off the event loop
+        with rate_limit.scope(subject):
+            roadmap_text = await deadline.run_until_disconnect(
+                http_request, budget, gemini_3day_roadmap, user_data, None, language, mode
+            )
+        return {
+            "roadmap": roadmap_text,
+            "roadmap_structured": roadmaps.structured_roadmap(roadmap_text).compact(),
+        }
+    except CircuitOpenError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(math.ceil(e.retry_after))})
+    except DeadlineExceeded as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=500,
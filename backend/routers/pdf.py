@@ -1,34 +1,79 @@
-from fastapi import APIRouter
-from fastapi.responses import Response
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel
+from typing import List
 
-from utils.pdf_letterhead import generate_roadmap_pdf_with_letterhead
+from services.bulk_export import iter_roadmaps_zip
+from services.pdf_cache import ROADMAP_PDF_TITLE, get_or_render_roadmap_pdf, iter_roadmap_pdf
+from utils.pdf_letterhead import DEFAULT_TEMPLATE_PATH
 
 router = APIRouter(
     prefix="/planner",
     tags=["PDF"]
 )
 
+MAX_BULK_EXPORT_USERS = 10000
+
+class BulkRoadmapExportRequest(BaseModel):
+    user_ids: List[str]
+
 @router.post("/roadmap/pdf")
 def download_roadmap_pdf(payload: dict):
     """
     Generates a roadmap PDF using the TaxNerdGPT letterhead.
+
+    The PDF is streamed to the client as it is written (pass "stream": false
+    for a single buffered response). Either way it is served from the shared
+    PDF cache when the same roadmap was already rendered (e.g. for
+    /email/roadmap).
     """
     roadmap_text = payload.get("roadmap", "")
     client_name = payload.get("name", None)
+    headers = {
+        "Content-Disposition": "attachment; filename=TaxNerdGPT_Roadmap.pdf"
+    }
 
-    pdf_bytes = generate_roadmap_pdf_with_letterhead(
+    if payload.get("stream", True):
+        return StreamingResponse(
+            iter_roadmap_pdf(
+                roadmap_text=roadmap_text,
+                client_name=client_name,
+                output_title=ROADMAP_PDF_TITLE,
+                template_path=DEFAULT_TEMPLATE_PATH
+            ),
+            media_type="application/pdf",
+            headers=headers
+        )
+
+    pdf_bytes = get_or_render_roadmap_pdf(
         roadmap_text=roadmap_text,
-        output_title="TaxNerdGPT – Perpetual Life Planner",
         client_name=client_name,
-        template_path="backend/asset/TaxNerdGPT - CONSUMER PDF SHEET.pdf"
+        output_title=ROADMAP_PDF_TITLE,
+        template_path=DEFAULT_TEMPLATE_PATH
     )
 
     return Response(
         content=pdf_bytes,
         media_type="application/pdf",
-        headers={
-            "Content-Disposition": "attachment; filename=TaxNerdGPT_Roadmap.pdf"
-        }
+        headers=headers
     )
 
 
+@router.post("/roadmap/pdf/bulk")
+def bulk_export_roadmap_pdfs(request: BulkRoadmapExportRequest):
+    """
+    Exports the saved final roadmaps of many clients as one ZIP of letterhead
+    PDFs, streamed while the PDFs are still being rendered in parallel.
+    """
+    if not request.user_ids:
+        raise HTTPException(status_code=400, detail="No user ids given")
+    if len(request.user_ids) > MAX_BULK_EXPORT_USERS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_EXPORT_USERS} user ids per export")
+
+    return StreamingResponse(
+        iter_roadmaps_zip(request.user_ids),
+        media_type="application/zip",
+        headers={
+            "Content-Disposition": "attachment; filename=TaxNerdGPT_Roadmaps.zip"
+        }
+    )
@@ -1,14 +1,13 @@
 
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from typing import List
-import os
-import json
+from typing import List, Optional
+from datetime import date, datetime, time, timedelta
 
-router = APIRouter()
+from services.document_store import REMINDERS, get_document_store
+from services.roadmaps import structured_roadmap
 
-REMINDER_DIR = "reminder_logs"
-os.makedirs(REMINDER_DIR, exist_ok=True)
+router = APIRouter()
 
 class Reminder(BaseModel):
     timestamp: str
@@ -25,32 +24,75 @@ class ReminderUpdateRequest(BaseModel):
 class ReminderDeleteRequest(BaseModel):
     index: int
 
+def _load_reminders(user_id):
+    try:
+        return get_document_store().get(REMINDERS, user_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def _save_reminders(user_id, reminders):
+    try:
+        get_document_store().put(REMINDERS, user_id, reminders)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @router.get("/reminders/{user_id}", response_model=ReminderResponse)
 def get_reminders(user_id: str):
-    file_path = os.path.join(REMINDER_DIR, f"{user_id}.json")
-    if not os.path.exists(file_path):
-        return {"user_id": user_id, "reminders": []}
-    with open(file_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    return {"user_id": user_id, "reminders": data}
+    return {"user_id": user_id, "reminders": _load_reminders(user_id) or []}
 
 @router.post("/reminders/{user_id}/update")
 def update_reminders(user_id: str, req: ReminderUpdateRequest):
-    file_path = os.path.join(REMINDER_DIR, f"{user_id}.json")
-    with open(file_path, "w", encoding="utf-8") as f:
-        json.dump([r.dict() for r in req.reminders], f, indent=2)
+    _save_reminders(user_id, [r.dict() for r in req.reminders])
     return {"message": "Reminders updated"}
 
 @router.post("/reminders/{user_id}/delete")
 def delete_reminder(user_id: str, req: ReminderDeleteRequest):
-    file_path = os.path.join(REMINDER_DIR, f"{user_id}.json")
-    if not os.path.exists(file_path):
+    data = _load_reminders(user_id)
+    if data is None:
         raise HTTPException(status_code=404, detail="No reminders found")
-    with open(file_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
     if req.index < 0 or req.index >= len(data):
         raise HTTPException(status_code=400, detail="Invalid index")
     removed = data.pop(req.index)
-    with open(file_path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
+    _save_reminders(user_id, data)
     return {"message": "Reminder deleted", "removed": removed}
+
+
+# -------------------- Reminders from a roadmap -------------------- #
+# Phases without a day number (e.g. "Ages 30-35") are scheduled this far apart.
+PHASE_REMINDER_SPACING_DAYS = 7
+
+class RoadmapRemindersRequest(BaseModel):
+    roadmap_text: str
+    start_date: Optional[str] = None  # ISO date of Day 1; defaults to tomorrow
+    replace: bool = False  # replace the user's reminders instead of appending
+
+def reminders_from_roadmap(roadmap, start):
+    """One reminder per action, dated by the phase's day (or its position)."""
+    reminders = []
+    for index, phase in enumerate(roadmap.phases):
+        offset = phase.day - 1 if phase.day else index * PHASE_REMINDER_SPACING_DAYS
+        timestamp = (start + timedelta(days=offset)).isoformat()
+        for action in phase.actions:
+            reminders.append(Reminder(
+                timestamp=timestamp,
+                message=action,
+                related_goal=phase.goal or phase.title,
+            ))
+    return reminders
+
+@router.post("/reminders/{user_id}/from-roadmap")
+def create_reminders_from_roadmap(user_id: str, req: RoadmapRemindersRequest):
+    try:
+        start = datetime.fromisoformat(req.start_date) if req.start_date else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="start_date must be an ISO date")
+    if start is None:
+        start = datetime.combine(date.today() + timedelta(days=1), time(9, 0))
+    elif len(req.start_date) <= 10:
+        start = start.replace(hour=9)
+
+    new_reminders = reminders_from_roadmap(structured_roadmap(req.roadmap_text), start)
+
+    existing = [] if req.replace else _load_reminders(user_id) or []
+    _save_reminders(user_id, existing + [r.dict() for r in new_reminders])
+    return {"message": "Reminders created", "created": len(new_reminders), "reminders": new_reminders}
@@ -0,0 +1,299 @@
+import csv
+import io
+import json
+import os
+import re
+import time
+from typing import Dict, Optional
+
+from fastapi import APIRouter, File, HTTPException, Query, UploadFile
+from pydantic import BaseModel, ConfigDict, ValidationError, field_validator, model_validator
+
+from services import tax_intake_store
+from tax_analysis import TAX_ANALYSIS_CATEGORIES, flatten_tax_analysis, nest_tax_analysis
+
+router = APIRouter(
+    prefix="/tax-intake",
+    tags=["Tax Intake"]
+)
+
+TAX_INTAKE_BATCH_SIZE = int(os.getenv("TAX_INTAKE_BATCH_SIZE", "1000"))
+# Only the first N row errors are returned; all of them are counted.
+MAX_REPORTED_ERRORS = 1000
+UPLOAD_FORMATS = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+
+EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
+# Accept either the flat field key or the questionnaire label as a column name.
+FIELD_ALIASES = {}
+for _questions in TAX_ANALYSIS_CATEGORIES.values():
+    for _label, _field, _ in _questions:
+        FIELD_ALIASES[_field] = _field
+        FIELD_ALIASES[_label.lower()] = _field
+
+
+class TaxIntakeRecord(BaseModel):
+    """One questionnaire response, flat, as returned by get_tax_analysis per category."""
+    model_config = ConfigDict(str_strip_whitespace=True, str_max_length=2000)
+
+    full_name: str
+    cell_phone: str = ""
+    email_address: str = ""
+    occupation: str = ""
+    annual_income: str = ""
+    dependents: str = ""
+    home_ownership: str = ""
+    renter_goal: str = ""
+    tax_history: str = ""
+    side_gig_earnings: str = ""
+    business_ownership: str = ""
+    business_details: str = ""
+    crypto_activity: str = ""
+    debts: str = ""
+    tax_advisor: str = ""
+    client_status: str = ""
+    referral_source: str = ""
+
+    @field_validator("full_name")
+    @classmethod
+    def name_required(cls, value):
+        if not value:
+            raise ValueError("is required")
+        return value
+
+    @field_validator("email_address")
+    @classmethod
+    def valid_email(cls, value):
+        if value and not EMAIL_RE.match(value):
+            raise ValueError("is not a valid email address")
+        return value.lower()
+
+    @field_validator("cell_phone")
+    @classmethod
+    def valid_phone(cls, value):
+        if not value:
+            return value
+        digits = re.sub(r"\D", "", value)
+        if not 7 <= len(digits) <= 15:
+            raise ValueError("is not a valid phone number")
+        return ("+" if value.startswith("+") else "") + digits
+
+    @model_validator(mode="after")
+    def contact_required(self):
+        if not self.email_address and not self.cell_phone:
+            raise ValueError("an email address or cell phone is required")
+        return self
+
+
+def _normalize_keys(data):
+    return {FIELD_ALIASES[key.strip().lower()]: value
+            for key, value in data.items()
+            if isinstance(key, str) and key.strip().lower() in FIELD_ALIASES}
+
+
+def _validation_message(e):
+    messages = []
+    for err in e.errors():
+        message = err["msg"].removeprefix("Value error, ")
+        if err["loc"]:
+            message = f"{'.'.join(str(part) for part in err['loc'])}: {message}"
+        messages.append(message)
+    return "; ".join(messages)
+
+
+def _validate(flat):
+    """Validated flat record, or raises ValueError with a readable message."""
+    if any("\ufffd" in str(value) for value in flat.values()):
+        raise ValueError("row is not valid UTF-8")
+    try:
+        return TaxIntakeRecord.model_validate(flat).model_dump()
+    except ValidationError as e:
+        raise ValueError(_validation_message(e))
+
+
+def _record_response(record):
+    return {
+        "id": record["id"],
+        "batch_id": record["batch_id"],
+        "source": record["source"],
+        "created_at": record["created_at"],
+        "analysis": nest_tax_analysis(record["answers"]),
+    }
+
+
+@router.post("")
+def submit_tax_intake(analysis: Dict[str, Dict[str, str]]):
+    """
+    Stores one questionnaire response, in the category structure that
+    tax_analysis.get_tax_analysis returns.
+    """
+    try:
+        record = _validate(flatten_tax_analysis(analysis))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    try:
+        batch_id = tax_intake_store.new_batch_id()
+        record_id = tax_intake_store.insert_record(record, batch_id, source="api")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to store tax intake: {str(e)}")
+    return {"id": record_id, "batch_id": batch_id, "analysis": nest_tax_analysis(record)}
+
+
+def _csv_rows(text_stream, ignored_columns):
+    reader = csv.reader(text_stream)
+    try:
+        header = next(reader, None)
+    except csv.Error as e:
+        raise HTTPException(status_code=400, detail=f"CSV header is malformed: {e}")
+    if not header:
+        raise HTTPException(status_code=400, detail="CSV upload is empty")
+    fields = [FIELD_ALIASES.get(column.strip().lower()) for column in header]
+    if not any(fields):
+        raise HTTPException(status_code=400, detail="CSV header has no questionnaire columns")
+    ignored_columns.extend(column for column, field in zip(header, fields) if not field)
+    while True:
+        try:
+            values = next(reader)
+        except StopIteration:
+            return
+        except csv.Error as e:
+            # e.g. a field over the csv field size limit: fails its own row only
+            yield reader.line_num, ValueError(f"malformed CSV: {e}")
+            continue
+        if not any(value.strip() for value in values):
+            continue
+        if len(values) != len(header):
+            yield reader.line_num, ValueError(f"expected {len(header)} columns, got {len(values)}")
+            continue
+        yield reader.line_num, {field: value for field, value in zip(fields, values) if field}
+
+
+def _ndjson_rows(text_stream):
+    for line_number, line in enumerate(text_stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_number, ValueError(f"invalid JSON: {e.msg}")
+            continue
+        if not isinstance(data, dict):
+            yield line_number, ValueError("expected a JSON object")
+            continue
+        if any(isinstance(value, dict) for value in data.values()):
+            data = flatten_tax_analysis(data)  # category structure
+        yield line_number, _normalize_keys(data)
+
+
+def _upload_format(file, requested):
+    if requested:
+        if requested not in ("csv", "ndjson"):
+            raise HTTPException(status_code=400, detail="format must be 'csv' or 'ndjson'")
+        return requested
+    extension = os.path.splitext(file.filename or "")[1].lower()
+    if extension in UPLOAD_FORMATS:
+        return UPLOAD_FORMATS[extension]
+    if file.content_type in ("application/x-ndjson", "application/jsonl"):
+        return "ndjson"
+    if file.content_type == "text/csv":
+        return "csv"
+    raise HTTPException(status_code=400, detail="Could not tell the upload format; pass ?format=csv or ?format=ndjson")
+
+
+@router.post("/bulk")
+def bulk_tax_intake(file: UploadFile = File(...), format: Optional[str] = Query(None)):
+    """
+    Streams a CSV or NDJSON upload of questionnaire responses into the intake
+    store. The upload is decoded and validated line by line and written in
+    batches, so memory does not grow with the file size. Invalid rows are
+    skipped and reported with their line number.
+    """
+    upload_format = _upload_format(file, format)
+    batch_id = tax_intake_store.new_batch_id()
+    source = f"bulk:{upload_format}"
+    started = time.perf_counter()
+
+    received = stored = failed = 0
+    errors = []
+    ignored_columns = []
+    batch = []
+
+    def flush():
+        nonlocal stored
+        if batch:
+            try:
+                stored += tax_intake_store.insert_records(batch, batch_id, source)
+            except Exception as e:
+                raise HTTPException(
+                    status_code=500,
+                    detail=f"Failed to store tax intake (batch {batch_id}, {stored} rows stored before): {str(e)}",
+                )
+            batch.clear()
+
+    # newline="" keeps quoted newlines intact for the csv module. Undecodable
+    # bytes are replaced so they only fail their own row (see _validate).
+    text_stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", errors="replace", newline="")
+    rows = _csv_rows(text_stream, ignored_columns) if upload_format == "csv" else _ndjson_rows(text_stream)
+    try:
+        for line_number, row in rows:
+            received += 1
+            try:
+                if isinstance(row, Exception):
+                    raise row
+                batch.append(_validate(row))
+            except ValueError as e:
+                failed += 1
+                if len(errors) < MAX_REPORTED_ERRORS:
+                    errors.append({"line": line_number, "error": str(e)})
+                continue
+            if len(batch) >= TAX_INTAKE_BATCH_SIZE:
+                flush()
+    finally:
+        text_stream.detach()
+    flush()
+
+    elapsed = time.perf_counter() - started
+    rows_per_second = round(received / elapsed, 1) if elapsed > 0 else None
+    print(
+        f"Tax intake batch {batch_id} ({upload_format}): {received} rows received, {stored} stored, "
+        f"{failed} failed in {elapsed:.2f}s ({rows_per_second} rows/s)"
+    )
+    return {
+        "batch_id": batch_id,
+        "format": upload_format,
+        "rows_received": received,
+        "rows_stored": stored,
+        "rows_failed": failed,
+        "errors": errors,
+        "errors_truncated": failed > MAX_REPORTED_ERRORS,
+        "ignored_columns": ignored_columns,
+        "elapsed_seconds": round(elapsed, 3),
+        "rows_per_second": rows_per_second,
+    }
+
+
+@router.get("/{record_id}")
+def get_tax_intake(record_id: int):
+    record = tax_intake_store.get_record(record_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Tax intake record not found")
+    return _record_response(record)
+
+
+@router.get("")
+def find_tax_intake(
+    email_address: Optional[str] = None,
+    cell_phone: Optional[str] = None,
+    tax_advisor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+):
+    if cell_phone:
+        cell_phone = ("+" if cell_phone.strip().startswith("+") else "") + re.sub(r"\D", "", cell_phone)
+    records = tax_intake_store.find_records(
+        email_address=email_address.strip().lower() if email_address else None,
+        cell_phone=cell_phone,
+        tax_advisor=tax_advisor,
+        limit=limit,
+    )
+    return {"records": [_record_response(record) for record in records]}
@@ -0,0 +1,78 @@
+import math
+import os
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, Header, HTTPException, Request
+from pydantic import BaseModel
+
+from localization import Language
+from models.roadmap import Roadmap
+from services import deadline, llm_usage, rate_limit
+from services.bulk_export import load_saved_roadmap
+from services.circuit_breaker import CircuitOpenError
+from services.deadline import DEADLINE_HEADER, DeadlineExceeded
+from services.roadmap_translation import TranslationError, translate
+
+router = APIRouter()
+
+PLANNER_TRANSLATE_TIMEOUT = float(os.getenv("PLANNER_TRANSLATE_TIMEOUT", "60"))
+
+
+class TranslateRequest(BaseModel):
+    target_language: Language
+    # The roadmap to translate: its text, its structured form, or the one
+    # saved in this user's history.
+    roadmap: Optional[str] = None
+    roadmap_structured: Optional[Roadmap] = None
+    user_id: Optional[str] = None
+
+
+def translate_roadmap(source, language) -> Dict[str, Any]:
+    text, translated, cached = translate(source, language)
+    return {"roadmap": text, "roadmap_structured": translated.compact(), "language": language, "cached": cached}
+
+
+@router.post("/translate")
+async def translate_roadmap_api(
+    request: TranslateRequest,
+    http_request: Request,
+    request_timeout: Optional[str] = Header(None, alias=DEADLINE_HEADER),
+) -> Dict[str, Any]:
+    """
+    An existing roadmap in target_language, translated section by section
+    (services.roadmap_translation) rather than regenerated, and cached per
+    roadmap and language. Counts against the caller's "translate" quota.
+    """
+    structured = request.roadmap_structured
+    source = structured if structured and structured.compact() else request.roadmap
+    if not source:
+        if not request.user_id:
+            raise HTTPException(status_code=400, detail="Provide roadmap, roadmap_structured or user_id")
+        try:
+            saved = load_saved_roadmap(request.user_id)
+        except FileNotFoundError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        source = saved.get("roadmap_structured") or saved["final_roadmap"]
+    try:
+        budget = deadline.from_header(request_timeout, PLANNER_TRANSLATE_TIMEOUT)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    subject = rate_limit.admit(rate_limit.request_user_id(http_request), "translate")
+    llm_usage.set_language(request.target_language)
+    try:
+        with rate_limit.scope(subject):
+            return await deadline.run_until_disconnect(
+                http_request, budget, translate_roadmap, source, request.target_language
+            )
+    except CircuitOpenError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(math.ceil(e.retry_after))})
+    except DeadlineExceeded as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except TranslationError as e:
+        raise HTTPException(status_code=502, detail=str(e))
+    except ValueError as e:  # includes a saved roadmap that does not validate
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
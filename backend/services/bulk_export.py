@@ -0,0 +1,112 @@
+"""
+Bulk export of saved roadmaps (saved history) as a streamed ZIP of letterhead PDFs.
+
+PDFs are rendered in parallel across a process pool while the archive is
+streamed to the client. Only a small window of renders is in flight at a
+time and every ZIP entry is handed to the response as soon as it is
+written, so memory stays bounded however long the client list is.
+"""
+import io
+import os
+import re
+import threading
+import zipfile
+from contextlib import closing
+
+from services.document_store import HISTORY, get_document_store
+from services.pdf_cache import get_or_render_roadmap_pdf
+from utils.parallel import bounded_submit, spawn_process_pool
+
+BULK_EXPORT_WORKERS = int(os.getenv("BULK_EXPORT_WORKERS", str(os.cpu_count() or 2)))
+# Renders queued ahead of the one being written, per worker.
+BULK_EXPORT_WINDOW_PER_WORKER = 2
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = spawn_process_pool(BULK_EXPORT_WORKERS)
+    return _pool
+
+
+def load_saved_roadmap(user_id):
+    data = get_document_store().get(HISTORY, user_id)
+    if data is None:
+        raise FileNotFoundError(f"History not found for {user_id}")
+    if not data.get("final_roadmap"):
+        raise ValueError(f"No saved roadmap for {user_id}")
+    return data
+
+
+def roadmap_filename(user_id, data):
+    # plan_type comes from the saved JSON, so only a slug of it goes into the archive name.
+    plan_type = re.sub(r"[^a-z0-9]+", "_", str(data.get("plan_type") or "").lower()).strip("_")[:20]
+    return f"{user_id}_{plan_type or 'roadmap'}_roadmap.pdf"
+
+
+def render_saved_roadmap(user_id):
+    """Runs in a pool worker. Returns (archive name, PDF bytes)."""
+    data = load_saved_roadmap(user_id)
+    pdf_bytes = get_or_render_roadmap_pdf(
+        data["final_roadmap"], client_name=user_id, structured=data.get("roadmap_structured")
+    )
+    return roadmap_filename(user_id, data), pdf_bytes
+
+
+class _ZipSink(io.RawIOBase):
+    """Non-seekable sink; zipfile falls back to data descriptors for it."""
+
+    def __init__(self):
+        self._chunks = []
+        self._pos = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._pos += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._pos
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def iter_roadmaps_zip(user_ids):
+    """
+    Yield a ZIP archive containing one letterhead PDF per user id, in order.
+    Users whose roadmap could not be exported are listed in errors.txt.
+    """
+    renders = bounded_submit(
+        _get_pool(),
+        render_saved_roadmap,
+        dict.fromkeys(user_ids),  # de-duplicate, keep order
+        BULK_EXPORT_WORKERS * BULK_EXPORT_WINDOW_PER_WORKER,
+    )
+    errors = []
+    sink = _ZipSink()
+    # Closing this generator (client went away) closes `renders`, which
+    # cancels the renders nobody will read.
+    with closing(renders), zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_STORED) as archive:
+        for user_id, future in renders:
+            try:
+                name, pdf_bytes = future.result()
+            except Exception as e:
+                errors.append(f"{user_id}: {e}")
+                continue
+            archive.writestr(name, pdf_bytes)
+            del pdf_bytes
+            yield sink.drain()
+        if errors:
+            archive.writestr("errors.txt", "\n".join(errors) + "\n")
+    yield sink.drain()
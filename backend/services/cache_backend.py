@@ -0,0 +1,246 @@
+"""
+Pluggable cache and shared-state backend.
+
+Planner caches, dedupe locks and rate-limiter counters go through
+get_cache_backend() so several uvicorn workers (or nodes) can share them:
+
+- CACHE_BACKEND=memory (default): per-process, for a single worker or dev.
+- CACHE_BACKEND=redis: anything speaking the Redis protocol at REDIS_URL.
+  Requires the optional `redis` package. Any redis-py compatible client can
+  be passed to RedisCacheBackend directly, e.g. fakeredis.FakeRedis() or a
+  client for a local redis-server binary.
+
+Values are JSON-encoded so both backends behave the same.
+"""
+import json
+import os
+from abc import ABC, abstractmethod
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+CACHE_KEY_PREFIX = os.getenv("CACHE_KEY_PREFIX", "taxnerd:")
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+
+
+class CacheBackend(ABC):
+    """Interface shared by the in-memory and Redis backends."""
+
+    @abstractmethod
+    def get(self, key):
+        """Decoded value for key, or None when missing or expired."""
+
+    @abstractmethod
+    def set(self, key, value, ttl=None):
+        """Store value under key, expiring after ttl seconds when given."""
+
+    @abstractmethod
+    def add(self, key, value, ttl=None):
+        """Set key only if it does not exist. Returns True when it was set."""
+
+    @abstractmethod
+    def delete(self, *keys):
+        """Delete keys. Returns how many existed."""
+
+    @abstractmethod
+    def delete_prefix(self, prefix):
+        """Delete every key starting with prefix. Returns how many existed."""
+
+    @abstractmethod
+    def incr(self, key, amount=1, ttl=None):
+        """
+        Atomically add amount to an integer counter and return the new value.
+        ttl is applied when the counter is created.
+        """
+
+    @abstractmethod
+    def _release(self, key, token):
+        """Delete the lock key if it still holds token."""
+
+    @contextmanager
+    def lock(self, name, ttl=60, wait=0, poll=0.1):
+        """
+        Best-effort distributed lock.
+
+        Yields True once acquired. If the lock is still held by someone else
+        after `wait` seconds, yields False so the caller can decide whether
+        to proceed without it. The lock expires after `ttl` seconds in case
+        its holder dies.
+        """
+        key = f"lock:{name}"
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + wait
+        acquired = self.add(key, token, ttl=ttl)
+        while not acquired and time.monotonic() < deadline:
+            time.sleep(poll)
+            acquired = self.add(key, token, ttl=ttl)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                self._release(key, token)
+
+
+class MemoryCacheBackend(CacheBackend):
+    """Per-process backend: a size-bounded LRU dict with per-key expiry."""
+
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._data = OrderedDict()  # key -> (expires_at or None, encoded value)
+        self._lock = threading.Lock()
+
+    def _live(self, key):
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, _ = item
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return item
+
+    def _store(self, key, value, ttl):
+        expires_at = time.monotonic() + ttl if ttl else None
+        self._data[key] = (expires_at, json.dumps(value))
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    def get(self, key):
+        with self._lock:
+            item = self._live(key)
+        return json.loads(item[1]) if item else None
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._store(key, value, ttl)
+
+    def add(self, key, value, ttl=None):
+        with self._lock:
+            if self._live(key) is not None:
+                return False
+            self._store(key, value, ttl)
+            return True
+
+    def delete(self, *keys):
+        with self._lock:
+            return sum(1 for key in keys if self._data.pop(key, None) is not None)
+
+    def delete_prefix(self, prefix):
+        with self._lock:
+            keys = [key for key in self._data if key.startswith(prefix)]
+            for key in keys:
+                del self._data[key]
+            return len(keys)
+
+    def incr(self, key, amount=1, ttl=None):
+        with self._lock:
+            item = self._live(key)
+            if item is None:
+                value = amount
+                self._store(key, value, ttl)
+            else:
+                value = json.loads(item[1]) + amount
+                self._data[key] = (item[0], json.dumps(value))
+            return value
+
+    def _release(self, key, token):
+        with self._lock:
+            item = self._live(key)
+            if item is not None and json.loads(item[1]) == token:
+                del self._data[key]
+
+
+class RedisCacheBackend(CacheBackend):
+    """Backend for anything speaking the Redis protocol (redis-py client API)."""
+
+    def __init__(self, client=None, url=REDIS_URL, prefix=CACHE_KEY_PREFIX):
+        if client is None:
+            try:
+                import redis
+            except ImportError as e:
+                raise RuntimeError("CACHE_BACKEND=redis requires the 'redis' package (pip install redis)") from e
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+
+    def _key(self, key):
+        return f"{self.prefix}{key}"
+
+    @staticmethod
+    def _ttl_ms(ttl):
+        return int(ttl * 1000) if ttl else None
+
+    def get(self, key):
+        raw = self.client.get(self._key(key))
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key, value, ttl=None):
+        self.client.set(self._key(key), json.dumps(value), px=self._ttl_ms(ttl))
+
+    def add(self, key, value, ttl=None):
+        return bool(self.client.set(self._key(key), json.dumps(value), px=self._ttl_ms(ttl), nx=True))
+
+    def delete(self, *keys):
+        if not keys:
+            return 0
+        return self.client.delete(*[self._key(key) for key in keys])
+
+    def delete_prefix(self, prefix):
+        keys = list(self.client.scan_iter(match=f"{self._key(prefix)}*", count=500))
+        return self.client.delete(*keys) if keys else 0
+
+    def incr(self, key, amount=1, ttl=None):
+        full_key = self._key(key)
+        pipe = self.client.pipeline()
+        if ttl:
+            # Create the counter with its expiry only when it is new; works on
+            # any Redis version, unlike PEXPIRE ... NX (7.0+).
+            pipe.set(full_key, 0, px=self._ttl_ms(ttl), nx=True)
+        pipe.incrby(full_key, amount)
+        return pipe.execute()[-1]
+
+    def _release(self, key, token):
+        # Only delete the lock if we still own it (it may have expired and
+        # been taken by another worker in the meantime).
+        full_key = self._key(key)
+        with self.client.pipeline() as pipe:
+            try:
+                pipe.watch(full_key)
+                raw = pipe.get(full_key)
+                if raw is not None and json.loads(raw) == token:
+                    pipe.multi()
+                    pipe.delete(full_key)
+                    pipe.execute()
+            except Exception as e:
+                print(f"Failed to release cache lock {key}: {e}")
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_cache_backend():
+    """Process-wide backend selected by CACHE_BACKEND."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                if CACHE_BACKEND == "redis":
+                    _backend = RedisCacheBackend()
+                elif CACHE_BACKEND == "memory":
+                    _backend = MemoryCacheBackend()
+                else:
+                    raise ValueError(f"Unknown CACHE_BACKEND: {CACHE_BACKEND}")
+    return _backend
+
+
+def set_cache_backend(backend):
+    """Replace the process-wide backend (e.g. with a fakeredis-backed one)."""
+    global _backend
+    _backend = backend
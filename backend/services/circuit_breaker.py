@@ -0,0 +1,173 @@
+"""
+Circuit breakers for external dependencies (search, scraping, Gemini models).
+
+Each dependency gets one breaker per process:
+
+- closed: calls go through; consecutive failures (errors, or calls slower
+  than slow_call_seconds where the dependency has one) are counted.
+- open: after failure_threshold consecutive failures, calls fail fast with
+  CircuitOpenError for reset_seconds instead of waiting on a doomed call.
+- half-open: after reset_seconds a single trial call is let through; success
+  closes the breaker, failure opens it again.
+
+Callers that can do without the dependency (e.g. web insights) catch
+CircuitOpenError and take a degraded path.
+"""
+import os
+import threading
+import time
+
+from services.deadline import DeadlineExceeded
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "3"))
+BREAKER_RESET_SECONDS = float(os.getenv("BREAKER_RESET_SECONDS", "30"))
+BREAKER_SLOW_CALL_SECONDS = float(os.getenv("BREAKER_SLOW_CALL_SECONDS", "20"))
+# Slow-call threshold per dependency kind (the part of the name before ":");
+# 0 disables it. Model generations are legitimately slow, so they only trip
+# on errors and slow tiers are demoted by services.model_routing instead.
+SLOW_CALL_SECONDS = {
+    "search": BREAKER_SLOW_CALL_SECONDS,
+    "gemini": float(os.getenv("GEMINI_BREAKER_SLOW_CALL_SECONDS", "0")),
+}
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, name, retry_after):
+        super().__init__(f"{name} is unavailable (circuit open); retry in {retry_after:.0f}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    def __init__(self, name, failure_threshold=BREAKER_FAILURE_THRESHOLD,
+                 reset_seconds=BREAKER_RESET_SECONDS, slow_call_seconds=BREAKER_SLOW_CALL_SECONDS):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.slow_call_seconds = slow_call_seconds
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self):
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_seconds:
+            self._state = HALF_OPEN
+            self._trial_in_flight = False
+        return self._state
+
+    def _retry_after(self):
+        return max(0.0, self.reset_seconds - (time.monotonic() - self._opened_at))
+
+    def allow(self):
+        """True if a call may go through now (reserving the half-open trial)."""
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def check(self):
+        """Raise CircuitOpenError unless a call may go through now."""
+        if not self.allow():
+            with self._lock:
+                retry_after = self._retry_after() if self._state == OPEN else self.reset_seconds
+            raise CircuitOpenError(self.name, retry_after)
+
+    def is_open(self):
+        """True while calls would fail fast (does not reserve a trial call)."""
+        with self._lock:
+            state = self._current_state()
+            return state == OPEN or (state == HALF_OPEN and self._trial_in_flight)
+
+    def record_success(self):
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    print(f"Circuit breaker {self.name} opened after {self._failures} failures")
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+                self._trial_in_flight = False
+
+    def _release_trial(self):
+        with self._lock:
+            self._trial_in_flight = False
+
+    def call(self, fn, *args, **kwargs):
+        """
+        Run fn through the breaker. Slow successes count as failures; running
+        out of the caller's deadline does not.
+        """
+        self.check()
+        started = time.monotonic()
+        try:
+            result = fn(*args, **kwargs)
+        except DeadlineExceeded:
+            self._release_trial()
+            raise
+        except Exception:
+            self.record_failure()
+            raise
+        except BaseException:
+            # KeyboardInterrupt, cancellation: neither outcome, but a
+            # half-open trial must not stay reserved forever.
+            self._release_trial()
+            raise
+        if self.slow_call_seconds and time.monotonic() - started > self.slow_call_seconds:
+            self.record_failure()
+        else:
+            self.record_success()
+        return result
+
+    def snapshot(self):
+        with self._lock:
+            state = self._current_state()
+            return {
+                "state": state,
+                "consecutive_failures": self._failures,
+                "retry_after": round(self._retry_after(), 1) if state == OPEN else 0,
+            }
+
+
+_breakers = {}
+_registry_lock = threading.Lock()
+
+
+def slow_call_seconds(name):
+    """Slow-call threshold for the dependency name (0: none)."""
+    return SLOW_CALL_SECONDS.get(name.split(":", 1)[0], BREAKER_SLOW_CALL_SECONDS)
+
+
+def get_breaker(name):
+    """The process-wide breaker for a dependency, e.g. "search:cse" or "gemini:<model>"."""
+    breaker = _breakers.get(name)
+    if breaker is None:
+        with _registry_lock:
+            breaker = _breakers.get(name)
+            if breaker is None:
+                breaker = _breakers[name] = CircuitBreaker(name, slow_call_seconds=slow_call_seconds(name))
+    return breaker
+
+
+def breaker_states():
+    return {name: breaker.snapshot() for name, breaker in sorted(_breakers.items())}
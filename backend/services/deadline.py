@@ -0,0 +1,170 @@
+"""
+Per-request deadlines, carried through the planner pipeline.
+
+A request gets a Deadline from its X-Request-Timeout header (seconds) or the
+endpoint's default. The deadline lives in a context variable, so search,
+summarization and generation read it without threading it through every
+call:
+
+- stage(name, share) gives a pipeline stage a share of the remaining time;
+  anything the stage leaves unused goes to the next one.
+- call_timeout(cap) is the timeout for one outbound call: the remaining
+  time, capped. It raises DeadlineExceeded when too little time is left for
+  the call to be worth starting.
+- check() raises DeadlineExceeded (or RequestCancelled once the client has
+  disconnected) between units of work.
+
+run_until_disconnect() runs a blocking pipeline in a thread and cancels its
+deadline when the client goes away, so the pipeline stops at its next check.
+Calls already in flight finish or time out on their own.
+"""
+import asyncio
+import contextvars
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+DEADLINE_HEADER = "X-Request-Timeout"
+MAX_REQUEST_TIMEOUT = float(os.getenv("MAX_REQUEST_TIMEOUT", "300"))
+# Calls are not started with less than this much time left.
+MIN_CALL_SECONDS = float(os.getenv("MIN_CALL_SECONDS", "1"))
+DISCONNECT_POLL_SECONDS = 0.5
+
+_current = contextvars.ContextVar("deadline", default=None)
+
+
+class DeadlineExceeded(Exception):
+    def __init__(self, stage=None, message=None):
+        super().__init__(message or (f"Request deadline exceeded during {stage}" if stage else "Request deadline exceeded"))
+        self.stage = stage
+
+
+class RequestCancelled(DeadlineExceeded):
+    def __init__(self, stage=None):
+        super().__init__(stage, "Client disconnected")
+
+
+class Deadline:
+    def __init__(self, timeout, cancel_event=None):
+        self.expires_at = time.monotonic() + timeout
+        self._cancel_event = cancel_event or threading.Event()
+
+    def remaining(self):
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    @property
+    def expired(self):
+        return self.cancelled or self.remaining() <= 0
+
+    def cancel(self):
+        """Cancel this deadline and every share taken from it."""
+        self._cancel_event.set()
+
+    def check(self, stage=None):
+        if self.cancelled:
+            raise RequestCancelled(stage)
+        if self.remaining() <= 0:
+            raise DeadlineExceeded(stage)
+
+    def share(self, fraction):
+        """A deadline for fraction of the remaining time, cancelled along with this one."""
+        return Deadline(self.remaining() * fraction, self._cancel_event)
+
+
+def parse_timeout(value, default):
+    """Seconds from a X-Request-Timeout header value, or default. Raises ValueError."""
+    if value is None or value == "":
+        return default
+    seconds = float(value)
+    if not 0 < seconds <= MAX_REQUEST_TIMEOUT:
+        raise ValueError(f"{DEADLINE_HEADER} must be between 0 and {MAX_REQUEST_TIMEOUT:g} seconds")
+    return seconds
+
+
+def current():
+    """The deadline of the request being served, or None."""
+    return _current.get()
+
+
+@contextmanager
+def scope(deadline):
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def stage(name, share=1.0):
+    """Run a pipeline stage within share of the remaining time (no-op without a deadline)."""
+    parent = current()
+    if parent is None:
+        yield None
+        return
+    parent.check(name)
+    with scope(parent.share(share)) as deadline:
+        yield deadline
+
+
+def check(stage_name=None):
+    deadline = current()
+    if deadline is not None:
+        deadline.check(stage_name)
+
+
+def check_cancelled(stage_name=None):
+    """Raise RequestCancelled if the client has gone away (ignores the time left)."""
+    deadline = current()
+    if deadline is not None and deadline.cancelled:
+        raise RequestCancelled(stage_name)
+
+
+def has_time(minimum=MIN_CALL_SECONDS):
+    """False once less than minimum seconds are left (always True without a deadline)."""
+    deadline = current()
+    return deadline is None or deadline.remaining() >= minimum
+
+
+def from_header(value, default):
+    """Deadline for a request's X-Request-Timeout header value. Raises ValueError."""
+    return Deadline(parse_timeout(value, default))
+
+
+def call_timeout(cap=None, stage_name=None):
+    """
+    Timeout for one outbound call: the remaining time, at most cap. Without a
+    deadline this is just cap.
+    """
+    deadline = current()
+    if deadline is None:
+        return cap
+    deadline.check(stage_name)
+    remaining = deadline.remaining()
+    if remaining < MIN_CALL_SECONDS:
+        raise DeadlineExceeded(stage_name)
+    return min(cap, remaining) if cap else remaining
+
+
+async def run_until_disconnect(request, deadline, fn, *args):
+    """
+    Run fn(*args) in a thread under deadline, cancelling the deadline if the
+    client disconnects first. Returns fn's result or raises its exception.
+    """
+    def run():
+        with scope(deadline):
+            return fn(*args)
+
+    task = asyncio.ensure_future(asyncio.to_thread(run))
+    while True:
+        done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_SECONDS)
+        if done:
+            return task.result()
+        if not deadline.cancelled and await request.is_disconnected():
+            print(f"Client disconnected from {request.url.path}; cancelling")
+            deadline.cancel()
@@ -0,0 +1,121 @@
+"""
+Durable per-user documents: saved planner history and reminders.
+
+Unlike the cache backend (services.cache_backend), nothing here expires or is
+evicted. get_document_store() picks the backend with STATE_BACKEND:
+
+- STATE_BACKEND=file (default): one JSON file per document under
+  history_logs/ and reminder_logs/, as before. Node-local, so only for a
+  single node.
+- STATE_BACKEND=redis: one key per document at REDIS_URL, with no expiry,
+  so every worker on every node reads and writes the same documents.
+  Requires the optional `redis` package; any redis-py compatible client
+  can be passed to RedisDocumentStore directly.
+
+Documents are addressed by collection (HISTORY, REMINDERS) and a key, the
+user id, which must be a plain name so it can never reach outside its
+collection.
+"""
+import os
+import threading
+from abc import ABC, abstractmethod
+
+from utils.json_store import dumps, loads, read_json, write_json
+
+STATE_BACKEND = os.getenv("STATE_BACKEND", "file")
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+STATE_KEY_PREFIX = os.getenv("STATE_KEY_PREFIX", "taxnerd:doc:")
+
+HISTORY = "history"
+REMINDERS = "reminders"
+# Directories of the file backend, per collection.
+COLLECTION_DIRS = {HISTORY: "history_logs", REMINDERS: "reminder_logs"}
+
+
+def validate_key(key):
+    """key, or raises ValueError when it is not a plain name."""
+    if not key or os.path.basename(key) != key or key.startswith("."):
+        raise ValueError(f"Invalid user id: {key!r}")
+    return key
+
+
+class DocumentStore(ABC):
+    """Interface shared by the file and Redis stores."""
+
+    @abstractmethod
+    def get(self, collection, key):
+        """Decoded document, or None when there is none."""
+
+    @abstractmethod
+    def put(self, collection, key, document):
+        """Store document, replacing any previous one."""
+
+
+class FileDocumentStore(DocumentStore):
+    """One JSON file per document, written atomically (utils.json_store)."""
+
+    def __init__(self, directories=None):
+        self.directories = directories or COLLECTION_DIRS
+
+    def _path(self, collection, key):
+        return os.path.join(self.directories[collection], f"{validate_key(key)}.json")
+
+    def get(self, collection, key):
+        path = self._path(collection, key)
+        if not os.path.exists(path):
+            return None
+        return read_json(path)
+
+    def put(self, collection, key, document):
+        path = self._path(collection, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        write_json(path, document)
+
+
+class RedisDocumentStore(DocumentStore):
+    """One key per document, without expiry."""
+
+    def __init__(self, client=None, url=REDIS_URL, prefix=STATE_KEY_PREFIX):
+        if client is None:
+            try:
+                import redis
+            except ImportError as e:
+                raise RuntimeError("STATE_BACKEND=redis requires the 'redis' package (pip install redis)") from e
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+
+    def _key(self, collection, key):
+        return f"{self.prefix}{collection}:{validate_key(key)}"
+
+    def get(self, collection, key):
+        raw = self.client.get(self._key(collection, key))
+        return loads(raw) if raw is not None else None
+
+    def put(self, collection, key, document):
+        self.client.set(self._key(collection, key), dumps(document))
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_document_store():
+    """Process-wide store selected by STATE_BACKEND."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                if STATE_BACKEND == "redis":
+                    _store = RedisDocumentStore()
+                elif STATE_BACKEND == "file":
+                    _store = FileDocumentStore()
+                else:
+                    raise ValueError(f"Unknown STATE_BACKEND: {STATE_BACKEND}")
+    return _store
+
+
+def set_document_store(store):
+    """Replace the process-wide store (e.g. with a fakeredis-backed one)."""
+    global _store
+    _store = store
@@ -1,10 +1,107 @@
-import google.generativeai as genai
 import os
+import threading
+import time
 from dotenv import load_dotenv
 
+from services import deadline, llm_usage, model_routing, rate_limit
+from services.circuit_breaker import CircuitOpenError, get_breaker
+from services.deadline import DeadlineExceeded
+
 load_dotenv()
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-genai.configure(api_key=GEMINI_API_KEY)
+
+_configure_lock = threading.Lock()
+_genai = None
+_models = {}
+
+
+def get_genai():
+    """
+    Import and configure google.generativeai on first use.
+
+    The SDK is slow to import, so the CLI and API only pay for it once a
+    code path actually talks to Gemini. Configuration happens exactly once
+    per process.
+    """
+    global _genai
+    if _genai is None:
+        with _configure_lock:
+            if _genai is None:
+                api_key = os.getenv("GEMINI_API_KEY") or GEMINI_API_KEY
+                if not api_key:
+                    raise ValueError("GEMINI_API_KEY not found in environment variables")
+                import google.generativeai as genai
+                genai.configure(api_key=api_key)
+                _genai = genai
+    return _genai
+
+
+def get_model(model_name):
+    """Return the shared GenerativeModel for model_name, building it on first use."""
+    model = _models.get(model_name)
+    if model is None:
+        model = _models.setdefault(model_name, get_genai().GenerativeModel(model_name))
+    return model
+
+
+def generate_content(model_name, prompt, call_site, tier=None, **kwargs):
+    """
+    model.generate_content through the model's circuit breaker
+    ("gemini:<model_name>"), so an outage fails fast with CircuitOpenError.
+    Within a request deadline the call is limited to the time left. Tokens and
+    latency are recorded under call_site (see services.model_routing) and
+    the routing tier by services.llm_usage and charged to the request's quota
+    (services.rate_limit).
+    """
+    timeout = deadline.call_timeout(stage_name=model_name)
+    if timeout:
+        kwargs.setdefault("request_options", {"timeout": timeout})
+
+    def generate():
+        started = time.perf_counter()
+        try:
+            response = get_model(model_name).generate_content(prompt, **kwargs)
+        except Exception as e:
+            llm_usage.record_call(
+                model_name, call_site, time.perf_counter() - started, prompt=prompt, error=e, tier=tier
+            )
+            deadline.check(model_name)  # out of time budget, not a model failure
+            raise
+        tokens = llm_usage.record_call(model_name, call_site, time.perf_counter() - started, prompt, response, tier=tier)
+        return response, tokens
+
+    response, tokens = get_breaker(f"gemini:{model_name}").call(generate)
+    rate_limit.record_llm_usage(calls=1, tokens=tokens)
+    return response
+
+
+def generate_routed(call_site, prompt, **kwargs):
+    """
+    generate_content on the models services.model_routing picks for
+    call_site, falling back along the tier's chain when a model fails or its
+    breaker is open. Raises the last model's error when every model fails.
+    """
+    route = model_routing.route(call_site)
+    error = None
+    for attempt, model_name in enumerate(route.models):
+        started = time.perf_counter()
+        try:
+            response = generate_content(model_name, prompt, call_site=call_site, tier=route.tier, **kwargs)
+        except DeadlineExceeded:
+            raise
+        except CircuitOpenError as e:
+            error = e  # not attempted, so no latency sample
+            continue
+        except Exception as e:
+            model_routing.observe(route.tier, time.perf_counter() - started)
+            print(f"{model_name} failed for {call_site}: {e}")
+            error = e
+            continue
+        model_routing.observe(route.tier, time.perf_counter() - started)
+        model_routing.record_decision(route, model_name, attempt)
+        return response
+    model_routing.record_decision(route)
+    raise error
 
 def generate_life_roadmap(request):
     prompt = (
@@ -24,8 +121,7 @@ def generate_life_roadmap(request):
         "\nPresent the roadmap in a clear, year-by-year or phase-by-phase format with bullet points."
     )
 
-    model = genai.GenerativeModel('models/gemini-2.5-flash-preview-05-20')
-    response = model.generate_content(prompt)
+    response = generate_routed("roadmap", prompt)
     return response.text.strip()
 
 def gemini_3day_roadmap(user_data, t, language):
@@ -41,8 +137,7 @@ You are a motivational short-term life planner. Using the following data, genera
 
 Present a step-by-step, daily plan for 3 days using short motivational and encouraging language.
 """
-    model = genai.GenerativeModel('models/gemini-2.5-flash-preview-05-20')
-    response = model.generate_content(prompt)
+    response = generate_routed("roadmap_3day", prompt)
     return response.text.strip()
 
 
@@ -67,6 +162,5 @@ Respond in {language}. Structure the plan by week:
 
 Use an uplifting and motivating tone.
 """
-    model = genai.GenerativeModel('models/gemini-2.5-flash-preview-05-20')
-    response = model.generate_content(prompt)
+    response = generate_routed("roadmap_21day", prompt)
     return response.text.strip()
\ No newline at end of file
@@ -0,0 +1,44 @@
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Hosts the planner talks to on every full-planner request.
+OUTBOUND_HOSTS = [
+    "https://www.googleapis.com",
+    "https://www.google.com",
+]
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """
+    Shared requests.Session so search and scraping calls reuse pooled
+    keep-alive TLS connections instead of opening a new one per call.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=len(OUTBOUND_HOSTS), pool_maxsize=16)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+
+def warm_connections(timeout=5):
+    """Open a pooled connection to each outbound host. Returns {host: ok}."""
+    session = get_session()
+    status = {}
+    for host in OUTBOUND_HOSTS:
+        try:
+            session.head(host, timeout=timeout, allow_redirects=False)
+            status[host] = True
+        except requests.exceptions.RequestException as e:
+            print(f"Warm-up connection to {host} failed: {e}")
+            status[host] = False
+    return status
@@ -0,0 +1,167 @@
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from utils.sqlite import connect
+
+JOB_DB_PATH = os.getenv("PLANNER_JOB_DB", "planner_jobs.db")
+JOB_WORKERS = int(os.getenv("PLANNER_JOB_WORKERS", "2"))
+# A running job that has not been updated (or heartbeat) for this long is assumed to
+# belong to a worker that died and may be claimed again.
+JOB_STALE_SECONDS = int(os.getenv("PLANNER_JOB_STALE_SECONDS", "180"))
+# How often a worker running a job marks it alive (see heartbeat()).
+JOB_HEARTBEAT_SECONDS = float(os.getenv("PLANNER_JOB_HEARTBEAT_SECONDS", str(JOB_STALE_SECONDS / 4)))
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+_executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="planner-job")
+
+
+def _init_db():
+    with connect(JOB_DB_PATH) as conn:
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                status TEXT NOT NULL,
+                request TEXT NOT NULL,
+                progress TEXT NOT NULL,
+                result TEXT NOT NULL,
+                error TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS jobs_kind_status ON jobs (kind, status)")
+
+
+_init_db()
+
+
+def _row_to_job(row):
+    return {
+        "job_id": row["id"],
+        "kind": row["kind"],
+        "status": row["status"],
+        "request": json.loads(row["request"]),
+        "progress": json.loads(row["progress"]),
+        "result": json.loads(row["result"]),
+        "error": row["error"],
+        "created_at": row["created_at"],
+        "updated_at": row["updated_at"],
+    }
+
+
+def create_job(kind, request, progress=None):
+    job_id = uuid.uuid4().hex
+    now = time.time()
+    with connect(JOB_DB_PATH) as conn:
+        conn.execute(
+            "INSERT INTO jobs (id, kind, status, request, progress, result, error, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, NULL, ?, ?)",
+            (job_id, kind, QUEUED, json.dumps(request), json.dumps(progress or {}), json.dumps({}), now, now),
+        )
+    return job_id
+
+
+def get_job(job_id):
+    with connect(JOB_DB_PATH) as conn:
+        row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    return _row_to_job(row) if row else None
+
+
+def update_job(job_id, status=None, progress=None, result=None, error=None):
+    """Update the given fields of a job; fields left as None are unchanged."""
+    fields, values = ["updated_at = ?"], [time.time()]
+    if status is not None:
+        fields.append("status = ?")
+        values.append(status)
+    if progress is not None:
+        fields.append("progress = ?")
+        values.append(json.dumps(progress))
+    if result is not None:
+        fields.append("result = ?")
+        values.append(json.dumps(result))
+    if error is not None:
+        fields.append("error = ?")
+        values.append(error)
+    values.append(job_id)
+    with connect(JOB_DB_PATH) as conn:
+        conn.execute(f"UPDATE jobs SET {', '.join(fields)} WHERE id = ?", values)
+
+
+def is_stale(job):
+    return job["status"] == RUNNING and time.time() - job["updated_at"] > JOB_STALE_SECONDS
+
+
+def claim_job(job_id):
+    """
+    Atomically mark a queued (or stale running) job as running.
+
+    Returns False when another worker already owns the job, so a job is
+    never executed twice concurrently across processes.
+    """
+    now = time.time()
+    with connect(JOB_DB_PATH) as conn:
+        cur = conn.execute(
+            "UPDATE jobs SET status = ?, updated_at = ? "
+            "WHERE id = ? AND (status = ? OR (status = ? AND updated_at < ?))",
+            (RUNNING, now, job_id, QUEUED, RUNNING, now - JOB_STALE_SECONDS),
+        )
+        return cur.rowcount == 1
+
+
+def touch_job(job_id):
+    """Mark a running job as alive without changing anything else."""
+    with connect(JOB_DB_PATH) as conn:
+        conn.execute("UPDATE jobs SET updated_at = ? WHERE id = ? AND status = ?", (time.time(), job_id, RUNNING))
+
+
+@contextmanager
+def heartbeat(job_id, interval=None):
+    """
+    Keep a claimed job from going stale while the block runs, even through a
+    long stage with no progress to report (a slow roadmap generation), so
+    no other worker reclaims it and runs it a second time.
+    """
+    interval = JOB_HEARTBEAT_SECONDS if interval is None else interval
+    stop = threading.Event()
+
+    def beat():
+        while not stop.wait(interval):
+            try:
+                touch_job(job_id)
+            except Exception as e:
+                print(f"Heartbeat for job {job_id} failed: {e}")
+
+    thread = threading.Thread(target=beat, name=f"job-heartbeat-{job_id[:8]}", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def unfinished_jobs(kind):
+    """Jobs of this kind that were queued or running when the worker stopped."""
+    with connect(JOB_DB_PATH) as conn:
+        rows = conn.execute(
+            "SELECT * FROM jobs WHERE kind = ? AND status IN (?, ?) ORDER BY created_at",
+            (kind, QUEUED, RUNNING),
+        ).fetchall()
+    return [_row_to_job(row) for row in rows]
+
+
+def submit(fn, job_id):
+    """Run fn(job_id) on the background job pool."""
+    return _executor.submit(fn, job_id)
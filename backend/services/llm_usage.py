@@ -0,0 +1,241 @@
+"""
+Token and latency accounting for every Gemini call.
+
+services.gemini.generate_content records each call (model, call site, wall
+time, prompt/output tokens from usage_metadata, or an estimate when the
+response has none) in a local SQLite store, tagged with the endpoint,
+request id and language of the request it ran for. request_scope() sets
+those tags; the app wraps every HTTP request in one (UsageContextMiddleware)
+and the CLI wraps each planner run.
+
+rollup() aggregates the calls by any of endpoint, call_site, model, routing
+tier (services.model_routing) and language: p50/p95 latency, tokens per
+request and calls per request (per roadmap, for the planner endpoints),
+computed in SQL. It backs GET /admin/llm-usage and:
+
+    python -m services.llm_usage --since-hours 24 --group-by endpoint,call_site
+"""
+import argparse
+import contextvars
+import itertools
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from services.prompts import estimate_tokens
+from utils.sqlite import connect
+
+LLM_USAGE_DB_PATH = os.getenv("LLM_USAGE_DB", "llm_usage.db")
+LLM_USAGE_RETENTION_DAYS = int(os.getenv("LLM_USAGE_RETENTION_DAYS", "30"))
+# Calls older than the retention are deleted at startup and every this many recorded calls.
+LLM_USAGE_PRUNE_EVERY = int(os.getenv("LLM_USAGE_PRUNE_EVERY", "1000"))
+
+GROUP_COLUMNS = ("endpoint", "call_site", "model", "tier", "language")
+
+_context = contextvars.ContextVar("llm_usage_context", default=None)
+_recorded = itertools.count(1)
+_recorded_lock = threading.Lock()
+
+
+def _init_db():
+    with connect(LLM_USAGE_DB_PATH) as conn:
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS llm_calls (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                created_at REAL NOT NULL,
+                request_id TEXT,
+                endpoint TEXT NOT NULL,
+                call_site TEXT NOT NULL,
+                model TEXT NOT NULL,
+                tier TEXT,
+                language TEXT NOT NULL,
+                prompt_tokens INTEGER NOT NULL,
+                output_tokens INTEGER NOT NULL,
+                total_tokens INTEGER NOT NULL,
+                estimated INTEGER NOT NULL,
+                latency_ms REAL NOT NULL,
+                ok INTEGER NOT NULL,
+                error TEXT
+            )
+            """
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS llm_calls_created ON llm_calls (created_at)")
+        columns = {row["name"] for row in conn.execute("PRAGMA table_info(llm_calls)")}
+        if "tier" not in columns:  # stores created before model routing
+            conn.execute("ALTER TABLE llm_calls ADD COLUMN tier TEXT")
+
+
+def prune(now=None):
+    """Delete calls older than LLM_USAGE_RETENTION_DAYS. Returns how many."""
+    cutoff = (time.time() if now is None else now) - LLM_USAGE_RETENTION_DAYS * 86400
+    with connect(LLM_USAGE_DB_PATH) as conn:
+        return conn.execute("DELETE FROM llm_calls WHERE created_at < ?", (cutoff,)).rowcount
+
+
+_init_db()
+prune()
+
+
+@contextmanager
+def request_scope(endpoint, language=None):
+    """Tag the LLM calls made in this context with endpoint, a request id and language."""
+    token = _context.set({"endpoint": endpoint, "request_id": uuid.uuid4().hex, "language": language})
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+
+def set_language(language):
+    """Set the language of the current request once it is known (e.g. from the body)."""
+    context = _context.get()
+    if context is not None:
+        context["language"] = language
+
+
+def token_counts(prompt, response):
+    """(prompt_tokens, output_tokens, estimated) for a generate_content call."""
+    metadata = getattr(response, "usage_metadata", None)
+    prompt_tokens = getattr(metadata, "prompt_token_count", None)
+    output_tokens = getattr(metadata, "candidates_token_count", None)
+    if prompt_tokens is not None and output_tokens is not None:
+        return prompt_tokens, output_tokens, False
+    try:
+        reply = response.text
+    except ValueError:  # blocked or empty candidates
+        reply = ""
+    return estimate_tokens(str(prompt)), estimate_tokens(reply), True
+
+
+def record_call(model, call_site, seconds, prompt=None, response=None, error=None, tier=None):
+    """Store one call. Returns its total tokens. Never raises."""
+    context = _context.get() or {}
+    if error is None:
+        prompt_tokens, output_tokens, estimated = token_counts(prompt, response)
+    else:
+        prompt_tokens, output_tokens, estimated = estimate_tokens(str(prompt or "")), 0, True
+    try:
+        with connect(LLM_USAGE_DB_PATH) as conn:
+            conn.execute(
+                """
+                INSERT INTO llm_calls (created_at, request_id, endpoint, call_site, model, tier, language,
+                    prompt_tokens, output_tokens, total_tokens, estimated, latency_ms, ok, error)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    time.time(), context.get("request_id"), context.get("endpoint") or "unknown", call_site,
+                    model, tier or "unrouted", context.get("language") or "unknown", prompt_tokens, output_tokens,
+                    prompt_tokens + output_tokens, int(estimated), seconds * 1000, int(error is None),
+                    None if error is None else f"{type(error).__name__}: {error}"[:500],
+                ),
+            )
+        with _recorded_lock:
+            due = next(_recorded) % LLM_USAGE_PRUNE_EVERY == 0
+        if due:
+            prune()
+    except Exception as e:
+        print(f"Failed to record LLM usage: {e}")
+    return prompt_tokens + output_tokens
+
+
+def rollup(since=None, group_by=GROUP_COLUMNS, endpoint=None):
+    """
+    Aggregated calls since the given timestamp (default: all kept), grouped
+    by a subset of GROUP_COLUMNS, busiest groups first.
+    """
+    group_by = [column for column in group_by if column in GROUP_COLUMNS]
+    clauses, params = [], []
+    if since is not None:
+        clauses.append("created_at >= ?")
+        params.append(since)
+    if endpoint:
+        clauses.append("endpoint = ?")
+        params.append(endpoint)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    groups = ", ".join(group_by)
+    partition = f"PARTITION BY {groups}" if group_by else ""
+    # Latency percentiles are nearest-rank: the ceil(fraction * calls)-th fastest call of the group.
+    query = f"""
+        WITH ranked AS (
+            SELECT {groups + ',' if group_by else ''} request_id, prompt_tokens, output_tokens, latency_ms, ok,
+                ROW_NUMBER() OVER ({partition} ORDER BY latency_ms) AS latency_rank,
+                COUNT(*) OVER ({partition}) AS group_calls
+            FROM llm_calls {where}
+        )
+        SELECT {groups + ',' if group_by else ''}
+            COUNT(*) AS calls,
+            SUM(1 - ok) AS errors,
+            COUNT(DISTINCT request_id) AS requests,
+            SUM(prompt_tokens) AS prompt_tokens,
+            SUM(output_tokens) AS output_tokens,
+            MAX(CASE WHEN latency_rank = (group_calls + 1) / 2 THEN latency_ms END) AS latency_p50_ms,
+            MAX(CASE WHEN latency_rank = (95 * group_calls + 99) / 100 THEN latency_ms END) AS latency_p95_ms
+        FROM ranked
+        {f"GROUP BY {groups}" if group_by else ""}
+        ORDER BY calls DESC
+    """
+    with connect(LLM_USAGE_DB_PATH) as conn:
+        rows = conn.execute(query, params).fetchall()
+
+    report = []
+    for row in rows:
+        if not row["calls"]:
+            continue  # no calls at all (no GROUP BY still returns one row)
+        requests = row["requests"] or 1
+        report.append({
+            **{column: row[column] for column in group_by},
+            "calls": row["calls"],
+            "errors": row["errors"],
+            "requests": requests,
+            "calls_per_request": round(row["calls"] / requests, 2),
+            "prompt_tokens": row["prompt_tokens"],
+            "output_tokens": row["output_tokens"],
+            "tokens_per_request": round((row["prompt_tokens"] + row["output_tokens"]) / requests),
+            "latency_p50_ms": round(row["latency_p50_ms"]),
+            "latency_p95_ms": round(row["latency_p95_ms"]),
+        })
+    return report
+
+
+class UsageContextMiddleware:
+    """ASGI middleware running each HTTP request in a request_scope named after its path."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        with request_scope(f"{scope['method']} {scope['path']}"):
+            await self.app(scope, receive, send)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report Gemini token usage and latency.")
+    parser.add_argument("--since-hours", type=float, default=24, help="0 for everything kept")
+    parser.add_argument("--group-by", default="endpoint,call_site,model",
+                        help=f"comma-separated subset of {','.join(GROUP_COLUMNS)}")
+    parser.add_argument("--endpoint", help='only this endpoint, e.g. "POST /planner/generate"')
+    args = parser.parse_args()
+
+    since = time.time() - args.since_hours * 3600 if args.since_hours else None
+    group_by = [column.strip() for column in args.group_by.split(",") if column.strip()]
+    report = rollup(since, group_by, args.endpoint)
+    if not report:
+        print("No LLM calls recorded.")
+        return
+    headers = [column for column in group_by if column in GROUP_COLUMNS] + [
+        "calls", "errors", "requests", "calls_per_request", "tokens_per_request",
+        "prompt_tokens", "output_tokens", "latency_p50_ms", "latency_p95_ms",
+    ]
+    widths = [max(len(header), *(len(str(item[header])) for item in report)) for header in headers]
+    print("  ".join(header.ljust(width) for header, width in zip(headers, widths)).rstrip())
+    for item in report:
+        print("  ".join(str(item[header]).ljust(width) for header, width in zip(headers, widths)).rstrip())
+
+
+if __name__ == "__main__":
+    main()
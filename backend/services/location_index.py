@@ -0,0 +1,206 @@
+"""
+Precomputed cost-of-living summaries keyed by normalized location.
+
+Lookups hit the index first and only scrape + summarize live for locations
+that have not been seen yet; those results are added to the index.
+
+Warm the index for a city list (from backend/):
+    python -m services.location_index --cities-file asset/us_cities.txt --languages en es --concurrency 4
+"""
+import argparse
+import json
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from utils.sqlite import connect
+
+LOCATION_INDEX_DB = os.getenv("LOCATION_INDEX_DB", "location_index.db")
+# Entries older than this are refreshed on lookup; 0 keeps them forever.
+LOCATION_INDEX_MAX_AGE_DAYS = float(os.getenv("LOCATION_INDEX_MAX_AGE_DAYS", "90"))
+DEFAULT_CITIES_FILE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "asset", "us_cities.txt"
+)
+
+# Summaries returned when scraping failed; never indexed.
+NO_INSIGHTS = "No insights available to summarize."
+
+US_STATES = {
+    "al": "alabama", "ak": "alaska", "az": "arizona", "ar": "arkansas", "ca": "california",
+    "co": "colorado", "ct": "connecticut", "de": "delaware", "dc": "district of columbia",
+    "fl": "florida", "ga": "georgia", "hi": "hawaii", "id": "idaho", "il": "illinois",
+    "in": "indiana", "ia": "iowa", "ks": "kansas", "ky": "kentucky", "la": "louisiana",
+    "me": "maine", "md": "maryland", "ma": "massachusetts", "mi": "michigan", "mn": "minnesota",
+    "ms": "mississippi", "mo": "missouri", "mt": "montana", "ne": "nebraska", "nv": "nevada",
+    "nh": "new hampshire", "nj": "new jersey", "nm": "new mexico", "ny": "new york",
+    "nc": "north carolina", "nd": "north dakota", "oh": "ohio", "ok": "oklahoma", "or": "oregon",
+    "pa": "pennsylvania", "ri": "rhode island", "sc": "south carolina", "sd": "south dakota",
+    "tn": "tennessee", "tx": "texas", "ut": "utah", "vt": "vermont", "va": "virginia",
+    "wa": "washington", "wv": "west virginia", "wi": "wisconsin", "wy": "wyoming", "pr": "puerto rico",
+}
+STATE_ABBREVIATIONS = {name: abbr for abbr, name in US_STATES.items()}
+COUNTRY_SUFFIXES = {"usa", "us", "united states", "united states of america", "eeuu", "ee uu", "estados unidos"}
+
+LOCATION_QUERY = {
+    "en": "Cost of living in {location}",
+    "es": "Costo de vida en {location}",
+}
+
+
+def _init_db():
+    with connect(LOCATION_INDEX_DB) as conn:
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS location_summaries (
+                location_key TEXT NOT NULL,
+                language TEXT NOT NULL,
+                location TEXT NOT NULL,
+                summary TEXT NOT NULL,
+                results TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (location_key, language)
+            )
+            """
+        )
+
+
+_init_db()
+
+
+def normalize_location(location):
+    """
+    Canonical index key for a free-text location.
+
+    Case, punctuation and whitespace are ignored, a trailing country is
+    dropped and US states are reduced to their abbreviation, so "Austin, TX",
+    "austin tx" and "Austin, Texas, USA" all map to "austin, tx".
+    """
+    text = re.sub(r"[.·]", " ", (location or "").lower())
+    text = re.sub(r"\b(\w) (?=\w\b)", r"\1", text)  # "d c" -> "dc", "u s a" -> "usa"
+    parts = [re.sub(r"\s+", " ", p).strip() for p in text.split(",")]
+    parts = [p for p in parts if p]
+    while len(parts) > 1 and parts[-1] in COUNTRY_SUFFIXES:
+        parts.pop()
+    if len(parts) == 1:
+        # "austin tx" / "austin texas" without a comma
+        words = parts[0].split(" ")
+        for size in (3, 2, 1):
+            tail = " ".join(words[-size:])
+            if len(words) > size and (tail in US_STATES or tail in STATE_ABBREVIATIONS):
+                parts = [" ".join(words[:-size]), tail]
+                break
+    if len(parts) > 1:
+        state = parts[-1]
+        parts[-1] = STATE_ABBREVIATIONS.get(state, state)
+    return ", ".join(parts)
+
+
+def lookup(location, language="en"):
+    """Indexed summary for location, or None if missing or expired."""
+    with connect(LOCATION_INDEX_DB) as conn:
+        row = conn.execute(
+            "SELECT * FROM location_summaries WHERE location_key = ? AND language = ?",
+            (normalize_location(location), language),
+        ).fetchone()
+    if row is None:
+        return None
+    max_age = LOCATION_INDEX_MAX_AGE_DAYS * 86400
+    if max_age and time.time() - row["updated_at"] > max_age:
+        return None
+    return {"summary": row["summary"], "results": json.loads(row["results"]), "location": row["location"]}
+
+
+def store(location, language, data):
+    if not data.get("summary") or data["summary"] == NO_INSIGHTS:
+        return False
+    with connect(LOCATION_INDEX_DB) as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO location_summaries "
+            "(location_key, language, location, summary, results, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                normalize_location(location), language, location, data["summary"],
+                json.dumps(data.get("results", [])), time.time(),
+            ),
+        )
+    return True
+
+
+def _fetch_live(location, language):
+    from routers.life_planner import scrape_web
+
+    query = LOCATION_QUERY.get(language, LOCATION_QUERY["en"]).format(location=location)
+    return scrape_web(query)
+
+
+def get_location_summary(location, language="en", fetch=None):
+    """
+    Cost-of-living summary for location, served from the index when possible.
+
+    - fetch: optional callable(location, language) -> {"summary", "results"}
+      used for live lookups (defaults to scraping + Gemini summarization)
+    Returns the scrape_web-style dict plus "cached": bool.
+    """
+    hit = lookup(location, language)
+    if hit is not None:
+        return {"summary": hit["summary"], "results": hit["results"], "cached": True}
+    data = (fetch or _fetch_live)(location, language)
+    store(location, language, data)
+    return {**data, "cached": False}
+
+
+def warm_location_index(cities, languages=("en",), concurrency=4, refresh=False, fetch=None):
+    """
+    Fill the index for every (city, language) pair, at most `concurrency`
+    live lookups at a time. Returns counts of indexed, skipped and failed.
+    """
+    pending = []
+    skipped = 0
+    seen = set()
+    for city in cities:
+        for language in languages:
+            key = (normalize_location(city), language)
+            if key in seen:
+                continue
+            seen.add(key)
+            if not refresh and lookup(city, language) is not None:
+                skipped += 1
+                continue
+            pending.append((city, language))
+
+    indexed = failed = 0
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        futures = {pool.submit(fetch or _fetch_live, city, language): (city, language) for city, language in pending}
+        for future in as_completed(futures):
+            city, language = futures[future]
+            try:
+                if store(city, language, future.result()):
+                    indexed += 1
+                else:
+                    failed += 1
+            except Exception as e:
+                print(f"Location warm-up failed for {city} ({language}): {e}")
+                failed += 1
+    return {"indexed": indexed, "skipped": skipped, "failed": failed}
+
+
+def read_cities(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Warm the location cost-of-living summary index.")
+    parser.add_argument("--cities-file", default=DEFAULT_CITIES_FILE)
+    parser.add_argument("--languages", nargs="+", default=["en", "es"])
+    parser.add_argument("--concurrency", type=int, default=int(os.getenv("LOCATION_WARMUP_CONCURRENCY", "4")))
+    parser.add_argument("--refresh", action="store_true", help="re-fetch locations that are already indexed")
+    args = parser.parse_args()
+
+    started = time.time()
+    counts = warm_location_index(read_cities(args.cities_file), args.languages, args.concurrency, args.refresh)
+    print(f"Location index warm-up: {counts} in {time.time() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+import os
+import smtplib
+from email.message import EmailMessage
+
+
+def smtp_settings():
+    """SMTP settings from the environment, or None when email is not configured."""
+    settings = {
+        "server": os.getenv("SMTP_SERVER"),
+        "port": int(os.getenv("SMTP_PORT", 587)),
+        "user": os.getenv("SMTP_USER"),
+        "password": os.getenv("SMTP_PASSWORD"),
+    }
+    if not all([settings["server"], settings["user"], settings["password"]]):
+        return None
+    return settings
+
+
+def send_email(to_email, subject, body, attachments=(), settings=None):
+    """
+    Send a plain-text email. attachments is a list of (pdf bytes, filename).
+    Raises RuntimeError when SMTP is not configured.
+    """
+    settings = settings or smtp_settings()
+    if settings is None:
+        raise RuntimeError("Email server not configured")
+
+    msg = EmailMessage()
+    msg["Subject"] = subject
+    msg["From"] = settings["user"]
+    msg["To"] = to_email
+    msg.set_content(body)
+    for pdf_bytes, filename in attachments:
+        msg.add_attachment(pdf_bytes, maintype="application", subtype="pdf", filename=filename)
+
+    with smtplib.SMTP(settings["server"], settings["port"]) as server:
+        server.starttls()
+        server.login(settings["user"], settings["password"])
+        server.send_message(msg)
@@ -0,0 +1,207 @@
+"""
+Which Gemini model serves each call site.
+
+Call sites (the call_site names services.llm_usage records) map to a model
+tier, and each tier to a fallback chain of models: services.gemini's
+generate_routed() tries them in order, moving on when a model fails or its
+circuit breaker is open. Summaries of a few snippets go to a fast tier, the
+final roadmaps to the quality tier.
+
+A tier with demote_p95_seconds set is demoted to the next faster tier
+(TIER_ORDER) while the p95 latency of its recent calls is over that
+threshold. Once demoted it gets no new samples, so its window ages out
+(LATENCY_WINDOW_SECONDS) and traffic goes back to it to be measured again.
+
+The defaults below can be replaced by a JSON file (MODEL_ROUTING_FILE)
+with the same shape, {"tiers": {...}, "call_sites": {...}}, and a single
+call site re-tiered with MODEL_TIER_<CALL_SITE>, e.g. MODEL_TIER_ROADMAP=standard.
+Routing decisions are counted per call site, tier, model and reason, and
+snapshot() reports them with each tier's recent latency.
+"""
+import collections
+import json
+import math
+import os
+import threading
+import time
+
+from services.circuit_breaker import get_breaker
+
+MODEL_ROUTING_FILE = os.getenv("MODEL_ROUTING_FILE")
+LATENCY_WINDOW_SECONDS = float(os.getenv("MODEL_LATENCY_WINDOW_SECONDS", "600"))
+LATENCY_MIN_SAMPLES = int(os.getenv("MODEL_LATENCY_MIN_SAMPLES", "5"))
+LATENCY_MAX_SAMPLES = 200
+
+# Slowest to fastest; demotion moves a tier one step right.
+TIER_ORDER = ("quality", "standard", "fast")
+DEFAULT_TIER = "standard"
+
+_DEFAULT_ROUTING = {
+    "tiers": {
+        "quality": {
+            "models": ["models/gemini-2.5-flash-preview-05-20", "models/gemini-2.0-flash"],
+            "demote_p95_seconds": 60,
+        },
+        "standard": {
+            "models": ["models/gemini-2.0-flash", "models/gemini-2.0-flash-lite"],
+            "demote_p95_seconds": 20,
+        },
+        "fast": {
+            "models": ["models/gemini-2.0-flash-lite", "models/gemini-2.0-flash"],
+            "demote_p95_seconds": None,
+        },
+    },
+    "call_sites": {
+        "search_summary": "fast",
+        "scrape_summary": "fast",
+        "category_reply": "standard",
+        "roadmap": "quality",
+        "roadmap_section": "quality",
+        "roadmap_overview": "quality",
+        "roadmap_21day": "quality",
+        "roadmap_3day": "standard",
+        "plan_outline": "standard",
+        "translate": "fast",
+    },
+}
+
+# Why a call went to the model it did.
+PRIMARY = "primary"
+FALLBACK = "fallback"
+DEMOTED = "demoted"
+EXHAUSTED = "exhausted"
+
+
+def _load_routing():
+    routing = _DEFAULT_ROUTING
+    if MODEL_ROUTING_FILE:
+        with open(MODEL_ROUTING_FILE, encoding="utf-8") as f:
+            routing = json.load(f)
+    tiers = routing["tiers"]
+    call_sites = dict(routing.get("call_sites", {}))
+    for name in list(call_sites) + list(_DEFAULT_ROUTING["call_sites"]):
+        override = os.getenv(f"MODEL_TIER_{name.upper()}")
+        if override:
+            call_sites[name] = override
+    for name in TIER_ORDER:
+        if not tiers.get(name, {}).get("models"):
+            raise ValueError(f"Model tier {name!r} needs at least one model")
+    unknown = {tier for tier in call_sites.values() if tier not in tiers}
+    if unknown:
+        raise ValueError(f"Call sites routed to unknown model tiers: {sorted(unknown)}")
+    return tiers, call_sites
+
+
+MODEL_TIERS, CALL_SITE_TIERS = _load_routing()
+
+_lock = threading.Lock()
+_latencies = {tier: collections.deque(maxlen=LATENCY_MAX_SAMPLES) for tier in MODEL_TIERS}
+_decisions = collections.Counter()
+
+
+class Route:
+    def __init__(self, call_site, assigned_tier, tier):
+        self.call_site = call_site
+        self.assigned_tier = assigned_tier
+        self.tier = tier
+        self.models = list(MODEL_TIERS[tier]["models"])
+
+    @property
+    def demoted(self):
+        return self.tier != self.assigned_tier
+
+
+def _recent(tier, now):
+    samples = _latencies[tier]
+    while samples and samples[0][0] < now - LATENCY_WINDOW_SECONDS:
+        samples.popleft()
+    return sorted(seconds for _, seconds in samples)
+
+
+def p95_seconds(tier, now=None):
+    """p95 latency of tier's calls in the window (None below LATENCY_MIN_SAMPLES)."""
+    with _lock:
+        recent = _recent(tier, time.time() if now is None else now)
+    if len(recent) < LATENCY_MIN_SAMPLES:
+        return None
+    return recent[min(len(recent) - 1, math.ceil(0.95 * len(recent)) - 1)]
+
+
+def _too_slow(tier):
+    threshold = MODEL_TIERS[tier].get("demote_p95_seconds")
+    if not threshold:
+        return False
+    p95 = p95_seconds(tier)
+    return p95 is not None and p95 > threshold
+
+
+def _demote(tier):
+    """tier, or the first faster tier that is not over its latency threshold."""
+    if tier not in TIER_ORDER:
+        return tier
+    for candidate in TIER_ORDER[TIER_ORDER.index(tier):]:
+        if candidate == TIER_ORDER[-1] or not _too_slow(candidate):
+            return candidate
+    return tier
+
+
+def route(call_site):
+    """Route (tier and model chain) for a call from call_site."""
+    assigned = CALL_SITE_TIERS.get(call_site, DEFAULT_TIER)
+    return Route(call_site, assigned, _demote(assigned))
+
+
+def observe(tier, seconds):
+    """Record the latency of a call made on tier."""
+    with _lock:
+        _latencies[tier].append((time.time(), seconds))
+
+
+def record_decision(route, model_name=None, attempt=0):
+    """Count which model served route (None once every model failed)."""
+    if model_name is None:
+        reason = EXHAUSTED
+    elif attempt:
+        reason = FALLBACK
+    elif route.demoted:
+        reason = DEMOTED
+    else:
+        reason = PRIMARY
+    with _lock:
+        _decisions[(route.call_site, route.tier, model_name, reason)] += 1
+
+
+def available(call_site):
+    """False while every model call_site could use has its circuit breaker open."""
+    return not all(get_breaker(f"gemini:{model}").is_open() for model in route(call_site).models)
+
+
+def all_models():
+    """Every model in the routing table, each once."""
+    return list(dict.fromkeys(model for tier in MODEL_TIERS.values() for model in tier["models"]))
+
+
+def snapshot():
+    """Routing table, each tier's recent latency and demotion, and decision counts."""
+    tiers = {}
+    for name, tier in MODEL_TIERS.items():
+        p95 = p95_seconds(name)
+        with _lock:
+            samples = len(_recent(name, time.time()))
+        tiers[name] = {
+            "models": tier["models"],
+            "demote_p95_seconds": tier.get("demote_p95_seconds"),
+            "samples": samples,
+            "p95_seconds": None if p95 is None else round(p95, 3),
+            "demoted_to": _demote(name) if _too_slow(name) else None,
+        }
+    with _lock:
+        decisions = [
+            {"call_site": call_site, "tier": tier, "model": model, "reason": reason, "count": count}
+            for (call_site, tier, model, reason), count in sorted(_decisions.items(), key=lambda item: -item[1])
+        ]
+    return {
+        "tiers": tiers,
+        "call_sites": {name: {"tier": tier, "routed_tier": route(name).tier} for name, tier in CALL_SITE_TIERS.items()},
+        "decisions": decisions,
+    }
@@ -0,0 +1,195 @@
+"""
+Content-addressed on-disk cache for rendered roadmap PDFs.
+
+Both the download endpoint and the email endpoint render through
+get_or_render_roadmap_pdf(), so a repeat download or email of the same
+roadmap reuses the cached bytes. Entries are keyed on a hash of the roadmap
+text, client name, title, letterhead template version, renderer version and
+the date printed in the header (cached renders are dated, not timestamped,
+so an entry is reused for the rest of that day). The directory is kept
+under PDF_CACHE_MAX_BYTES by evicting the least recently used files.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from datetime import date
+from functools import lru_cache
+
+from services.roadmaps import structured_roadmap
+from utils.pdf_letterhead import (
+    DEFAULT_TEMPLATE_PATH,
+    RENDERER_VERSION,
+    generate_roadmap_pdf_with_letterhead,
+    write_roadmap_pdf_with_letterhead,
+)
+
+PDF_CACHE_DIR = os.getenv("PDF_CACHE_DIR", "pdf_cache")
+PDF_CACHE_MAX_BYTES = int(os.getenv("PDF_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+ROADMAP_PDF_TITLE = "TaxNerdGPT – Perpetual Life Planner"
+
+# Laying out a PDF is CPU-bound and holds the whole document structure in
+# memory, so only this many renders run at once; other requests wait.
+PDF_RENDER_CONCURRENCY = int(os.getenv("PDF_RENDER_CONCURRENCY", str(os.cpu_count() or 2)))
+STREAM_CHUNK_SIZE = 64 * 1024
+
+_evict_lock = threading.Lock()
+_render_slots = threading.BoundedSemaphore(PDF_RENDER_CONCURRENCY)
+
+
+@lru_cache(maxsize=8)
+def _template_version(template_path, mtime_ns, size):
+    with open(template_path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()[:16]
+
+
+def template_version(template_path):
+    stat = os.stat(template_path)
+    return _template_version(template_path, stat.st_mtime_ns, stat.st_size)
+
+
+def cache_key(roadmap_text, client_name=None, output_title=ROADMAP_PDF_TITLE, template_path=DEFAULT_TEMPLATE_PATH,
+              generated_on=None):
+    payload = json.dumps([
+        roadmap_text or "",
+        client_name or "",
+        output_title,
+        template_version(template_path),
+        RENDERER_VERSION,
+        (generated_on or date.today()).isoformat(),
+    ])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def cache_path(key):
+    return os.path.join(PDF_CACHE_DIR, f"{key}.pdf")
+
+
+def get_cached_pdf(key):
+    """Path of the cached PDF for key (marked as recently used), or None."""
+    path = cache_path(key)
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        return None
+    return path
+
+
+def _render_to_cache(key, write_fn):
+    """Run write_fn(fileobj) into a temp file and publish it as the entry for key."""
+    os.makedirs(PDF_CACHE_DIR, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=PDF_CACHE_DIR, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write_fn(f)
+        os.replace(tmp_path, cache_path(key))
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    evict(keep=cache_path(key))
+    return cache_path(key)
+
+
+def _open_entry(key, write_fn, attempts=3):
+    """Open the cache entry for key, rendering it with write_fn on a miss."""
+    for _ in range(attempts):
+        path = get_cached_pdf(key)
+        if path is None:
+            with _render_slots:
+                path = _render_to_cache(key, write_fn)
+        try:
+            return open(path, "rb")
+        except FileNotFoundError:
+            continue  # evicted by a concurrent store before we opened it
+    raise RuntimeError("PDF cache is too small to hold the rendered document")
+
+
+def store_pdf(key, pdf_bytes):
+    return _render_to_cache(key, lambda f: f.write(pdf_bytes))
+
+
+def evict(max_bytes=None, keep=None):
+    """
+    Delete least recently used PDFs until the cache fits in max_bytes.
+    `keep` (a path) is never evicted, e.g. the entry that was just written.
+    """
+    max_bytes = PDF_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    with _evict_lock:
+        entries = []
+        total = 0
+        with os.scandir(PDF_CACHE_DIR) as it:
+            for entry in it:
+                if not entry.name.endswith(".pdf") or entry.path == keep:
+                    continue
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+        entries.sort()
+        for _, size, path in entries:
+            if total <= max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except FileNotFoundError:
+                pass
+
+
+def get_or_render_roadmap_pdf(roadmap_text, client_name=None, output_title=ROADMAP_PDF_TITLE,
+                              template_path=DEFAULT_TEMPLATE_PATH, structured=None):
+    """
+    Letterhead PDF bytes for the roadmap, rendered at most once per cache key.
+    The layout comes from the structured roadmap for roadmap_text (pass
+    `structured` when the caller already has it stored).
+    """
+    generated_on = date.today()
+    key = cache_key(roadmap_text, client_name, output_title, template_path, generated_on)
+    path = get_cached_pdf(key)
+    if path is not None:
+        try:
+            with open(path, "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            pass  # evicted between the lookup and the read
+    with _render_slots:
+        pdf_bytes = generate_roadmap_pdf_with_letterhead(
+            roadmap_text=structured_roadmap(structured or roadmap_text),
+            output_title=output_title,
+            client_name=client_name,
+            template_path=template_path,
+            generated_on=generated_on,
+        )
+    store_pdf(key, pdf_bytes)
+    return pdf_bytes
+
+
+def iter_roadmap_pdf(roadmap_text, client_name=None, output_title=ROADMAP_PDF_TITLE,
+                     template_path=DEFAULT_TEMPLATE_PATH, chunk_size=STREAM_CHUNK_SIZE, structured=None):
+    """
+    Streaming variant of get_or_render_roadmap_pdf: yields the PDF in chunks.
+
+    On a miss the PDF is written straight into its cache file (never into an
+    in-memory buffer) while holding one of PDF_RENDER_CONCURRENCY render
+    slots, then streamed from disk. Memory per download is therefore one
+    chunk, plus at most PDF_RENDER_CONCURRENCY documents being laid out at a
+    time, regardless of how many downloads are in flight.
+    """
+    generated_on = date.today()
+    key = cache_key(roadmap_text, client_name, output_title, template_path, generated_on)
+    f = _open_entry(key, lambda stream: write_roadmap_pdf_with_letterhead(
+        stream,
+        structured_roadmap(structured or roadmap_text),
+        output_title=output_title,
+        client_name=client_name,
+        template_path=template_path,
+        generated_on=generated_on,
+    ))
+    # The open handle keeps the data readable even if the entry is evicted
+    # while the client is still downloading.
+    with f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
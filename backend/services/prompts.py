@@ -0,0 +1,206 @@
+import os
+import re
+
+# Token budgets per call site. Override with PROMPT_BUDGET_<CALL_SITE>,
+# e.g. PROMPT_BUDGET_ROADMAP=4000.
+DEFAULT_PROMPT_BUDGETS = {
+    "category_reply": 700,
+    "roadmap": 6000,
+    "roadmap_section": 2500,
+    "roadmap_overview": 3000,
+}
+
+# Section priorities: when a prompt is over budget the lowest priority
+# sections are truncated (and then dropped) first.
+PRIORITY_INSTRUCTIONS = 100
+PRIORITY_CATEGORY_ANSWERS = 90
+PRIORITY_PROFILE = 80
+PRIORITY_RESEARCH = 60
+PRIORITY_INSIGHTS = 50
+PRIORITY_LOCATION = 30
+
+# Profile facts, in display order. Each label lists the CLI key and the API
+# request field it may arrive under; the first non-empty value wins.
+PROFILE_FACTS = [
+    ("Name", ("Name", "name")),
+    ("Age", ("Current Age", "age")),
+    ("Career", ("Career", "career")),
+    ("Desired Location", ("Desired Location", "desired_location")),
+    ("House Goal", ("House Goal", "house_goal_age")),
+    ("Retirement Age", ("Retirement Age", "retirement_age")),
+    ("Savings Goal", ("Savings Goal", "savings_goal")),
+    ("Goals", ("Main Goals", "goals")),
+    ("Challenges", ("Challenges", "challenges")),
+    ("Support", ("Support System", "support")),
+]
+
+# Facts a single category reply depends on (see category_memo_key).
+CATEGORY_BASICS = ("Age", "Career", "Desired Location")
+
+URL_RE = re.compile(r"(https?://|www\.)\S+")
+WHITESPACE_RE = re.compile(r"\s+")
+BOILERPLATE_RE = re.compile(
+    r"^(here's my advice for you:|based on what you've shared about your [^:]*:|"
+    r"here's what i found from my research:)\s*",
+    re.IGNORECASE,
+)
+
+CHARS_PER_TOKEN = 4
+# Sections trimmed below this are dropped rather than kept as a stub.
+MIN_SECTION_TOKENS = 24
+
+
+def prompt_budget(call_site):
+    env_value = os.getenv(f"PROMPT_BUDGET_{call_site.upper()}")
+    if env_value:
+        return int(env_value)
+    return DEFAULT_PROMPT_BUDGETS[call_site]
+
+
+def estimate_tokens(text):
+    """Local token estimate (~4 characters per token for English/Spanish prose)."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def clean_text(text):
+    """Strip URLs, canned reply prefixes and redundant whitespace."""
+    text = URL_RE.sub("", str(text))
+    text = WHITESPACE_RE.sub(" ", text).strip()
+    previous = None
+    while previous != text:
+        previous = text
+        text = BOILERPLATE_RE.sub("", text)
+    return text
+
+
+def truncate_to_tokens(text, max_tokens):
+    """Cut text at a word boundary so it fits in max_tokens."""
+    if max_tokens <= 0:
+        return ""
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    cut = text[: max_chars - 1]
+    if " " in cut:
+        cut = cut[: cut.rfind(" ")]
+    return cut.rstrip(" ,;:") + "…"
+
+
+def _seen_before(value, seen):
+    """Track free-text values so the same answer pasted twice is listed once."""
+    key = value.lower()
+    if key.replace(".", "", 1).isdigit():
+        return False  # numbers (ages, amounts) legitimately repeat
+    if key in seen:
+        return True
+    seen.add(key)
+    return False
+
+
+def profile_facts(user_data, labels=None):
+    """
+    Compact, deduplicated profile facts as [(label, value)].
+
+    Values that arrive under both the CLI key and the API field name are
+    only listed once; empty values and repeated free text are skipped.
+    """
+    facts = []
+    seen = set()
+    for label, keys in PROFILE_FACTS:
+        if labels is not None and label not in labels:
+            continue
+        for key in keys:
+            value = user_data.get(key)
+            if value is None or not str(value).strip():
+                continue
+            value = clean_text(value)
+            if not _seen_before(value, seen):
+                facts.append((label, value))
+            break
+    return facts
+
+
+def category_answers(user_data, category):
+    answers = []
+    for kind in ("Insight", "Foresight"):
+        value = user_data.get(f"{category} {kind}")
+        if value and str(value).strip():
+            answers.append((kind, clean_text(value)))
+    return answers
+
+
+def all_category_answers(user_data, categories, seen=None):
+    answers = []
+    seen = set(seen or ())
+    for category in categories:
+        for kind, value in category_answers(user_data, category):
+            if not _seen_before(value, seen):
+                answers.append((f"{category} {kind}", value))
+    return answers
+
+
+def format_facts(facts):
+    return "\n".join(f"- {label}: {value}" for label, value in facts)
+
+
+def section(name, text, priority):
+    return {"name": name, "text": text, "priority": priority}
+
+
+def _common_cap(sizes, allowed):
+    """Largest per-section cap so that sum(min(size, cap)) <= allowed."""
+    remaining = allowed
+    ordered = sorted(sizes)
+    for i, size in enumerate(ordered):
+        if size * (len(ordered) - i) <= remaining:
+            remaining -= size
+        else:
+            return remaining // (len(ordered) - i)
+    return max(ordered)
+
+
+def fit_sections(sections, budget):
+    """
+    Trim sections to fit the token budget, lowest priority first.
+
+    Sections that share the lowest priority are capped to a common length,
+    so related sections (e.g. per-category insights) keep similar shares.
+    When that cap would leave each section too short to be useful, the last
+    section of the tier is dropped instead. Returns the kept sections in
+    their original order.
+    """
+    sections = [dict(s) for s in sections if s["text"]]
+    total = sum(estimate_tokens(s["text"]) for s in sections)
+    while total > budget:
+        candidates = [s for s in sections if s["text"] and s["priority"] < PRIORITY_INSTRUCTIONS]
+        if not candidates:
+            break
+        lowest = min(s["priority"] for s in candidates)
+        tier = [s for s in candidates if s["priority"] == lowest]
+        sizes = [estimate_tokens(s["text"]) for s in tier]
+        cap = _common_cap(sizes, sum(sizes) - (total - budget))
+        if cap < MIN_SECTION_TOKENS:
+            tier[-1]["text"] = ""
+        else:
+            for s in tier:
+                s["text"] = truncate_to_tokens(s["text"], cap)
+        total = sum(estimate_tokens(s["text"]) for s in sections)
+    return [s for s in sections if s["text"]]
+
+
+def build_prompt(call_site, sections):
+    """
+    Assemble sections into one prompt within the call site's token budget
+    and print the before/after size.
+    """
+    budget = prompt_budget(call_site)
+    original_tokens = sum(estimate_tokens(s["text"]) for s in sections if s["text"])
+    kept = fit_sections(sections, budget)
+    prompt = "\n\n".join(s["text"] for s in kept)
+    final_tokens = estimate_tokens(prompt)
+    dropped = [s["name"] for s in sections if s["text"] and s["name"] not in {k["name"] for k in kept}]
+    print(
+        f"Prompt {call_site}: ~{final_tokens} tokens (was ~{original_tokens}, budget {budget}), "
+        f"{len(kept)} sections, dropped: {', '.join(dropped) or '-'}"
+    )
+    return prompt
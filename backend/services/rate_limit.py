@@ -0,0 +1,249 @@
+"""
+Per-user, per-tier quotas on LLM work, enforced with a sliding window.
+
+Quotas are counted in Gemini calls and tokens rather than HTTP requests, so
+one /planner/generate click (dozens of calls) weighs what it costs. Each
+plan tier (full, 21day, 3day, translate) has its own limits per
+RATE_LIMIT_WINDOW seconds, overridable with RATE_LIMIT_<TIER>_CALLS /
+RATE_LIMIT_<TIER>_TOKENS.
+
+Counters live in the cache backend (per process with CACHE_BACKEND=memory,
+shared across workers with redis) as two fixed windows; usage is the
+current window plus the previous one weighted by how much of it still
+overlaps the sliding window.
+
+A request is admitted only if its tier's estimated cost still fits. The
+estimate is reserved up front, so a burst of concurrent requests cannot all
+slip in, and settled against the actual usage that services.gemini records
+while the request runs. Usage recorded after settling (background prefetch
+and jobs) is charged directly.
+
+Quotas are keyed on the authenticated user when there is one and on the
+client address otherwise; identity headers are only trusted from the
+gateway (RATE_LIMIT_TRUSTED_PROXIES), never from the caller.
+"""
+import contextvars
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from services.cache_backend import get_cache_backend
+
+RATE_LIMIT_PREFIX = "ratelimit:"
+RATE_LIMIT_WINDOW = int(os.getenv("RATE_LIMIT_WINDOW", "3600"))
+# Addresses of the gateway(s) that authenticate users and set the identity
+# headers below; the headers are ignored on requests from anywhere else.
+RATE_LIMIT_TRUSTED_PROXIES = {
+    address.strip() for address in os.getenv("RATE_LIMIT_TRUSTED_PROXIES", "").split(",") if address.strip()
+}
+USER_ID_HEADER = "X-User-Id"
+FORWARDED_FOR_HEADER = "X-Forwarded-For"
+
+CALLS = "calls"
+TOKENS = "tokens"
+UNITS = (CALLS, TOKENS)
+
+# limit per window, and the estimated cost of one request reserved on admission
+_DEFAULT_QUOTAS = {
+    "full": {"calls": 300, "tokens": 600_000, "estimate_calls": 54, "estimate_tokens": 60_000},
+    "21day": {"calls": 80, "tokens": 200_000, "estimate_calls": 4, "estimate_tokens": 16_000},
+    "3day": {"calls": 80, "tokens": 100_000, "estimate_calls": 4, "estimate_tokens": 6_000},
+    "translate": {"calls": 100, "tokens": 300_000, "estimate_calls": 7, "estimate_tokens": 16_000},
+}
+TIER_QUOTAS = {
+    tier: {
+        **quota,
+        CALLS: int(os.getenv(f"RATE_LIMIT_{tier.upper()}_CALLS", quota[CALLS])),
+        TOKENS: int(os.getenv(f"RATE_LIMIT_{tier.upper()}_TOKENS", quota[TOKENS])),
+    }
+    for tier, quota in _DEFAULT_QUOTAS.items()
+}
+
+_current = contextvars.ContextVar("rate_limit_subject", default=None)
+
+
+class QuotaExceeded(Exception):
+    def __init__(self, tier, unit, limit, retry_after):
+        super().__init__(f"{tier} plan quota of {limit} LLM {unit} per {RATE_LIMIT_WINDOW}s exceeded")
+        self.tier = tier
+        self.unit = unit
+        self.limit = limit
+        self.retry_after = retry_after
+
+
+def _window(now):
+    return int(now // RATE_LIMIT_WINDOW)
+
+
+def _key(tier, user_id, unit, index):
+    return f"{RATE_LIMIT_PREFIX}{tier}:{user_id}:{unit}:{index}"
+
+
+def _keys(tier, user_id, unit, now):
+    index = _window(now)
+    return _key(tier, user_id, unit, index), _key(tier, user_id, unit, index - 1), index
+
+
+def _counts(tier, user_id, unit, now):
+    current_key, previous_key, index = _keys(tier, user_id, unit, now)
+    cache = get_cache_backend()
+    return cache.get(current_key) or 0, cache.get(previous_key) or 0, index
+
+
+def usage(tier, user_id, unit, now=None):
+    """Sliding-window usage of unit for user_id on tier."""
+    now = time.time() if now is None else now
+    current, previous, _ = _counts(tier, user_id, unit, now)
+    overlap = 1 - (now % RATE_LIMIT_WINDOW) / RATE_LIMIT_WINDOW
+    return current + previous * overlap
+
+
+def _retry_after(tier, user_id, unit, limit, needed, now):
+    """Seconds until usage + needed fits in limit again (at least 1)."""
+    current, previous, index = _counts(tier, user_id, unit, now)
+    window_start = index * RATE_LIMIT_WINDOW
+    room = limit - needed
+    if current <= room and previous:
+        # Wait for enough of the previous window to slide out.
+        at = window_start + RATE_LIMIT_WINDOW * (1 - (room - current) / previous)
+    elif current:
+        # The current window has to become the previous one and decay.
+        at = window_start + RATE_LIMIT_WINDOW * (2 - max(room, 0) / current)
+    else:
+        at = now
+    return max(1.0, at - now)
+
+
+def _add(tier, user_id, unit, amount, index=None):
+    """Add amount to window index's counter (the current window by default)."""
+    if amount:
+        index = _window(time.time()) if index is None else index
+        get_cache_backend().incr(_key(tier, user_id, unit, index), int(amount), ttl=2 * RATE_LIMIT_WINDOW)
+
+
+def _refund(tier, user_id, unit, amount, index):
+    """
+    Take amount back off window index's counter, where it was reserved,
+    never taking the counter below zero. Nothing to do once that window has
+    expired.
+    """
+    key = _key(tier, user_id, unit, index)
+    cache = get_cache_backend()
+    count = cache.get(key)
+    if count and amount > 0:
+        cache.incr(key, -min(int(amount), count), ttl=2 * RATE_LIMIT_WINDOW)
+
+
+class QuotaSubject:
+    """One admitted request's quota: its reservation and the usage recorded so far."""
+
+    def __init__(self, user_id, tier, reserved=None, window=None):
+        self.user_id = user_id
+        self.tier = tier
+        self.reserved = reserved or {}
+        self.window = _window(time.time()) if window is None else window  # where the reservation is counted
+        self.used = dict.fromkeys(UNITS, 0)
+        self._lock = threading.Lock()
+
+    def charge(self, calls=0, tokens=0):
+        with self._lock:
+            self.used[CALLS] += calls
+            self.used[TOKENS] += tokens
+            if self.reserved:
+                return  # settled against the reservation at the end
+        _add(self.tier, self.user_id, CALLS, calls)
+        _add(self.tier, self.user_id, TOKENS, tokens)
+
+    def settle(self):
+        """
+        Replace the reservation with the usage recorded so far: usage beyond
+        it is added to the current window, the unused part is refunded from
+        the window the reservation was made in.
+        """
+        with self._lock:
+            reserved, self.reserved = self.reserved, {}
+            used = dict(self.used)
+        for unit, amount in reserved.items():
+            extra = used[unit] - amount
+            if extra > 0:
+                _add(self.tier, self.user_id, unit, extra)
+            else:
+                _refund(self.tier, self.user_id, unit, -extra, self.window)
+
+
+def admit(user_id, tier, reserve=True):
+    """
+    QuotaSubject for a request by user_id on tier, reserving the tier's
+    estimated cost. Raises QuotaExceeded when the estimate does not fit (a
+    user with no other recent usage is always admitted).
+
+    The estimate is added to the counters before they are checked and taken
+    back off if it does not fit, so concurrent requests always see each
+    other's reservations.
+    """
+    quota = TIER_QUOTAS[tier]
+    now = time.time()
+    index = _window(now)
+    estimate = {CALLS: quota["estimate_calls"], TOKENS: quota["estimate_tokens"]} if reserve else {}
+    for unit in UNITS:
+        needed = estimate.get(unit, 0)
+        _add(tier, user_id, unit, needed, index)
+        used = usage(tier, user_id, unit, now)
+        if used > quota[unit] and used - needed > 0:
+            for reserved_unit in UNITS[:UNITS.index(unit) + 1]:
+                _refund(tier, user_id, reserved_unit, estimate.get(reserved_unit, 0), index)
+            raise QuotaExceeded(tier, unit, quota[unit], _retry_after(tier, user_id, unit, quota[unit], needed, now))
+    return QuotaSubject(user_id, tier, estimate, index)
+
+
+def request_user_id(request):
+    """
+    Quota key for an HTTP request: the authenticated user (request.state.user_id,
+    or X-User-Id from a trusted gateway), else the client address. Requests
+    that do not come from RATE_LIMIT_TRUSTED_PROXIES are keyed on the address
+    they connect from, whatever headers they send.
+    """
+    user_id = getattr(request.state, "user_id", None)
+    if user_id:
+        return f"user:{str(user_id)[:128]}"
+    client = request.client.host if request.client else "unknown"
+    if client not in RATE_LIMIT_TRUSTED_PROXIES:
+        return f"ip:{client}"
+    user_id = (request.headers.get(USER_ID_HEADER) or "").strip()
+    if user_id:
+        return f"user:{user_id[:128]}"
+    # The gateway appends the address it saw; anything before it is client-supplied.
+    forwarded = [address.strip() for address in request.headers.get(FORWARDED_FOR_HEADER, "").split(",")]
+    return f"ip:{forwarded[-1] or client}"
+
+
+@contextmanager
+def scope(subject):
+    """Attribute LLM usage in this context to subject; settles its reservation on exit."""
+    token = _current.set(subject)
+    try:
+        yield subject
+    finally:
+        _current.reset(token)
+        subject.settle()
+
+
+def current():
+    return _current.get()
+
+
+def record_llm_usage(calls=1, tokens=0):
+    """Charge LLM usage to the request being served, if any."""
+    subject = _current.get()
+    if subject is not None:
+        subject.charge(calls, tokens)
+
+
+def quota_status(user_id):
+    """Usage and limits per tier for user_id."""
+    now = time.time()
+    return {
+        tier: {unit: {"used": round(usage(tier, user_id, unit, now)), "limit": quota[unit]} for unit in UNITS}
+        for tier, quota in TIER_QUOTAS.items()
+    }
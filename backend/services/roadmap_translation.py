@@ -0,0 +1,125 @@
+"""
+Roadmaps in another language, translated from a stored roadmap instead of
+regenerated.
+
+Regenerating a roadmap in Spanish repeats the whole planner pipeline
+(searches, summaries, the long roadmap prompt). The roadmap is already
+structured (models.roadmap.Roadmap), so translate() sends it to the
+"translate" call site's fast model tier (services.model_routing) in
+sections instead: one for the title/summary/closing and one per
+TRANSLATION_PHASES_PER_SECTION phases, all in parallel, each a small JSON
+document that is validated back into the same shape (same number of phases,
+day numbers kept from the source).
+
+Translations are cached in the cache backend per (source roadmap, target
+language), so every later request for the same variant is a cache hit, and
+the translated roadmap is remembered like a generated one (PDFs, email and
+reminders find its structure by text).
+"""
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from pydantic import ValidationError
+
+from localization import LANGUAGE_NAMES
+from models.roadmap import ROADMAP_RESPONSE_SCHEMA, Roadmap
+from services import deadline, roadmaps
+from services.cache_backend import get_cache_backend
+from services.gemini import generate_routed
+from services.sectioned_roadmap import run_concurrently
+
+TRANSLATION_WORKERS = int(os.getenv("TRANSLATION_WORKERS", "4"))
+TRANSLATION_PHASES_PER_SECTION = int(os.getenv("TRANSLATION_PHASES_PER_SECTION", "4"))
+TRANSLATION_CACHE_PREFIX = "roadmap:translation:"
+TRANSLATION_LOCK_WAIT = float(os.getenv("TRANSLATION_LOCK_WAIT", "60"))
+
+# A section may be just the header or just some phases, so nothing is required.
+TRANSLATION_GENERATION_CONFIG = {
+    "response_mime_type": "application/json",
+    "response_schema": {**ROADMAP_RESPONSE_SCHEMA, "required": []},
+}
+
+_executor = ThreadPoolExecutor(max_workers=TRANSLATION_WORKERS, thread_name_prefix="roadmap-translate")
+
+
+class TranslationError(Exception):
+    """The model's translation does not match the source roadmap."""
+
+
+def translation_cache_key(roadmap_text, language):
+    return f"{TRANSLATION_CACHE_PREFIX}{language}:{roadmaps.roadmap_digest(roadmap_text)}"
+
+
+def sections(roadmap):
+    """The roadmap split into independently translatable partial Roadmaps."""
+    header = Roadmap(title=roadmap.title, summary=roadmap.summary, closing=roadmap.closing)
+    size = max(1, TRANSLATION_PHASES_PER_SECTION)
+    chunks = [
+        Roadmap(phases=roadmap.phases[start:start + size]) for start in range(0, len(roadmap.phases), size)
+    ]
+    return ([header] if header.compact() else []) + chunks
+
+
+def translate_section(section, language):
+    """section translated into language, checked against the source shape. Raises TranslationError."""
+    deadline.check_cancelled("translation")
+    prompt = (
+        f"Translate every text value in this roadmap section into {LANGUAGE_NAMES[language]}. "
+        "Return the same JSON structure: the same fields, the same phases in the same order "
+        "with the same number of actions and tips, and the day numbers unchanged. Do not add, "
+        "drop or summarize anything. Keep names, numbers and links as they are.\n\n"
+        f"{json.dumps(section.compact(), ensure_ascii=False)}"
+    )
+    response = generate_routed("translate", prompt, generation_config=TRANSLATION_GENERATION_CONFIG)
+    try:
+        translated = Roadmap.model_validate_json(response.text)
+    except ValidationError as e:
+        raise TranslationError(f"Translated section did not validate: {e.error_count()} errors")
+    if len(translated.phases) != len(section.phases):
+        raise TranslationError(
+            f"Translated section has {len(translated.phases)} phases, expected {len(section.phases)}"
+        )
+    for source, phase in zip(section.phases, translated.phases):
+        phase.day = source.day
+    return translated
+
+
+def _translate(roadmap, language):
+    parts = sections(roadmap)
+    translated = run_concurrently(translate_section, [(part, language) for part in parts], _executor)
+    result = Roadmap()
+    for source, part in zip(parts, translated):
+        if source.phases:
+            result.phases.extend(part.phases)
+        else:
+            result.title, result.summary, result.closing = part.title, part.summary, part.closing
+    return result
+
+
+def translate(roadmap, language):
+    """
+    (text, Roadmap, cached) for roadmap (text, stored dict or Roadmap) in
+    language. Raises ValueError for an unsupported language or a source
+    that is not a valid roadmap, TranslationError for a translation that
+    does not match the source.
+    """
+    if language not in LANGUAGE_NAMES:
+        raise ValueError(f"Unsupported language: {language}")
+    source = roadmaps.structured_roadmap(roadmap)
+    key = translation_cache_key(source.to_markdown(), language)
+    cache = get_cache_backend()
+    cached = cache.get(key)
+    if cached is not None:
+        translated = Roadmap.model_validate(cached)
+        return roadmaps.remember_roadmap(translated), translated, True
+    # Concurrent requests for the same variant wait for the first one.
+    wait = deadline.call_timeout(TRANSLATION_LOCK_WAIT, "translation")
+    with cache.lock(key, ttl=TRANSLATION_LOCK_WAIT * 2, wait=wait):
+        cached = cache.get(key)
+        if cached is not None:
+            translated = Roadmap.model_validate(cached)
+            return roadmaps.remember_roadmap(translated), translated, True
+        translated = _translate(source, language)
+        cache.set(key, translated.compact(), ttl=roadmaps.ROADMAP_CACHE_TTL)
+    return roadmaps.remember_roadmap(translated), translated, False
@@ -0,0 +1,141 @@
+"""
+Structured roadmaps: generated as JSON, validated once, cached by text.
+
+Planners ask Gemini for a JSON roadmap (models.roadmap.ROADMAP_RESPONSE_SCHEMA),
+validate it into a Roadmap and return its markdown as the roadmap text.
+The structured form is cached in the cache backend under a hash of that
+text, so consumers that only get the text back (PDF downloads, email,
+reminders, history) look the structure up instead of parsing it again.
+Older or hand-written roadmaps are parsed from text once and cached the
+same way.
+"""
+import hashlib
+import json
+import os
+
+from pydantic import ValidationError
+
+from models.roadmap import ROADMAP_RESPONSE_SCHEMA, Roadmap, RoadmapPhase
+from services.cache_backend import get_cache_backend
+from services.gemini import generate_routed
+
+ROADMAP_CACHE_PREFIX = "roadmap:structured:"
+ROADMAP_CACHE_TTL = int(os.getenv("ROADMAP_CACHE_TTL", str(30 * 24 * 3600)))
+
+ROADMAP_GENERATION_CONFIG = {
+    "response_mime_type": "application/json",
+    "response_schema": ROADMAP_RESPONSE_SCHEMA,
+}
+
+
+def roadmap_digest(roadmap_text):
+    return hashlib.sha256((roadmap_text or "").strip().encode("utf-8")).hexdigest()
+
+
+def roadmap_cache_key(roadmap_text):
+    return f"{ROADMAP_CACHE_PREFIX}{roadmap_digest(roadmap_text)}"
+
+
+def remember_roadmap(roadmap):
+    """Cache the structured roadmap under its text. Returns the text."""
+    text = roadmap.to_markdown()
+    get_cache_backend().set(roadmap_cache_key(text), roadmap.compact(), ttl=ROADMAP_CACHE_TTL)
+    return text
+
+
+def structured_roadmap(roadmap):
+    """
+    Roadmap for roadmap text (or a stored compact dict, or a Roadmap),
+    from the cache when it was generated here, otherwise parsed once.
+    """
+    if isinstance(roadmap, Roadmap):
+        return roadmap
+    if isinstance(roadmap, dict):
+        return Roadmap.model_validate(roadmap)
+    cache = get_cache_backend()
+    key = roadmap_cache_key(roadmap)
+    cached = cache.get(key)
+    if cached is not None:
+        return Roadmap.model_validate(cached)
+    parsed = Roadmap.from_text(roadmap)
+    cache.set(key, parsed.compact(), ttl=ROADMAP_CACHE_TTL)
+    return parsed
+
+
+def _json_reply(text):
+    """The reply decoded as JSON (inside a ``` fence or not), or None when it is not JSON."""
+    text = (text or "").strip()
+    if text.startswith("```"):
+        text = text.split("\n", 1)[-1].rsplit("```", 1)[0]
+    try:
+        return json.loads(text)
+    except ValueError:
+        return None
+
+
+def salvage_roadmap(data):
+    """
+    (Roadmap, complete) from a JSON reply that did not validate as a whole:
+    the top-level fields and phases that do validate. complete is False when
+    something was dropped; the Roadmap is None when nothing was usable.
+    """
+    if not isinstance(data, dict):
+        return None, False
+    roadmap = Roadmap()
+    complete = True
+    for field in ("title", "summary", "closing"):
+        value = data.get(field)
+        if isinstance(value, str):
+            setattr(roadmap, field, value)
+        elif value is not None:
+            complete = False
+    phases = data.get("phases") or []
+    if not isinstance(phases, list):
+        phases, complete = [], False
+    for item in phases:
+        try:
+            roadmap.phases.append(RoadmapPhase.model_validate(item))
+        except ValidationError:
+            complete = False
+    if not (roadmap.phases or roadmap.title or roadmap.summary):
+        return None, False
+    return roadmap, complete
+
+
+def parse_roadmap_reply(text):
+    """
+    (Roadmap, complete) for a model reply. JSON that does not validate is
+    salvaged field by field (see salvage_roadmap); only a reply that is not
+    JSON at all is parsed as plain text.
+    """
+    try:
+        return Roadmap.model_validate_json(text), True
+    except ValidationError as e:
+        errors = e.error_count()
+    data = _json_reply(text)
+    if data is None:
+        print(f"Structured roadmap was not JSON, parsing as text: {errors} errors")
+        return Roadmap.from_text(text), True
+    print(f"Structured roadmap did not validate, salvaging what does: {errors} errors")
+    return salvage_roadmap(data)
+
+
+def generate_structured_roadmap(prompt, call_site="roadmap", attempts=2):
+    """
+    Ask Gemini (the model routed for call_site, see services.model_routing)
+    for a JSON roadmap and validate it. A JSON reply that only partly
+    validates is asked for again, and the last attempt keeps whatever part
+    of it validates. Raises ValueError when no reply has a usable roadmap.
+    """
+    for attempt in range(attempts):
+        response = generate_routed(call_site, prompt, generation_config=ROADMAP_GENERATION_CONFIG)
+        roadmap, complete = parse_roadmap_reply(response.text)
+        if roadmap is not None and (complete or attempt == attempts - 1):
+            return roadmap
+    raise ValueError("Gemini did not return a usable roadmap")
+
+
+def generate_roadmap_text(prompt, call_site="roadmap"):
+    """Generate a structured roadmap, cache it and return (text, roadmap)."""
+    roadmap = generate_structured_roadmap(prompt, call_site)
+    return remember_roadmap(roadmap), roadmap
@@ -0,0 +1,145 @@
+"""
+Day-by-day plans generated in sections instead of one long reply.
+
+A 21-day plan is one very long output, and output tokens dominate the time
+it takes. In sectioned mode generate_sectioned() first asks for a short
+outline of the whole plan (title, summary, closing and one line of focus
+per section), then generates every section (a week, or a single day) as a
+concurrent call given the same profile and that outline, and stitches the
+sections back together in order. Wall time is roughly the outline plus the
+slowest section rather than the whole plan.
+
+Section calls go to the plan's own call site (its model tier, see
+services.model_routing); the outline goes to the "plan_outline" call site.
+run_concurrently() runs the sections on a pool; the full roadmap's
+map-reduce mode and roadmap translation use it too.
+"""
+import contextvars
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Literal
+
+from localization import LANGUAGE_NAMES
+from models.roadmap import Roadmap
+from services import deadline, roadmaps
+
+SINGLE = "single"
+SECTIONED = "sectioned"
+GenerationMode = Literal["single", "sectioned"]
+
+PLAN_SECTION_WORKERS = int(os.getenv("PLAN_SECTION_WORKERS", "6"))
+# A section that does not cover its days exactly is generated again, up to this many times in all.
+PLAN_SECTION_ATTEMPTS = int(os.getenv("PLAN_SECTION_ATTEMPTS", "2"))
+OUTLINE_CALL_SITE = "plan_outline"
+
+_executor = ThreadPoolExecutor(max_workers=PLAN_SECTION_WORKERS, thread_name_prefix="plan-section")
+
+
+def run_concurrently(fn, calls, executor=None):
+    """
+    [fn(*args) for args in calls], run in executor (the section pool by
+    default) with the caller's context (deadline, quota, usage tags). The
+    first failure is raised.
+    """
+    executor = executor or _executor
+    futures = [executor.submit(contextvars.copy_context().run, fn, *args) for args in calls]
+    try:
+        return [future.result() for future in futures]
+    finally:
+        for future in futures:
+            future.cancel()  # calls not started yet, once one has failed
+
+
+def resolve_mode(mode, default):
+    """mode, else default; raises ValueError for an unknown mode."""
+    mode = mode or default
+    if mode not in (SINGLE, SECTIONED):
+        raise ValueError(f"Unknown generation mode: {mode}")
+    return mode
+
+
+def _days(first, last):
+    return f"Day {first}" if first == last else f"Day {first} to Day {last}"
+
+
+def _language_line(language):
+    if language == "en":
+        return ""
+    return f"\nWrite everything in {LANGUAGE_NAMES.get(language, 'English')}."
+
+
+def generate_outline(context, sections, language="en"):
+    """Short outline: title, summary, closing and one phase per section."""
+    lines = "\n".join(
+        f"- {label} ({_days(first, last)}){f': {theme}' if theme else ''}" for label, first, last, theme in sections
+    )
+    prompt = (
+        f"{context}\n\n"
+        "Before the plan is written in detail, give only its outline: a title, a short summary, "
+        "a closing note, and one phase per section below, in order, with the section as its title, "
+        "its goal in one sentence and two or three key themes as its actions. No daily detail.\n"
+        f"{lines}{_language_line(language)}"
+    )
+    return roadmaps.generate_structured_roadmap(prompt, OUTLINE_CALL_SITE)
+
+
+def cover_days(phases, first, last):
+    """
+    phases in day order when they are exactly one per day from first to
+    last, else None. Phases with no day numbers at all, but the right count,
+    are numbered in order.
+    """
+    expected = list(range(first, last + 1))
+    if len(phases) != len(expected):
+        return None
+    if all(phase.day is None for phase in phases):
+        for day, phase in zip(expected, phases):
+            phase.day = day
+        return phases
+    if sorted(phase.day or 0 for phase in phases) != expected:
+        return None
+    return sorted(phases, key=lambda phase: phase.day)
+
+
+def generate_section(context, outline, section, call_site, language="en"):
+    """
+    The phases of one section, one per day, numbered within the section's
+    days. Raises ValueError when no attempt covers each day exactly once.
+    """
+    label, first, last, theme = section
+    prompt = (
+        f"{context}\n\n"
+        f"The plan's outline, shared by every section:\n{outline.to_markdown()}\n\n"
+        f"Write only {label} ({_days(first, last)}){f', focused on {theme}' if theme else ''}. "
+        f"Give one phase per day from Day {first} to Day {last} with its day number, the day's goal, "
+        "its actionable tasks (including progress milestones and a reflection question) and tips "
+        "covering potential challenges and solutions. Build on the outline without repeating the "
+        "other sections. Leave the title, summary and closing empty."
+        f"{_language_line(language)}"
+    )
+    for attempt in range(PLAN_SECTION_ATTEMPTS):
+        deadline.check_cancelled("sections")
+        phases = roadmaps.generate_structured_roadmap(prompt, call_site).phases
+        covered = cover_days(phases, first, last)
+        if covered is not None:
+            return covered
+        print(f"{label} came back with days {[phase.day for phase in phases]}, expected {_days(first, last)}")
+    raise ValueError(f"{label} did not cover {_days(first, last)} after {PLAN_SECTION_ATTEMPTS} attempts")
+
+
+def generate_sectioned(context, sections, call_site, language="en"):
+    """
+    Roadmap for context (the profile part of the plan prompt) generated as
+    an outline plus one concurrent call per section. sections are
+    (label, first day, last day, theme or None) in plan order.
+    """
+    outline = generate_outline(context, sections, language)
+    parts = run_concurrently(
+        generate_section, [(context, outline, section, call_site, language) for section in sections]
+    )
+    return Roadmap(
+        title=outline.title,
+        summary=outline.summary,
+        phases=[phase for phases in parts for phase in phases],
+        closing=outline.closing,
+    )
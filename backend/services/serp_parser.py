@@ -0,0 +1,107 @@
+"""
+Streaming extraction of results from Google's basic-HTML results page.
+
+scrape_web only needs a handful of (title, snippet, link) triples, so rather
+than building a full BeautifulSoup tree this walks the page once with the
+stdlib tokenizer, keeping just a stack of open tags. It matches what the
+tree-based code looked for:
+
+- a title is a <div class="BNeawe vvjwJb AP7Wnd">, linked by its nearest
+  enclosing <a href>;
+- its snippet is the first later sibling <div class="BNeawe s3v9rd AP7Wnd">.
+
+The page is fed in chunks and parsing stops as soon as max_results results
+are complete, so the scripts and styles after them are never tokenized.
+"""
+from html.parser import HTMLParser
+
+TITLE_CLASS = "BNeawe vvjwJb AP7Wnd"
+SNIPPET_CLASS = "BNeawe s3v9rd AP7Wnd"
+FEED_CHUNK_CHARS = 16 * 1024
+
+# Elements that never have an end tag, so never stay on the stack.
+VOID_ELEMENTS = frozenset(
+    "area base br col embed hr img input link meta param source track wbr".split()
+)
+
+
+class _Done(Exception):
+    pass
+
+
+class _ResultParser(HTMLParser):
+    def __init__(self, max_results):
+        super().__init__(convert_charrefs=True)
+        self.max_results = max_results
+        self.results = []
+        self._stack = []       # [tag, href] per open element
+        self._capture = None   # ("title" | "snippet", stack depth, text parts)
+        self._pending = None   # (title, link, depth of the title's parent) awaiting a snippet
+
+    def handle_starttag(self, tag, attrs):
+        if tag in VOID_ELEMENTS:
+            return
+        href = None
+        if tag == "a":
+            href = dict(attrs).get("href")
+        self._stack.append([tag, href])
+        if tag != "div" or self._capture is not None:
+            return
+        css_class = dict(attrs).get("class")
+        if css_class == TITLE_CLASS:
+            self._capture = ("title", len(self._stack), [])
+        elif css_class == SNIPPET_CLASS and self._pending and self._pending[2] == len(self._stack) - 1:
+            self._capture = ("snippet", len(self._stack), [])
+
+    def handle_startendtag(self, tag, attrs):
+        pass  # <div/> and friends: nothing to close or capture
+
+    def handle_endtag(self, tag):
+        # Close up to the matching open tag, the way a tree builder would
+        # treat missing end tags; stray end tags are ignored.
+        for index in range(len(self._stack) - 1, -1, -1):
+            if self._stack[index][0] == tag:
+                break
+        else:
+            return
+        while len(self._stack) > index:
+            self._close_top()
+
+    def handle_data(self, data):
+        if self._capture is not None:
+            self._capture[2].append(data)
+
+    def _close_top(self):
+        depth = len(self._stack)
+        if self._capture is not None and self._capture[1] == depth:
+            kind, _, parts = self._capture
+            self._capture = None
+            text = "".join(parts)
+            if kind == "title":
+                link = next((href for tag, href in reversed(self._stack) if tag == "a"), None)
+                self._pending = (text, link, depth - 1)
+            else:
+                title, link, _ = self._pending
+                self._pending = None
+                if title and text:
+                    self.results.append({"title": title, "snippet": text, "link": link})
+                    if len(self.results) >= self.max_results:
+                        raise _Done
+        self._stack.pop()
+        if self._pending is not None and self._pending[2] == depth:
+            self._pending = None  # the title's parent closed without a snippet sibling
+
+
+def extract_results(html, max_results):
+    """
+    Up to max_results {"title", "snippet", "link"} dicts from a results page,
+    in page order. link is the raw href (None when the title is not linked).
+    """
+    parser = _ResultParser(max_results)
+    try:
+        for start in range(0, len(html), FEED_CHUNK_CHARS):
+            parser.feed(html[start:start + FEED_CHUNK_CHARS])
+        parser.close()
+    except _Done:
+        pass
+    return parser.results
@@ -0,0 +1,133 @@
+"""
+Local relevance ranking for search snippets, before they are summarized.
+
+Snippets are scored against the query with BM25 (the candidate snippets are
+the corpus), near-duplicates are dropped by word-shingle Jaccard similarity,
+and only the top-k that fit in a character budget are kept. Everything runs
+locally; nothing here calls the network.
+"""
+import math
+import os
+import re
+
+SNIPPET_TOP_K = int(os.getenv("SNIPPET_TOP_K", "4"))
+SNIPPET_CHAR_BUDGET = int(os.getenv("SNIPPET_CHAR_BUDGET", "1200"))
+# Snippets at least this similar (shingle Jaccard) to a better one are dropped.
+DUPLICATE_SIMILARITY = float(os.getenv("SNIPPET_DUPLICATE_SIMILARITY", "0.6"))
+# When no snippet shares a term with the query (e.g. it is phrased differently
+# or in another language), this many are still kept, in search-engine order.
+SNIPPET_FALLBACK_K = int(os.getenv("SNIPPET_FALLBACK_K", "2"))
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+SHINGLE_SIZE = 3
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+STOPWORDS = frozenset("""
+a an and are as at be by for from has have in is it its of on or that the to was were will with you your
+el la los las de del en y o que un una por para con su sus es
+""".split())
+
+
+def tokenize(text):
+    return [t for t in TOKEN_RE.findall((text or "").lower()) if t not in STOPWORDS]
+
+
+def shingles(tokens, size=SHINGLE_SIZE):
+    if len(tokens) < size:
+        return {tuple(tokens)} if tokens else set()
+    return {tuple(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+
+
+def jaccard(a, b):
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def bm25_scores(query_tokens, documents):
+    """BM25 score of each tokenized document for the query tokens."""
+    n = len(documents)
+    if n == 0:
+        return []
+    avg_len = sum(len(doc) for doc in documents) / n or 1
+    doc_freq = {}
+    for doc in documents:
+        for term in set(doc):
+            doc_freq[term] = doc_freq.get(term, 0) + 1
+
+    scores = []
+    for doc in documents:
+        counts = {}
+        for term in doc:
+            counts[term] = counts.get(term, 0) + 1
+        score = 0.0
+        for term in set(query_tokens):
+            tf = counts.get(term)
+            if not tf:
+                continue
+            df = doc_freq[term]
+            idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+            score += idf * tf * (BM25_K1 + 1) / (tf + BM25_K1 * (1 - BM25_B + BM25_B * len(doc) / avg_len))
+        scores.append(score)
+    return scores
+
+
+def _clip(text, max_chars):
+    if len(text) <= max_chars:
+        return text
+    cut = text[: max_chars - 1]
+    if " " in cut:
+        cut = cut[: cut.rfind(" ")]
+    return cut.rstrip(" ,;:") + "…"
+
+
+def rank_snippets(query, results, top_k=SNIPPET_TOP_K, char_budget=SNIPPET_CHAR_BUDGET):
+    """
+    Select the results worth summarizing, best first.
+
+    results are {"title", "snippet", "link"} dicts. Results that share no
+    terms with the query are dropped as off-topic (unless none do, then the
+    first SNIPPET_FALLBACK_K are kept), near-duplicates of a better result
+    are dropped, and at most top_k results whose snippets fit in
+    char_budget are returned (the first one is clipped if it alone is over
+    budget). Each returned result gains a "score".
+    """
+    candidates = [r for r in results if r.get("snippet")]
+    if not candidates:
+        return []
+    query_tokens = tokenize(query)
+    snippet_tokens = [tokenize(r["snippet"]) for r in candidates]
+    scores = bm25_scores(query_tokens, [
+        tokenize(r.get("title") or "") + tokens for r, tokens in zip(candidates, snippet_tokens)
+    ])
+
+    order = sorted(range(len(candidates)), key=lambda i: scores[i], reverse=True)
+    fallback_k = 0 if any(score > 0 for score in scores) else SNIPPET_FALLBACK_K
+    selected = []
+    kept_shingles = []
+    used_chars = 0
+    for i in order:
+        if len(selected) >= top_k or (scores[i] <= 0 and len(selected) >= fallback_k):
+            break
+        doc_shingles = shingles(snippet_tokens[i])
+        if any(jaccard(doc_shingles, seen) >= DUPLICATE_SIMILARITY for seen in kept_shingles):
+            continue
+        snippet = candidates[i]["snippet"]
+        if used_chars + len(snippet) > char_budget:
+            if selected:
+                continue  # a shorter, lower-ranked snippet may still fit
+            snippet = _clip(snippet, char_budget)
+        selected.append({**candidates[i], "snippet": snippet, "score": round(scores[i], 3)})
+        kept_shingles.append(doc_shingles)
+        used_chars += len(snippet)
+
+    print(
+        f"Snippets for {query[:80]!r}: kept {len(selected)} of {len(candidates)}, "
+        f"{used_chars}/{sum(len(r['snippet']) for r in candidates)} chars"
+    )
+    return selected
+
+
+def combine_snippets(results):
+    return " ".join(r["snippet"] for r in results)
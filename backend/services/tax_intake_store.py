@@ -0,0 +1,141 @@
+import json
+import os
+import time
+import uuid
+
+from tax_analysis import TAX_ANALYSIS_FIELDS
+from utils.sqlite import connect
+
+TAX_INTAKE_DB_PATH = os.getenv("TAX_INTAKE_DB", "tax_intake.db")
+
+# Columns that get their own (indexed) column for lookups; every answer is
+# also kept in `answers` as JSON.
+INDEXED_FIELDS = ("email_address", "cell_phone", "full_name", "tax_advisor", "client_status")
+
+
+def _init_db():
+    with connect(TAX_INTAKE_DB_PATH) as conn:
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS tax_intake (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                batch_id TEXT NOT NULL,
+                source TEXT NOT NULL,
+                email_address TEXT,
+                cell_phone TEXT,
+                full_name TEXT,
+                tax_advisor TEXT,
+                client_status TEXT,
+                answers TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+            """
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS tax_intake_email ON tax_intake (email_address)")
+        conn.execute("CREATE INDEX IF NOT EXISTS tax_intake_phone ON tax_intake (cell_phone)")
+        conn.execute("CREATE INDEX IF NOT EXISTS tax_intake_advisor ON tax_intake (tax_advisor, created_at)")
+        conn.execute("CREATE INDEX IF NOT EXISTS tax_intake_batch ON tax_intake (batch_id)")
+
+
+_init_db()
+
+
+def new_batch_id():
+    return uuid.uuid4().hex
+
+
+_INSERT_SQL = f"""
+    INSERT INTO tax_intake (batch_id, source, {", ".join(INDEXED_FIELDS)}, answers, created_at)
+    VALUES (?, ?, {", ".join("?" for _ in INDEXED_FIELDS)}, ?, ?)
+"""
+
+
+def _record_row(record, batch_id, source, now):
+    return (
+        batch_id,
+        source,
+        *(record.get(field) or None for field in INDEXED_FIELDS),
+        json.dumps({field: record.get(field) or "" for field in TAX_ANALYSIS_FIELDS}),
+        now,
+    )
+
+
+def insert_record(record, batch_id, source):
+    """Store one validated flat record (field key -> answer). Returns its id."""
+    with connect(TAX_INTAKE_DB_PATH) as conn:
+        cursor = conn.execute(_INSERT_SQL, _record_row(record, batch_id, source, time.time()))
+        return cursor.lastrowid
+
+
+def insert_records(records, batch_id, source):
+    """Store a batch of validated flat records in one transaction."""
+    now = time.time()
+    with connect(TAX_INTAKE_DB_PATH) as conn:
+        conn.executemany(_INSERT_SQL, [_record_row(record, batch_id, source, now) for record in records])
+    return len(records)
+
+
+def _row_to_record(row):
+    return {
+        "id": row["id"],
+        "batch_id": row["batch_id"],
+        "source": row["source"],
+        "answers": json.loads(row["answers"]),
+        "created_at": row["created_at"],
+    }
+
+
+def get_record(record_id):
+    with connect(TAX_INTAKE_DB_PATH) as conn:
+        row = conn.execute("SELECT * FROM tax_intake WHERE id = ?", (record_id,)).fetchone()
+    return _row_to_record(row) if row else None
+
+
+def find_records(email_address=None, cell_phone=None, tax_advisor=None, limit=100):
+    clauses, params = [], []
+    for column, value in (("email_address", email_address), ("cell_phone", cell_phone), ("tax_advisor", tax_advisor)):
+        if value:
+            clauses.append(f"{column} = ?")
+            params.append(value)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    with connect(TAX_INTAKE_DB_PATH) as conn:
+        rows = conn.execute(
+            f"SELECT * FROM tax_intake {where} ORDER BY id DESC LIMIT ?", (*params, limit)
+        ).fetchall()
+    return [_row_to_record(row) for row in rows]
+
+
+def iter_records(record_ids=None, batch_id=None, page_size=500):
+    """
+    Stream stored records in id order, one short query per page, so callers
+    can walk the whole store without loading it.
+    """
+    if record_ids is not None:
+        record_ids = list(record_ids)
+        for start in range(0, len(record_ids), page_size):
+            page = record_ids[start:start + page_size]
+            with connect(TAX_INTAKE_DB_PATH) as conn:
+                rows = conn.execute(
+                    f"SELECT * FROM tax_intake WHERE id IN ({', '.join('?' for _ in page)}) ORDER BY id", page
+                ).fetchall()
+            for row in rows:
+                yield _row_to_record(row)
+        return
+
+    last_id = 0
+    while True:
+        with connect(TAX_INTAKE_DB_PATH) as conn:
+            if batch_id:
+                rows = conn.execute(
+                    "SELECT * FROM tax_intake WHERE batch_id = ? AND id > ? ORDER BY id LIMIT ?",
+                    (batch_id, last_id, page_size),
+                ).fetchall()
+            else:
+                rows = conn.execute(
+                    "SELECT * FROM tax_intake WHERE id > ? ORDER BY id LIMIT ?", (last_id, page_size)
+                ).fetchall()
+        if not rows:
+            return
+        for row in rows:
+            yield _row_to_record(row)
+        last_id = rows[-1]["id"]
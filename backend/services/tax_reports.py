@@ -0,0 +1,115 @@
+"""
+Tax analysis reports: one letterhead PDF per questionnaire.
+
+Single reports are rendered in-process (CLI, email). Batch mode renders
+stored questionnaires (services.tax_intake_store) across a process pool and
+writes them to a directory or a ZIP archive:
+
+    python -m services.tax_reports --out reports/
+    python -m services.tax_reports --out reports.zip --batch-id <id> --workers 8
+"""
+import argparse
+import os
+import re
+import time
+import zipfile
+
+from services import tax_intake_store
+from services.mailer import send_email
+from tax_analysis import nest_tax_analysis
+from utils.parallel import bounded_submit, spawn_process_pool
+from utils.pdf_letterhead import generate_tax_analysis_pdf_with_letterhead
+
+TAX_REPORT_WORKERS = int(os.getenv("TAX_REPORT_WORKERS", str(os.cpu_count() or 2)))
+# Renders queued ahead of the one being written, per worker.
+TAX_REPORT_WINDOW_PER_WORKER = 2
+
+
+def render_tax_report(analysis):
+    """Letterhead PDF bytes for a nested tax analysis."""
+    return generate_tax_analysis_pdf_with_letterhead(analysis)
+
+
+def send_email_with_pdf(customer_data, recipient_email):
+    """Email the tax analysis to recipient_email as a letterhead PDF."""
+    name = (customer_data.get("Personal Information") or {}).get("Full Name") or "there"
+    send_email(
+        recipient_email,
+        "Your Tax Analysis from TaxNerdGPT",
+        f"Hi {name},\n\nPlease find attached your tax analysis questionnaire.",
+        attachments=[(render_tax_report(customer_data), "tax_analysis.pdf")],
+    )
+
+
+def tax_report_filename(record):
+    name = record["answers"].get("full_name") or ""
+    slug = re.sub(r"[^a-z0-9]+", "_", name.lower()).strip("_")[:40]
+    return f"tax_analysis_{record['id']}{'_' + slug if slug else ''}.pdf"
+
+
+def _render_record(record):
+    """Runs in a pool worker. Returns (filename, PDF bytes)."""
+    return tax_report_filename(record), render_tax_report(nest_tax_analysis(record["answers"]))
+
+
+def render_tax_reports(records, output, workers=TAX_REPORT_WORKERS):
+    """
+    Render every record and write the PDFs to `output`: a directory, or a
+    ZIP archive when the path ends in .zip. Records are rendered across
+    `workers` processes (in-process when workers <= 1) with a bounded number
+    in flight. Returns counts of rendered and failed reports.
+    """
+    if output.lower().endswith(".zip"):
+        archive = zipfile.ZipFile(output, mode="w", compression=zipfile.ZIP_STORED)
+        write = archive.writestr
+    else:
+        archive = None
+        os.makedirs(output, exist_ok=True)
+
+        def write(filename, pdf_bytes):
+            with open(os.path.join(output, filename), "wb") as f:
+                f.write(pdf_bytes)
+
+    rendered = failed = 0
+    try:
+        if workers <= 1:
+            for record in records:
+                try:
+                    write(*_render_record(record))
+                    rendered += 1
+                except Exception as e:
+                    print(f"Tax report failed for record {record['id']}: {e}")
+                    failed += 1
+        else:
+            with spawn_process_pool(workers) as pool:
+                for record, future in bounded_submit(pool, _render_record, records, workers * TAX_REPORT_WINDOW_PER_WORKER):
+                    try:
+                        write(*future.result())
+                        rendered += 1
+                    except Exception as e:
+                        print(f"Tax report failed for record {record['id']}: {e}")
+                        failed += 1
+    finally:
+        if archive is not None:
+            archive.close()
+    return {"rendered": rendered, "failed": failed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render stored tax analysis questionnaires as letterhead PDFs.")
+    parser.add_argument("--out", required=True, help="output directory, or a .zip archive path")
+    parser.add_argument("--batch-id", help="only records from this intake batch")
+    parser.add_argument("--ids", nargs="+", type=int, help="only these record ids")
+    parser.add_argument("--workers", type=int, default=TAX_REPORT_WORKERS)
+    args = parser.parse_args()
+
+    started = time.time()
+    records = tax_intake_store.iter_records(record_ids=args.ids, batch_id=args.batch_id)
+    counts = render_tax_reports(records, args.out, args.workers)
+    elapsed = time.time() - started
+    rate = counts["rendered"] / elapsed if elapsed > 0 else 0
+    print(f"Tax reports: {counts} in {elapsed:.1f}s ({rate:.1f} reports/s) -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+import os
+import threading
+import time
+
+from services import model_routing
+from services.gemini import get_model
+from services.http import warm_connections
+
+# Models the planners build on their first request (every routed model).
+WARMUP_MODELS = model_routing.all_models()
+
+# Set WARMUP_NETWORK=0 to skip outbound connection warm-up (e.g. offline dev).
+WARMUP_NETWORK = os.getenv("WARMUP_NETWORK", "1") != "0"
+# Failed steps are retried every WARMUP_RETRY_INTERVAL seconds for up to
+# WARMUP_RETRY_SECONDS; after that the worker goes into rotation degraded.
+WARMUP_RETRY_SECONDS = float(os.getenv("WARMUP_RETRY_SECONDS", "30"))
+WARMUP_RETRY_INTERVAL = float(os.getenv("WARMUP_RETRY_INTERVAL", "5"))
+WARMUP_CALL_TIMEOUT = 10
+
+_stop = threading.Event()
+
+_state_lock = threading.Lock()
+_state = {
+    "ready": False,
+    "status": "warming",
+    "failed_steps": [],
+    "started_at": None,
+    "finished_at": None,
+    "steps": {},
+}
+
+
+def readiness():
+    """Snapshot of the warm-up state for the /ready endpoint."""
+    with _state_lock:
+        return {**_state, "steps": dict(_state["steps"])}
+
+
+def _record(step, ok, detail=None):
+    with _state_lock:
+        _state["steps"][step] = {"ok": ok, "detail": detail}
+
+
+def _warm_models():
+    failed = {}
+    for model_name in WARMUP_MODELS:
+        try:
+            model = get_model(model_name)
+            if WARMUP_NETWORK:
+                # count_tokens is free and goes through the same client as
+                # generate_content, so it authenticates and opens the
+                # connection the first planner call would otherwise pay for.
+                model.count_tokens("warm-up", request_options={"timeout": WARMUP_CALL_TIMEOUT})
+        except Exception as e:
+            failed[model_name] = str(e)
+    if failed:
+        raise RuntimeError(f"Could not warm up {len(failed)} of {len(WARMUP_MODELS)} models: {failed}")
+    return {"models": len(WARMUP_MODELS), "network": WARMUP_NETWORK}
+
+
+def _warm_pdf():
+    # Rendering a tiny document parses the letterhead into the template cache
+    # and loads the reportlab font metrics used by the roadmap PDFs.
+    from utils.pdf_letterhead import DEFAULT_TEMPLATE_PATH, generate_roadmap_pdf_with_letterhead
+
+    generate_roadmap_pdf_with_letterhead(
+        "Day 1:\nWarm-up",
+        output_title="Warm-up",
+        template_path=DEFAULT_TEMPLATE_PATH,
+    )
+
+
+def _warm_network():
+    status = warm_connections()
+    if not any(status.values()):
+        raise ConnectionError(f"No outbound host reachable: {status}")
+    return status
+
+
+def _run_step(name, step):
+    started = time.perf_counter()
+    try:
+        detail = step()
+        _record(name, True, detail)
+        return True
+    except Exception as e:
+        print(f"Warm-up step {name} failed: {e}")
+        _record(name, False, str(e))
+        return False
+    finally:
+        with _state_lock:
+            _state["steps"][name]["seconds"] = round(time.perf_counter() - started, 3)
+
+
+def warm_up():
+    """
+    Pre-build the expensive per-process resources before traffic arrives.
+
+    Failed steps are retried for up to WARMUP_RETRY_SECONDS. If some still
+    fail, the worker goes into rotation anyway with status "degraded" and
+    the failed steps listed, since every resource is also built lazily on
+    first use; status is "ready" only when every step succeeded.
+    """
+    with _state_lock:
+        _state["started_at"] = time.time()
+
+    steps = [("gemini_models", _warm_models), ("pdf_letterhead", _warm_pdf)]
+    if WARMUP_NETWORK:
+        steps.append(("outbound_connections", _warm_network))
+
+    give_up_at = time.monotonic() + WARMUP_RETRY_SECONDS
+    pending = steps
+    while True:
+        pending = [(name, step) for name, step in pending if not _run_step(name, step)]
+        if not pending or time.monotonic() + WARMUP_RETRY_INTERVAL > give_up_at:
+            break
+        if _stop.wait(WARMUP_RETRY_INTERVAL):
+            return  # shutting down
+
+    with _state_lock:
+        _state["ready"] = True
+        _state["status"] = "degraded" if pending else "ready"
+        _state["failed_steps"] = [name for name, _ in pending]
+        _state["finished_at"] = time.time()
+
+
+def stop_warm_up():
+    """Stop retrying failed steps (app shutdown)."""
+    _stop.set()
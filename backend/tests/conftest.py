@@ -0,0 +1,20 @@
+"""
+Unit tests for the backend services. Install requirements-dev.txt (from
+the repository root), then run from backend/:
+
+    python -m pytest -q tests
+"""
+import os
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+# Keep tests off shared state: in-process cache, throwaway SQLite stores.
+_tmp = tempfile.mkdtemp(prefix="backend-tests-")
+os.environ.setdefault("CACHE_BACKEND", "memory")
+os.environ.setdefault("LLM_USAGE_DB", os.path.join(_tmp, "llm_usage.db"))
+os.environ.setdefault("PLANNER_JOB_DB", os.path.join(_tmp, "planner_jobs.db"))
+os.environ.setdefault("LOCATION_INDEX_DB", os.path.join(_tmp, "location_index.db"))
+os.environ.setdefault("TAX_INTAKE_DB", os.path.join(_tmp, "tax_intake.db"))
@@ -0,0 +1,37 @@
+import pytest
+
+from services import document_store
+from services.bulk_export import load_saved_roadmap, roadmap_filename
+from services.document_store import HISTORY, REMINDERS, FileDocumentStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = FileDocumentStore({HISTORY: str(tmp_path / "history"), REMINDERS: str(tmp_path / "reminders")})
+    document_store.set_document_store(store)
+    yield store
+    document_store.set_document_store(None)
+
+
+def test_roadmap_filename_slugs_plan_type():
+    assert roadmap_filename("u1", {"plan_type": "21day"}) == "u1_21day_roadmap.pdf"
+    assert roadmap_filename("u1", {}) == "u1_roadmap_roadmap.pdf"
+    name = roadmap_filename("u1", {"plan_type": "../../etc/passwd"})
+    assert "/" not in name and ".." not in name
+    assert roadmap_filename("u1", {"plan_type": "/.."}) == "u1_roadmap_roadmap.pdf"
+
+
+@pytest.mark.parametrize("user_id", ["", "../x", "a/b", ".hidden"])
+def test_load_saved_roadmap_rejects_path_user_ids(store, user_id):
+    with pytest.raises(ValueError):
+        load_saved_roadmap(user_id)
+
+
+def test_load_saved_roadmap_reads_the_document_store(store):
+    with pytest.raises(FileNotFoundError):
+        load_saved_roadmap("u1")
+    store.put(HISTORY, "u1", {"plan_type": "21day", "final_roadmap": ""})
+    with pytest.raises(ValueError):
+        load_saved_roadmap("u1")
+    store.put(HISTORY, "u1", {"plan_type": "21day", "final_roadmap": "Day 1: start"})
+    assert load_saved_roadmap("u1")["final_roadmap"] == "Day 1: start"
@@ -0,0 +1,66 @@
+import time
+
+import pytest
+
+from services.cache_backend import CacheBackend, MemoryCacheBackend, RedisCacheBackend
+
+
+def memory_backend():
+    return MemoryCacheBackend()
+
+
+def redis_backend():
+    fakeredis = pytest.importorskip("fakeredis")
+    return RedisCacheBackend(client=fakeredis.FakeRedis(), prefix="test:")
+
+
+@pytest.fixture(params=[memory_backend, redis_backend], ids=["memory", "redis"])
+def cache(request):
+    return request.param()
+
+
+def test_interface_is_abstract():
+    with pytest.raises(TypeError):
+        CacheBackend()
+
+
+def test_get_set_delete(cache):
+    assert cache.get("missing") is None
+    cache.set("k", {"a": [1, 2]})
+    assert cache.get("k") == {"a": [1, 2]}
+    cache.set("p:1", 1)
+    cache.set("p:2", 2)
+    assert cache.delete_prefix("p:") == 2
+    assert cache.delete("k", "missing") == 1
+    assert cache.get("k") is None
+
+
+def test_ttl_expires(cache):
+    cache.set("k", 1, ttl=0.05)
+    time.sleep(0.1)
+    assert cache.get("k") is None
+
+
+def test_add_only_sets_new_keys(cache):
+    assert cache.add("k", 1)
+    assert not cache.add("k", 2)
+    assert cache.get("k") == 1
+
+
+def test_incr_counts_and_keeps_first_ttl(cache):
+    assert cache.incr("n", 2, ttl=0.2) == 2
+    time.sleep(0.1)
+    assert cache.incr("n", 3, ttl=0.2) == 5  # the expiry is not pushed back
+    assert cache.get("n") == 5
+    time.sleep(0.15)
+    assert cache.get("n") is None
+    assert cache.incr("n", -1) == -1
+
+
+def test_lock_is_exclusive_and_released(cache):
+    with cache.lock("job", ttl=5) as acquired:
+        assert acquired
+        with cache.lock("job", ttl=5, wait=0.05, poll=0.01) as second:
+            assert not second
+    with cache.lock("job", ttl=5) as again:
+        assert again
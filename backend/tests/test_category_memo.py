@@ -0,0 +1,41 @@
+import pytest
+
+from routers import life_planner
+
+CATEGORY = "Tax Planning"
+
+
+def category_prompt(monkeypatch, user_data):
+    prompts = []
+
+    def summarize(prompt, call_site="summarize"):
+        prompts.append(prompt)
+        return "advice"
+
+    monkeypatch.setattr(life_planner, "gemini_summarize", summarize)
+    life_planner.conversational_life_plan_reply(user_data, "research", f"{CATEGORY} (Insight)")
+    return prompts[0]
+
+
+def test_prompt_only_uses_what_the_memo_key_hashes(monkeypatch):
+    base = {
+        "Career": "Nurse",
+        "Desired Location": "Austin",
+        "Current Age": "30",
+        f"{CATEGORY} Insight": "I file late",
+    }
+    other_user = {**base, "Name": "Someone Else", "Challenges": "private detail", "Investment Insight": "x"}
+
+    assert life_planner.category_memo_key(CATEGORY, base) == life_planner.category_memo_key(CATEGORY, other_user)
+    assert category_prompt(monkeypatch, base) == category_prompt(monkeypatch, other_user)
+    assert "private detail" not in category_prompt(monkeypatch, other_user)
+
+
+@pytest.mark.parametrize("change", [
+    {"Career": "nurse"},
+    {"Career": " ", "career": "Teacher"},
+    {f"{CATEGORY} Foresight": "Buy a house"},
+])
+def test_any_prompt_input_changes_the_memo_key(change):
+    base = {"Career": "Nurse", "Desired Location": "Austin", "age": "30"}
+    assert life_planner.category_memo_key(CATEGORY, base) != life_planner.category_memo_key(CATEGORY, {**base, **change})
@@ -0,0 +1,105 @@
+import importlib
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from services import circuit_breaker
+from services.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+from services.deadline import DeadlineExceeded
+
+
+def fail():
+    raise RuntimeError("down")
+
+
+def test_opens_after_threshold_and_fails_fast():
+    breaker = CircuitBreaker("t", failure_threshold=2, reset_seconds=60, slow_call_seconds=0)
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            breaker.call(fail)
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.call(lambda: "never")
+
+
+def test_half_open_trial_closes_or_reopens():
+    breaker = CircuitBreaker("t", failure_threshold=1, reset_seconds=0.01, slow_call_seconds=0)
+    with pytest.raises(RuntimeError):
+        breaker.call(fail)
+    time.sleep(0.02)
+    assert breaker.state == HALF_OPEN
+    with pytest.raises(RuntimeError):
+        breaker.call(fail)
+    assert breaker.state == OPEN
+    time.sleep(0.02)
+    assert breaker.call(lambda: "ok") == "ok"
+    assert breaker.state == CLOSED
+
+
+def test_slow_success_counts_only_with_a_threshold():
+    slow = CircuitBreaker("t", failure_threshold=1, reset_seconds=60, slow_call_seconds=0.001)
+    slow.call(time.sleep, 0.01)
+    assert slow.state == OPEN
+    untimed = CircuitBreaker("t", failure_threshold=1, reset_seconds=60, slow_call_seconds=0)
+    untimed.call(time.sleep, 0.01)
+    assert untimed.state == CLOSED
+
+
+def test_deadline_and_interrupts_are_not_failures():
+    breaker = CircuitBreaker("t", failure_threshold=1, reset_seconds=60, slow_call_seconds=0)
+
+    def out_of_time():
+        raise DeadlineExceeded("test")
+
+    def interrupted():
+        raise KeyboardInterrupt
+
+    with pytest.raises(DeadlineExceeded):
+        breaker.call(out_of_time)
+    with pytest.raises(KeyboardInterrupt):
+        breaker.call(interrupted)
+    assert breaker.state == CLOSED
+
+
+def test_slow_threshold_per_dependency():
+    assert circuit_breaker.slow_call_seconds("search:cse") == circuit_breaker.BREAKER_SLOW_CALL_SECONDS
+    assert circuit_breaker.slow_call_seconds("gemini:models/x") == 0
+    assert circuit_breaker.get_breaker("gemini:test-model").slow_call_seconds == 0
+
+
+def test_interrupted_trial_is_released():
+    breaker = CircuitBreaker("t", failure_threshold=1, reset_seconds=0.01, slow_call_seconds=0)
+    with pytest.raises(RuntimeError):
+        breaker.call(fail)
+    time.sleep(0.02)
+
+    def interrupted():
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        breaker.call(interrupted)
+    assert not breaker.is_open()
+    assert breaker.call(lambda: "ok") == "ok"
+    assert breaker.state == CLOSED
+
+
+@pytest.mark.parametrize("module, path, generator, body", [
+    ("lifeplanner21day", "/planner/21day", "generate_21day_roadmap", {
+        field: "x" for field in
+        ("name", "main_goal", "obstacles", "support", "relationship", "wellness", "personal_life", "notes")
+    }),
+    ("lifeplanner3day", "/planner/3day", "gemini_3day_roadmap", {"Name": "Ana"}),
+])
+def test_planners_answer_503_while_gemini_is_down(monkeypatch, module, path, generator, body):
+    router_module = importlib.import_module(f"routers.{module}")
+
+    def unavailable(*args, **kwargs):
+        raise CircuitOpenError("gemini:model", 12.2)
+
+    monkeypatch.setattr(router_module, generator, unavailable)
+    app = FastAPI()
+    app.include_router(router_module.router, prefix="/planner")
+    response = TestClient(app).post(path, json=body)
+    assert response.status_code == 503 and response.headers["Retry-After"] == "13"
@@ -0,0 +1,75 @@
+import asyncio
+import time
+
+import pytest
+
+from services import deadline
+from services.deadline import Deadline, DeadlineExceeded, RequestCancelled
+
+
+def test_parse_timeout():
+    assert deadline.parse_timeout(None, 30) == 30
+    assert deadline.parse_timeout("12.5", 30) == 12.5
+    for value in ("0", "-1", str(deadline.MAX_REQUEST_TIMEOUT + 1), "soon"):
+        with pytest.raises(ValueError):
+            deadline.parse_timeout(value, 30)
+
+
+def test_no_deadline_is_a_no_op():
+    assert deadline.current() is None
+    assert deadline.call_timeout(10) == 10
+    assert deadline.has_time()
+    deadline.check("anything")
+    with deadline.stage("search", 0.5) as share:
+        assert share is None
+
+
+def test_stage_gets_a_share_of_the_remaining_time():
+    with deadline.scope(Deadline(10)):
+        with deadline.stage("search", 0.5) as share:
+            assert 4.9 < share.remaining() <= 5
+            assert deadline.call_timeout(2) == 2
+            assert 4.9 < deadline.call_timeout() <= 5
+        assert deadline.current().remaining() > 9.9  # unused time goes back to the request
+
+
+def test_call_timeout_refuses_calls_with_too_little_time():
+    with deadline.scope(Deadline(deadline.MIN_CALL_SECONDS / 2)):
+        assert not deadline.has_time()
+        with pytest.raises(DeadlineExceeded):
+            deadline.call_timeout(10, "gemini")
+
+
+def test_expired_and_cancelled():
+    expired = Deadline(0.01)
+    time.sleep(0.02)
+    with pytest.raises(DeadlineExceeded) as e:
+        expired.check("summaries")
+    assert e.value.stage == "summaries" and not isinstance(e.value, RequestCancelled)
+
+    parent = Deadline(10)
+    child = parent.share(0.5)
+    parent.cancel()
+    assert child.cancelled and child.expired
+    with deadline.scope(child), pytest.raises(RequestCancelled):
+        deadline.check_cancelled("sections")
+
+
+def test_run_until_disconnect_cancels_on_disconnect():
+    class Request:
+        class url:
+            path = "/planner/generate"
+
+        async def is_disconnected(self):
+            return True
+
+    def pipeline():
+        while True:
+            deadline.check("pipeline")
+            time.sleep(0.01)
+
+    async def run():
+        return await deadline.run_until_disconnect(Request(), Deadline(5), pipeline)
+
+    with pytest.raises(RequestCancelled):
+        asyncio.run(run())
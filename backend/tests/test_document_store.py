@@ -0,0 +1,73 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from services import document_store
+from services.document_store import (
+    HISTORY,
+    REMINDERS,
+    FileDocumentStore,
+    RedisDocumentStore,
+)
+
+
+def file_store(tmp_path):
+    return FileDocumentStore({HISTORY: str(tmp_path / "history"), REMINDERS: str(tmp_path / "reminders")})
+
+
+def redis_store(tmp_path):
+    fakeredis = pytest.importorskip("fakeredis")
+    return RedisDocumentStore(client=fakeredis.FakeRedis(), prefix="test:")
+
+
+@pytest.fixture(params=[file_store, redis_store], ids=["file", "redis"])
+def store(request, tmp_path):
+    return request.param(tmp_path)
+
+
+@pytest.fixture
+def client(store):
+    from routers import history_router, reminders_router
+
+    app = FastAPI()
+    app.include_router(history_router.router)
+    app.include_router(reminders_router.router)
+    document_store.set_document_store(store)
+    yield TestClient(app)
+    document_store.set_document_store(None)
+
+
+def test_get_put_by_collection(store):
+    assert store.get(HISTORY, "u1") is None
+    store.put(HISTORY, "u1", {"plan_type": "21day"})
+    store.put(REMINDERS, "u1", [{"message": "m"}])
+    assert store.get(HISTORY, "u1") == {"plan_type": "21day"}
+    assert store.get(REMINDERS, "u1") == [{"message": "m"}]
+    store.put(HISTORY, "u1", {"plan_type": "3day"})
+    assert store.get(HISTORY, "u1") == {"plan_type": "3day"}
+
+
+@pytest.mark.parametrize("user_id", ["", "../x", "a/b", ".hidden"])
+def test_rejects_path_user_ids(store, user_id):
+    with pytest.raises(ValueError):
+        store.put(HISTORY, user_id, {})
+    with pytest.raises(ValueError):
+        store.get(HISTORY, user_id)
+
+
+def test_history_and_reminders_go_through_the_store(client, store):
+    assert client.get("/history/u1").status_code == 404
+    saved = client.post("/history/save", json={"user_id": "u1", "plan_type": "21day", "entries": [], "final_roadmap": ""})
+    assert saved.status_code == 200
+    assert store.get(HISTORY, "u1")["plan_type"] == "21day"
+    assert client.get("/history/u1").json()["plan_type"] == "21day"
+
+    reminder = {"timestamp": "2026-01-01T09:00:00", "message": "m", "related_goal": "g"}
+    assert client.get("/reminders/u1").json()["reminders"] == []
+    client.post("/reminders/u1/update", json={"reminders": [reminder, reminder]})
+    assert len(store.get(REMINDERS, "u1")) == 2
+    assert client.post("/reminders/u1/delete", json={"index": 5}).status_code == 400
+    assert client.post("/reminders/u1/delete", json={"index": 0}).status_code == 200
+    assert client.get("/reminders/u1").json()["reminders"] == [reminder]
+    assert client.post("/reminders/nobody/delete", json={"index": 0}).status_code == 404
+    assert client.get("/reminders/.hidden").status_code == 400
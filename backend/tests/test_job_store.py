@@ -0,0 +1,34 @@
+import time
+
+from services import job_store
+
+
+def _age(job_id, seconds):
+    with job_store.connect(job_store.JOB_DB_PATH) as conn:
+        conn.execute("UPDATE jobs SET updated_at = updated_at - ? WHERE id = ?", (seconds, job_id))
+
+
+def test_claim_is_exclusive_until_stale():
+    job_id = job_store.create_job("test", {})
+    assert job_store.claim_job(job_id)
+    assert not job_store.claim_job(job_id)
+    _age(job_id, job_store.JOB_STALE_SECONDS + 1)
+    assert job_store.claim_job(job_id)
+
+
+def test_heartbeat_keeps_a_long_stage_from_going_stale():
+    job_id = job_store.create_job("test", {})
+    assert job_store.claim_job(job_id)
+    _age(job_id, job_store.JOB_STALE_SECONDS + 1)
+    with job_store.heartbeat(job_id, interval=0.01):
+        time.sleep(0.05)
+        assert not job_store.is_stale(job_store.get_job(job_id))
+        assert not job_store.claim_job(job_id)
+
+
+def test_heartbeat_does_not_revive_finished_jobs():
+    job_id = job_store.create_job("test", {})
+    job_store.update_job(job_id, status=job_store.SUCCEEDED)
+    before = job_store.get_job(job_id)["updated_at"]
+    job_store.touch_job(job_id)
+    assert job_store.get_job(job_id)["updated_at"] == before
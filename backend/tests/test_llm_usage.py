@@ -0,0 +1,60 @@
+import math
+import time
+
+import pytest
+
+from services import llm_usage
+
+
+@pytest.fixture(autouse=True)
+def empty_store():
+    with llm_usage.connect(llm_usage.LLM_USAGE_DB_PATH) as conn:
+        conn.execute("DELETE FROM llm_calls")
+
+
+class Reply:
+    text = "reply"
+
+
+def record(call_site, latencies, endpoint="POST /x"):
+    """One request's calls; a latency of 0 records a failed call."""
+    with llm_usage.request_scope(endpoint):
+        for seconds in latencies:
+            error = None if seconds else RuntimeError("down")
+            llm_usage.record_call("m", call_site, seconds, prompt="p" * 40, response=Reply(), error=error)
+
+
+def nearest_rank(values, fraction):
+    values = sorted(values)
+    return values[max(1, math.ceil(fraction * len(values))) - 1]
+
+
+def test_rollup_groups_and_percentiles_in_sql():
+    latencies = [0.01 * n for n in range(1, 24)]
+    record("roadmap", latencies[:10])
+    record("roadmap", latencies[10:])
+    record("translate", [0.5, 0])
+    report = {item["call_site"]: item for item in llm_usage.rollup(group_by=["call_site"])}
+
+    roadmap = report["roadmap"]
+    assert (roadmap["calls"], roadmap["requests"], roadmap["calls_per_request"]) == (23, 2, 11.5)
+    assert roadmap["latency_p50_ms"] == round(nearest_rank(latencies, 0.5) * 1000)
+    assert roadmap["latency_p95_ms"] == round(nearest_rank(latencies, 0.95) * 1000)
+    assert report["translate"]["errors"] == 1
+    assert list(report) == ["roadmap", "translate"]  # busiest first
+
+
+def test_rollup_without_groups_and_empty():
+    assert llm_usage.rollup(group_by=[]) == []
+    record("roadmap", [0.1, 0.2, 0.3])
+    (total,) = llm_usage.rollup(group_by=[])
+    assert total["calls"] == 3 and total["latency_p50_ms"] == 200
+
+
+def test_prune_runs_every_n_calls(monkeypatch):
+    record("roadmap", [0.1])
+    with llm_usage.connect(llm_usage.LLM_USAGE_DB_PATH) as conn:
+        conn.execute("UPDATE llm_calls SET created_at = ?", (time.time() - 400 * 86400,))
+    monkeypatch.setattr(llm_usage, "LLM_USAGE_PRUNE_EVERY", 1)
+    record("roadmap", [0.2])
+    assert llm_usage.rollup(group_by=[])[0]["calls"] == 1
@@ -0,0 +1,62 @@
+import pytest
+
+from services import circuit_breaker, gemini, model_routing
+
+
+@pytest.fixture(autouse=True)
+def fresh_state(monkeypatch):
+    latencies = {tier: model_routing.collections.deque() for tier in model_routing.MODEL_TIERS}
+    monkeypatch.setattr(model_routing, "_latencies", latencies)
+    monkeypatch.setattr(model_routing, "_decisions", model_routing.collections.Counter())
+    monkeypatch.setattr(circuit_breaker, "_breakers", {})
+
+
+def test_call_sites_map_to_tiers():
+    assert model_routing.route("roadmap").tier == "quality"
+    assert model_routing.route("search_summary").tier == "fast"
+    assert model_routing.route("never-heard-of-it").tier == model_routing.DEFAULT_TIER
+
+
+def test_slow_tier_is_demoted_until_its_samples_age_out(monkeypatch):
+    threshold = model_routing.MODEL_TIERS["quality"]["demote_p95_seconds"]
+    for _ in range(model_routing.LATENCY_MIN_SAMPLES):
+        model_routing.observe("quality", threshold + 1)
+    route = model_routing.route("roadmap")
+    assert route.demoted and route.tier == "standard"
+
+    later = model_routing.time.time() + model_routing.LATENCY_WINDOW_SECONDS + 1
+    monkeypatch.setattr(model_routing.time, "time", lambda: later)
+    assert not model_routing.route("roadmap").demoted
+
+
+def test_p95_needs_enough_samples():
+    model_routing.observe("fast", 1.0)
+    assert model_routing.p95_seconds("fast") is None
+
+
+class Reply:
+    text = "ok"
+
+
+def test_generate_routed_falls_back_along_the_chain(monkeypatch):
+    primary, fallback = model_routing.route("roadmap").models[:2]
+
+    def generate_content(model_name, prompt, call_site, tier=None, **kwargs):
+        if model_name == primary:
+            raise RuntimeError("overloaded")
+        return Reply()
+
+    monkeypatch.setattr(gemini, "generate_content", generate_content)
+    assert gemini.generate_routed("roadmap", "prompt").text == "ok"
+    decisions = model_routing.snapshot()["decisions"]
+    assert [(d["model"], d["reason"]) for d in decisions] == [(fallback, model_routing.FALLBACK)]
+
+
+def test_generate_routed_raises_when_every_model_fails(monkeypatch):
+    def generate_content(model_name, prompt, call_site, tier=None, **kwargs):
+        raise RuntimeError(model_name)
+
+    monkeypatch.setattr(gemini, "generate_content", generate_content)
+    with pytest.raises(RuntimeError):
+        gemini.generate_routed("translate", "prompt")
+    assert model_routing.snapshot()["decisions"][0]["reason"] == model_routing.EXHAUSTED
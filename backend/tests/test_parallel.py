@@ -0,0 +1,50 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.parallel import bounded_submit
+
+
+def test_yields_every_item_in_order_including_falsy_ones():
+    items = [3, None, 0, "", 5]
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        results = [(item, future.result()) for item, future in bounded_submit(executor, repr, items, 2)]
+    assert results == [(item, repr(item)) for item in items]
+
+
+def test_keeps_at_most_window_in_flight():
+    in_flight, peak, lock = [0], [0], threading.Lock()
+    submitted = []
+
+    class CountingExecutor(ThreadPoolExecutor):
+        def submit(self, fn, *args):
+            submitted.append(args[0])
+            with lock:
+                in_flight[0] += 1
+                peak[0] = max(peak[0], in_flight[0])
+            return super().submit(fn, *args)
+
+    with CountingExecutor(max_workers=4) as executor:
+        for item, future in bounded_submit(executor, lambda n: n, range(10), 3):
+            future.result()
+            with lock:
+                in_flight[0] -= 1
+    assert peak[0] <= 4  # window, plus the one refilled before it is yielded
+    assert submitted == list(range(10))
+
+
+def test_closing_early_cancels_unstarted_tasks():
+    release = threading.Event()
+    futures = []
+
+    class RecordingExecutor(ThreadPoolExecutor):
+        def submit(self, fn, *args):
+            futures.append(super().submit(fn, *args))
+            return futures[-1]
+
+    with RecordingExecutor(max_workers=1) as executor:
+        renders = bounded_submit(executor, lambda n: release.wait(), range(5), 3)
+        next(renders)
+        renders.close()
+        release.set()
+    # The window (3) was refilled once before the first item was yielded.
+    assert [future.cancelled() for future in futures] == [False, True, True, True]
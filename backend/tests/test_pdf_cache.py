@@ -0,0 +1,14 @@
+from datetime import date
+
+from services.pdf_cache import cache_key
+from utils.pdf_letterhead import _header_lines
+
+
+def test_cache_key_changes_with_the_printed_date():
+    monday = cache_key("roadmap", "Ann", generated_on=date(2026, 1, 5))
+    assert monday == cache_key("roadmap", "Ann", generated_on=date(2026, 1, 5))
+    assert monday != cache_key("roadmap", "Ann", generated_on=date(2026, 1, 6))
+
+
+def test_cached_renders_are_dated_not_timestamped():
+    assert "Generated: 2026-01-05" in _header_lines("Title", "Ann", date(2026, 1, 5))
@@ -0,0 +1,72 @@
+from services.prompts import (
+    PRIORITY_INSIGHTS,
+    PRIORITY_INSTRUCTIONS,
+    PRIORITY_LOCATION,
+    estimate_tokens,
+    fit_sections,
+    profile_facts,
+    section,
+    truncate_to_tokens,
+)
+
+
+def test_truncate_to_tokens_cuts_at_a_word_boundary():
+    assert truncate_to_tokens("short text", 10) == "short text"
+    assert truncate_to_tokens("anything", 0) == ""
+    text = "alpha beta gamma delta epsilon zeta eta theta"
+    cut = truncate_to_tokens(text, 5)
+    assert cut.endswith("…")
+    assert len(cut) <= 5 * 4
+    assert text.startswith(cut[:-1])
+    assert cut[:-1].split()[-1] in text.split()
+
+
+def test_profile_facts_dedupes_keys_and_free_text():
+    user_data = {
+        "Name": "Ana",
+        "name": "Someone else",  # same label, CLI key wins
+        "Current Age": "30",
+        "retirement_age": "30",  # numbers may repeat
+        "Career": "Nurse  at https://example.com",
+        "Main Goals": "Buy a house",
+        "challenges": "buy a house",  # pasted twice
+        "support": "   ",
+    }
+    assert profile_facts(user_data) == [
+        ("Name", "Ana"),
+        ("Age", "30"),
+        ("Career", "Nurse at"),
+        ("Retirement Age", "30"),
+        ("Goals", "Buy a house"),
+    ]
+    assert profile_facts(user_data, labels=("Age", "Career")) == [("Age", "30"), ("Career", "Nurse at")]
+
+
+def test_fit_sections_keeps_everything_under_budget():
+    sections = [section("a", "x" * 40, PRIORITY_INSTRUCTIONS), section("b", "", PRIORITY_LOCATION)]
+    assert [s["name"] for s in fit_sections(sections, 100)] == ["a"]
+
+
+def test_fit_sections_trims_lowest_priority_first_with_a_common_cap():
+    words = " ".join(["word"] * 200)  # ~250 tokens
+    sections = [
+        section("instructions", words, PRIORITY_INSTRUCTIONS),
+        section("insight 1", words, PRIORITY_INSIGHTS),
+        section("insight 2", words[:400], PRIORITY_INSIGHTS),
+        section("location", words, PRIORITY_LOCATION),
+    ]
+    kept = fit_sections(sections, 500)
+    assert [s["name"] for s in kept] == ["instructions", "insight 1", "insight 2"]
+    assert kept[0]["text"] == words  # instructions are never trimmed
+    assert sum(estimate_tokens(s["text"]) for s in kept) <= 500
+    # 250 tokens left for the tier: the short insight fits whole, the long one gets the rest
+    assert kept[2]["text"] == words[:400]
+    assert 140 <= estimate_tokens(kept[1]["text"]) <= 150
+
+
+def test_fit_sections_drops_sections_that_would_be_stubs():
+    sections = [
+        section("instructions", "x" * 400, PRIORITY_INSTRUCTIONS),
+        section("location", "y " * 100, PRIORITY_LOCATION),
+    ]
+    assert [s["name"] for s in fit_sections(sections, 110)] == ["instructions"]
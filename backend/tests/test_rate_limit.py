@@ -0,0 +1,115 @@
+import pytest
+from starlette.requests import Request
+
+from services import rate_limit
+from services.cache_backend import MemoryCacheBackend, set_cache_backend
+from services.rate_limit import CALLS, RATE_LIMIT_WINDOW, TOKENS, QuotaExceeded
+
+WINDOW_START = 1000 * RATE_LIMIT_WINDOW
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    set_cache_backend(MemoryCacheBackend())
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [WINDOW_START + 0.25 * RATE_LIMIT_WINDOW]
+    monkeypatch.setattr(rate_limit.time, "time", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def quota(monkeypatch):
+    monkeypatch.setitem(
+        rate_limit.TIER_QUOTAS, "3day", {CALLS: 10, TOKENS: 1000, "estimate_calls": 4, "estimate_tokens": 100}
+    )
+
+
+def test_sliding_usage_weights_previous_window():
+    rate_limit._add("3day", "u", CALLS, 8, index=999)
+    rate_limit._add("3day", "u", CALLS, 3, index=1000)
+    assert rate_limit.usage("3day", "u", CALLS, now=WINDOW_START) == pytest.approx(11)
+    assert rate_limit.usage("3day", "u", CALLS, now=WINDOW_START + 0.75 * RATE_LIMIT_WINDOW) == pytest.approx(5)
+
+
+def test_retry_after_is_when_previous_window_has_slid_out():
+    rate_limit._add("3day", "u", CALLS, 10, index=999)
+    retry = rate_limit._retry_after("3day", "u", CALLS, limit=10, needed=5, now=WINDOW_START)
+    assert retry == pytest.approx(RATE_LIMIT_WINDOW / 2)
+
+
+def test_admit_reserves_then_rejects_and_rolls_back(clock, quota):
+    rate_limit.admit("u", "3day")
+    rate_limit.admit("u", "3day")
+    with pytest.raises(QuotaExceeded) as e:
+        rate_limit.admit("u", "3day")
+    assert e.value.unit == CALLS and e.value.retry_after >= 1
+    # The rejected request's reservation was taken back off.
+    assert rate_limit.usage("3day", "u", CALLS) == 8
+    assert rate_limit.usage("3day", "u", TOKENS) == 200
+
+
+def test_first_request_is_admitted_even_over_the_estimate(clock, monkeypatch):
+    monkeypatch.setitem(
+        rate_limit.TIER_QUOTAS, "3day", {CALLS: 2, TOKENS: 1000, "estimate_calls": 4, "estimate_tokens": 0}
+    )
+    rate_limit.admit("u", "3day")
+    with pytest.raises(QuotaExceeded):
+        rate_limit.admit("u", "3day")
+
+
+def test_settle_refunds_into_the_reservation_window(clock, quota):
+    subject = rate_limit.admit("u", "3day")
+    subject.charge(calls=1, tokens=40)
+    clock[0] = WINDOW_START + 1.5 * RATE_LIMIT_WINDOW  # next window
+    subject.settle()
+    current, previous, _ = rate_limit._counts("3day", "u", CALLS, clock[0])
+    assert (current, previous) == (0, 1)
+    current, previous, _ = rate_limit._counts("3day", "u", TOKENS, clock[0])
+    assert (current, previous) == (0, 40)
+
+
+def test_settle_charges_overrun_to_current_window(clock, quota):
+    subject = rate_limit.admit("u", "3day")
+    subject.charge(calls=6)
+    subject.settle()
+    assert rate_limit.usage("3day", "u", CALLS) == 6
+
+
+def test_settle_never_goes_negative_after_window_expired(clock, quota):
+    subject = rate_limit.admit("u", "3day")
+    clock[0] = WINDOW_START + 3 * RATE_LIMIT_WINDOW
+    rate_limit.get_cache_backend().delete_prefix(rate_limit.RATE_LIMIT_PREFIX)  # expired
+    subject.settle()
+    assert rate_limit.usage("3day", "u", CALLS) == 0
+    assert rate_limit.admit("u", "3day").reserved[CALLS] == 4
+
+
+def _request(client, headers=None):
+    return Request({
+        "type": "http",
+        "headers": [(name.lower().encode(), value.encode()) for name, value in (headers or {}).items()],
+        "client": (client, 1234),
+    })
+
+
+def test_user_header_ignored_from_untrusted_clients(monkeypatch):
+    monkeypatch.setattr(rate_limit, "RATE_LIMIT_TRUSTED_PROXIES", {"10.0.0.1"})
+    request = _request("203.0.113.5", {"X-User-Id": "someone-else", "X-Forwarded-For": "1.2.3.4"})
+    assert rate_limit.request_user_id(request) == "ip:203.0.113.5"
+
+
+def test_trusted_gateway_identity(monkeypatch):
+    monkeypatch.setattr(rate_limit, "RATE_LIMIT_TRUSTED_PROXIES", {"10.0.0.1"})
+    assert rate_limit.request_user_id(_request("10.0.0.1", {"X-User-Id": "42"})) == "user:42"
+    forwarded = _request("10.0.0.1", {"X-Forwarded-For": "6.6.6.6, 198.51.100.7"})
+    assert rate_limit.request_user_id(forwarded) == "ip:198.51.100.7"
+    assert rate_limit.request_user_id(_request("10.0.0.1")) == "ip:10.0.0.1"
+
+
+def test_authenticated_user_on_request_state():
+    request = _request("203.0.113.5", {"X-User-Id": "spoofed"})
+    request.state.user_id = "alice"
+    assert rate_limit.request_user_id(request) == "user:alice"
@@ -0,0 +1,38 @@
+from models.roadmap import Roadmap, RoadmapOverview, RoadmapPhase, RoadmapRevision
+
+PHASES = [RoadmapPhase(title=title, goal=f"{title} goal", tips=["old"]) for title in ("Career", "Money", "Home")]
+
+
+def test_apply_orders_and_revises_phases():
+    overview = RoadmapOverview(
+        title="Life Roadmap", summary="Summary", closing="Closing", order=[2, 0, 1],
+        revisions=[RoadmapRevision(phase=1, goal="Save first", tips=["new"])],
+    )
+    roadmap = overview.apply(PHASES)
+    assert [phase.title for phase in roadmap.phases] == ["Home", "Career", "Money"]
+    assert roadmap.phases[2].goal == "Save first" and roadmap.phases[2].tips == ["new"]
+    assert (roadmap.title, roadmap.summary, roadmap.closing) == ("Life Roadmap", "Summary", "Closing")
+    assert PHASES[1].goal == "Money goal"  # drafted phases are not modified
+
+
+def test_apply_ignores_bad_indexes_and_keeps_every_phase():
+    overview = RoadmapOverview(order=[1, 7, 1, -1], revisions=[RoadmapRevision(phase=9, goal="x")])
+    roadmap = overview.apply(PHASES)
+    assert [phase.title for phase in roadmap.phases] == ["Money", "Career", "Home"]
+    assert [phase.goal for phase in roadmap.phases] == ["Money goal", "Career goal", "Home goal"]
+
+
+def test_empty_revision_fields_keep_the_draft():
+    roadmap = RoadmapOverview(revisions=[RoadmapRevision(phase=0)]).apply(PHASES)
+    assert roadmap.phases[0].goal == "Career goal" and roadmap.phases[0].tips == ["old"]
+
+
+def test_markdown_round_trip_keeps_days():
+    roadmap = Roadmap(
+        title="Plan", summary="Three days.",
+        phases=[RoadmapPhase(title=f"Day {day}: Step", day=day, goal="Go", actions=["Walk"]) for day in (1, 2, 3)],
+        closing="Done.",
+    )
+    parsed = Roadmap.from_text(roadmap.to_markdown())
+    assert [phase.day for phase in parsed.phases] == [1, 2, 3]
+    assert parsed.title == "Plan" and parsed.phases[0].actions == ["Walk"]
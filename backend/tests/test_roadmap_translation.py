@@ -0,0 +1,56 @@
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from routers import translation_router
+from services import roadmap_translation
+from services.cache_backend import MemoryCacheBackend, set_cache_backend
+
+ROADMAP = {
+    "title": "Plan",
+    "phases": [{"title": f"Day {day}", "day": day, "actions": ["Walk"]} for day in range(1, 6)],
+}
+
+
+class Reply:
+    def __init__(self, text):
+        self.text = text
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    set_cache_backend(MemoryCacheBackend())
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(translation_router.router, prefix="/planner")
+    return TestClient(app)
+
+
+def echo(call_site, prompt, **kwargs):
+    """A 'translation' that returns the section it was given."""
+    return Reply(prompt[prompt.index("{"):])
+
+
+def test_translate_keeps_shape_and_days(monkeypatch):
+    monkeypatch.setattr(roadmap_translation, "generate_routed", echo)
+    text, translated, cached = roadmap_translation.translate(ROADMAP, "es")
+    assert [phase.day for phase in translated.phases] == [1, 2, 3, 4, 5]
+    assert not cached and roadmap_translation.translate(ROADMAP, "es")[2]
+
+
+def test_invalid_structured_roadmap_is_rejected(client):
+    response = client.post(
+        "/planner/translate", json={"target_language": "es", "roadmap_structured": {"phases": "notalist"}}
+    )
+    assert response.status_code == 422
+
+
+def test_shape_mismatch_is_bad_gateway(client, monkeypatch):
+    monkeypatch.setattr(roadmap_translation, "generate_routed", lambda *a, **kw: Reply(json.dumps({"phases": []})))
+    response = client.post("/planner/translate", json={"target_language": "es", "roadmap_structured": ROADMAP})
+    assert response.status_code == 502
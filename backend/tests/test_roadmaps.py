@@ -0,0 +1,53 @@
+import json
+
+import pytest
+
+from services import roadmaps
+
+PHASE = {"title": "Day 1: Start", "day": 1, "goal": "Begin", "actions": ["Walk"]}
+
+
+class Reply:
+    def __init__(self, text):
+        self.text = text
+
+
+def test_valid_json_reply():
+    roadmap, complete = roadmaps.parse_roadmap_reply(json.dumps({"title": "Plan", "phases": [PHASE]}))
+    assert complete and roadmap.phases[0].day == 1
+
+
+def test_partly_invalid_json_is_salvaged_not_parsed_as_text():
+    text = json.dumps({"title": "Plan", "summary": 3, "phases": [PHASE, {"day": "x"}]})
+    roadmap, complete = roadmaps.parse_roadmap_reply(text)
+    assert not complete
+    assert roadmap.title == "Plan" and [phase.title for phase in roadmap.phases] == ["Day 1: Start"]
+
+
+def test_fenced_json_is_json():
+    text = "```json\n" + json.dumps({"phases": [PHASE, {"goal": "no title"}]}) + "\n```"
+    roadmap, complete = roadmaps.parse_roadmap_reply(text)
+    assert not complete and len(roadmap.phases) == 1
+
+
+def test_prose_reply_is_parsed_as_text():
+    roadmap, complete = roadmaps.parse_roadmap_reply("# Plan\n\n## Day 1: Start\n- Walk")
+    assert complete and roadmap.title == "Plan" and roadmap.phases[0].day == 1
+
+
+def test_partial_reply_is_retried_once(monkeypatch):
+    replies = iter([{"phases": "notalist", "title": "First"}, {"title": "Second", "phases": [PHASE]}])
+    monkeypatch.setattr(roadmaps, "generate_routed", lambda *a, **kw: Reply(json.dumps(next(replies))))
+    assert roadmaps.generate_structured_roadmap("prompt").title == "Second"
+
+
+def test_last_attempt_keeps_the_salvageable_part(monkeypatch):
+    reply = json.dumps({"title": "Plan", "phases": [PHASE, {"day": "x"}]})
+    monkeypatch.setattr(roadmaps, "generate_routed", lambda *a, **kw: Reply(reply))
+    assert len(roadmaps.generate_structured_roadmap("prompt").phases) == 1
+
+
+def test_unusable_json_raises(monkeypatch):
+    monkeypatch.setattr(roadmaps, "generate_routed", lambda *a, **kw: Reply("[1, 2]"))
+    with pytest.raises(ValueError):
+        roadmaps.generate_structured_roadmap("prompt")
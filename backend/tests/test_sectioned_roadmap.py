@@ -0,0 +1,52 @@
+import contextvars
+
+import pytest
+
+from models.roadmap import Roadmap, RoadmapPhase
+from services import sectioned_roadmap
+from services.sectioned_roadmap import cover_days, generate_section, run_concurrently
+
+OUTLINE = Roadmap(title="Plan")
+WEEK = ("Week 1", 1, 3, None)
+
+
+def phases(*days):
+    return [RoadmapPhase(title=f"Day {day}", day=day) for day in days]
+
+
+def test_cover_days_exact_out_of_order_and_unnumbered():
+    assert [phase.day for phase in cover_days(phases(2, 1, 3), 1, 3)] == [1, 2, 3]
+    assert [phase.day for phase in cover_days(phases(None, None), 4, 5)] == [4, 5]
+
+
+@pytest.mark.parametrize("days", [(1, 2), (1, 2, 2), (1, 2, 4), (1, None, 3), (1, 2, 3, 3)])
+def test_cover_days_rejects_gaps_and_duplicates(days):
+    assert cover_days(phases(*days), 1, 3) is None
+
+
+def test_generate_section_retries_then_fails(monkeypatch):
+    replies = iter([phases(1, 1, 3), phases(1, 2, 3)])
+    monkeypatch.setattr(sectioned_roadmap.roadmaps, "generate_structured_roadmap",
+                        lambda prompt, call_site: Roadmap(phases=next(replies)))
+    assert [phase.day for phase in generate_section("ctx", OUTLINE, WEEK, "roadmap_21day")] == [1, 2, 3]
+
+    monkeypatch.setattr(sectioned_roadmap.roadmaps, "generate_structured_roadmap",
+                        lambda prompt, call_site: Roadmap(phases=phases(1, 2)))
+    with pytest.raises(ValueError):
+        generate_section("ctx", OUTLINE, WEEK, "roadmap_21day")
+
+
+def test_run_concurrently_keeps_order_and_context():
+    var = contextvars.ContextVar("var", default=None)
+    var.set("caller")
+    assert run_concurrently(lambda n: (n, var.get()), [(n,) for n in range(5)]) == [(n, "caller") for n in range(5)]
+
+
+def test_run_concurrently_raises_first_failure():
+    def fail(n):
+        if n == 2:
+            raise RuntimeError("boom")
+        return n
+
+    with pytest.raises(RuntimeError):
+        run_concurrently(fail, [(n,) for n in range(4)])
@@ -0,0 +1,46 @@
+from services import serp_parser
+from services.serp_parser import extract_results
+
+
+def page(*results):
+    return f"<html><body><br>{''.join(results)}<script>var x = '<div>';</script></body></html>"
+
+
+def flat_result(n):
+    """A title and its snippet as sibling divs, linked by the enclosing <a>."""
+    return (
+        f'<div><a href="/url?q=https://example.com/{n}"><div class="{serp_parser.TITLE_CLASS}">Title {n}</div>'
+        f'<img src="x"><div class="{serp_parser.SNIPPET_CLASS}">Snippet <b>{n}</b> &amp; more</div></a></div>'
+    )
+
+
+def test_extracts_title_snippet_and_link_in_order():
+    results = extract_results(page(flat_result(1), flat_result(2)), 5)
+    assert results == [
+        {"title": f"Title {n}", "snippet": f"Snippet {n} & more", "link": f"/url?q=https://example.com/{n}"}
+        for n in (1, 2)
+    ]
+
+
+def test_snippet_must_be_a_sibling_of_the_title():
+    orphan_title = f'<div><div class="{serp_parser.TITLE_CLASS}">Lonely</div></div>'
+    stray_snippet = f'<div class="{serp_parser.SNIPPET_CLASS}">Not a result</div>'
+    assert [r["title"] for r in extract_results(page(orphan_title, stray_snippet, flat_result(3)), 5)] == ["Title 3"]
+
+
+def test_unlinked_title_has_no_link():
+    unlinked = (
+        f'<div><div class="{serp_parser.TITLE_CLASS}">Plain</div>'
+        f'<div class="{serp_parser.SNIPPET_CLASS}">Text</div></div>'
+    )
+    assert extract_results(page(unlinked), 5) == [{"title": "Plain", "snippet": "Text", "link": None}]
+
+
+def test_stops_after_max_results(monkeypatch):
+    monkeypatch.setattr(serp_parser, "FEED_CHUNK_CHARS", 64)
+    html = page(*(flat_result(n) for n in range(50)))
+    fed = []
+    feed = serp_parser._ResultParser.feed
+    monkeypatch.setattr(serp_parser._ResultParser, "feed", lambda self, data: fed.append(data) or feed(self, data))
+    assert len(extract_results(html, 2)) == 2
+    assert sum(map(len, fed)) < len(html) / 10
@@ -0,0 +1,29 @@
+from services.snippet_ranking import rank_snippets
+
+RESULTS = [
+    {"title": "Moving to Austin", "snippet": "Cost of living in Austin for software engineers is rising.", "link": "a"},
+    {"title": "Austin rent", "snippet": "Average rent in Austin, Texas for a one bedroom apartment.", "link": "b"},
+    {"title": "Recipes", "snippet": "Ten quick pasta recipes for busy weeknights.", "link": "c"},
+]
+
+
+def test_ranks_relevant_and_drops_off_topic():
+    links = [r["link"] for r in rank_snippets("austin rent apartment", RESULTS)]
+    assert links[0] == "b" and "c" not in links
+
+
+def test_drops_near_duplicates():
+    duplicate = {**RESULTS[1], "link": "d"}
+    links = [r["link"] for r in rank_snippets("austin rent apartment", RESULTS + [duplicate])]
+    assert "b" in links and "d" not in links
+
+
+def test_keeps_top_results_when_nothing_overlaps():
+    kept = rank_snippets("vivienda asequible", RESULTS)
+    assert [r["link"] for r in kept] == ["a", "b"]
+    assert all(r["score"] == 0 for r in kept)
+
+
+def test_respects_char_budget():
+    kept = rank_snippets("austin", RESULTS, char_budget=70)
+    assert sum(len(r["snippet"]) for r in kept) <= 70
@@ -0,0 +1,88 @@
+import io
+import json
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from routers import tax_intake_router
+from routers.tax_intake_router import _csv_rows, _ndjson_rows
+from services import tax_intake_store
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(tax_intake_router.router)
+    return TestClient(app)
+
+
+def upload(client, name, text, **params):
+    return client.post("/tax-intake/bulk", params=params, files={"file": (name, text.encode(), "text/plain")})
+
+
+def test_csv_rows_maps_columns_and_reports_bad_rows():
+    ignored = []
+    text = 'Full Name,email_address,notes\nAna,ana@example.com,x\n\nBob,bob@example.com\n"Cy",,"long\nnote"\n'
+    rows = list(_csv_rows(io.StringIO(text, newline=""), ignored))
+    assert ignored == ["notes"]
+    assert rows[0] == (2, {"full_name": "Ana", "email_address": "ana@example.com"})
+    assert rows[1][0] == 4 and isinstance(rows[1][1], ValueError)
+    assert rows[2] == (6, {"full_name": "Cy", "email_address": ""})
+
+
+def test_csv_rows_rejects_header_without_known_columns():
+    with pytest.raises(HTTPException) as e:
+        list(_csv_rows(io.StringIO("a,b\n1,2\n"), []))
+    assert e.value.status_code == 400
+
+
+def test_oversized_csv_field_fails_only_its_row():
+    text = f'full_name,email_address\nAna,ana@example.com\n"{"x" * 200_000}",big@example.com\nBob,bob@example.com\n'
+    rows = list(_csv_rows(io.StringIO(text, newline=""), []))
+    assert isinstance(rows[1][1], ValueError) and "malformed CSV" in str(rows[1][1])
+    assert rows[0][1]["full_name"] == "Ana" and rows[-1][1]["full_name"] == "Bob"
+
+
+def test_ndjson_rows_flattens_categories_and_reports_bad_lines():
+    nested = {"Personal Information": {"Full Name": "Ana"}}
+    text = "\n".join([json.dumps({"full_name": "Bob"}), "{not json", "[1]", "", json.dumps(nested)])
+    rows = list(_ndjson_rows(io.StringIO(text)))
+    assert rows[0] == (1, {"full_name": "Bob"})
+    assert [type(row) for _, row in rows[1:3]] == [ValueError, ValueError]
+    assert rows[3][0] == 5 and rows[3][1]["full_name"] == "Ana"
+
+
+def test_bulk_upload_stores_in_batches_and_reports_failures(client, monkeypatch):
+    monkeypatch.setattr(tax_intake_router, "TAX_INTAKE_BATCH_SIZE", 2)
+    batches = []
+    insert = tax_intake_store.insert_records
+    monkeypatch.setattr(
+        tax_intake_store, "insert_records", lambda records, *a: batches.append(len(records)) or insert(records, *a)
+    )
+    lines = [json.dumps({"full_name": f"Person {n}", "email_address": f"p{n}@example.com"}) for n in range(5)]
+    lines.append(json.dumps({"full_name": "No contact"}))
+    body = upload(client, "intake.ndjson", "\n".join(lines)).json()
+    assert (body["rows_received"], body["rows_stored"], body["rows_failed"]) == (6, 5, 1)
+    assert body["errors"][0]["line"] == 6
+    assert batches == [2, 2, 1]
+
+
+def test_bulk_csv_with_oversized_field_keeps_good_rows(client):
+    text = f'full_name,email_address\nAna,ana@example.com\n"{"x" * 200_000}",big@example.com\n'
+    response = upload(client, "intake.csv", text)
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["rows_stored"], body["rows_failed"]) == (1, 1)
+
+
+def test_failed_batch_write_is_reported(client, monkeypatch):
+    monkeypatch.setattr(tax_intake_router, "TAX_INTAKE_BATCH_SIZE", 1)
+
+    def insert_records(records, batch_id, source):
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr(tax_intake_store, "insert_records", insert_records)
+    lines = [json.dumps({"full_name": name, "email_address": f"{name}@example.com"}) for name in ("ana", "bo")]
+    response = upload(client, "intake.ndjson", "\n".join(lines))
+    assert response.status_code == 500 and "disk full" in response.json()["detail"]
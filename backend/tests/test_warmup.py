@@ -0,0 +1,73 @@
+import pytest
+
+from services import warmup
+
+
+@pytest.fixture(autouse=True)
+def fresh_state(monkeypatch):
+    monkeypatch.setattr(warmup, "_state", {
+        "ready": False, "status": "warming", "failed_steps": [],
+        "started_at": None, "finished_at": None, "steps": {},
+    })
+    monkeypatch.setattr(warmup, "WARMUP_NETWORK", False)
+    monkeypatch.setattr(warmup, "WARMUP_RETRY_INTERVAL", 0.01)
+    monkeypatch.setattr(warmup, "_warm_pdf", lambda: None)
+
+
+class FakeModel:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.calls = 0
+
+    def count_tokens(self, contents, request_options=None):
+        self.calls += 1
+        if self.fail:
+            raise ConnectionError("unreachable")
+
+
+def test_models_are_contacted_when_network_warm_up_is_on(monkeypatch):
+    models = {name: FakeModel() for name in warmup.WARMUP_MODELS}
+    monkeypatch.setattr(warmup, "get_model", models.__getitem__)
+    monkeypatch.setattr(warmup, "WARMUP_NETWORK", True)
+    monkeypatch.setattr(warmup, "_warm_network", lambda: None)
+
+    warmup.warm_up()
+
+    state = warmup.readiness()
+    assert state["ready"] and state["status"] == "ready" and state["failed_steps"] == []
+    assert all(model.calls == 1 for model in models.values())
+
+
+def test_failing_step_is_retried_then_reported_degraded(monkeypatch):
+    monkeypatch.setattr(warmup, "WARMUP_RETRY_SECONDS", 0.05)
+    model = FakeModel(fail=True)
+    monkeypatch.setattr(warmup, "get_model", lambda name: model)
+    monkeypatch.setattr(warmup, "WARMUP_NETWORK", True)
+    monkeypatch.setattr(warmup, "_warm_network", lambda: None)
+
+    warmup.warm_up()
+
+    state = warmup.readiness()
+    assert state["ready"] and state["status"] == "degraded"
+    assert state["failed_steps"] == ["gemini_models"]
+    assert state["steps"]["gemini_models"]["ok"] is False
+    assert state["steps"]["outbound_connections"]["ok"] is True
+    assert model.calls > len(warmup.WARMUP_MODELS)  # retried
+
+
+def test_step_that_recovers_on_retry_is_ready(monkeypatch):
+    monkeypatch.setattr(warmup, "WARMUP_RETRY_SECONDS", 5)
+    attempts = []
+
+    def flaky_pdf():
+        attempts.append(1)
+        if len(attempts) < 2:
+            raise OSError("font not loaded")
+
+    monkeypatch.setattr(warmup, "_warm_pdf", flaky_pdf)
+    monkeypatch.setattr(warmup, "get_model", lambda name: FakeModel())
+
+    warmup.warm_up()
+
+    assert warmup.readiness()["status"] == "ready"
+    assert len(attempts) == 2
@@ -0,0 +1,45 @@
+"""
+Compact orjson encoding for on-disk state (history and reminder files).
+
+Files are written compactly and atomically. Reading accepts anything valid
+JSON, including the pretty-printed files written by json.dump(indent=2)
+before the switch, and falls back to the stdlib parser for the NaN/Infinity
+values json.dump allowed but orjson rejects.
+"""
+import json
+import os
+import tempfile
+
+import orjson
+
+DUMP_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+def dumps(obj):
+    """Compact JSON as bytes."""
+    return orjson.dumps(obj, option=DUMP_OPTIONS)
+
+
+def loads(data):
+    try:
+        return orjson.loads(data)
+    except orjson.JSONDecodeError:
+        return json.loads(data)
+
+
+def read_json(path):
+    with open(path, "rb") as f:
+        return loads(f.read())
+
+
+def write_json(path, obj):
+    """Write obj to path atomically, so readers never see a half-written file."""
+    directory = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(dumps(obj))
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
@@ -0,0 +1,44 @@
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+_END = object()  # end of input; None is a valid item
+
+
+def spawn_process_pool(max_workers):
+    """
+    Process pool using the spawn start method: forking a process that already
+    runs server or SQLite threads can deadlock the child.
+    """
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+def bounded_submit(executor, fn, items, window, *args):
+    """
+    Submit fn(item, *args) for each item, keeping at most `window` tasks in
+    flight, and yield (item, future) in input order as each one is reached.
+
+    Unlike Executor.map this does not submit (and hold results for) the whole
+    input up front, so memory stays bounded for long inputs. Closing the
+    generator early cancels the tasks that have not started yet.
+    """
+    pending = deque()
+    items = iter(items)
+    window = max(1, window)
+
+    def fill():
+        while len(pending) < window:
+            item = next(items, _END)
+            if item is _END:
+                return
+            pending.append((item, executor.submit(fn, item, *args)))
+
+    try:
+        fill()
+        while pending:
+            item, future = pending.popleft()
+            fill()
+            yield item, future
+    finally:
+        for _, future in pending:
+            future.cancel()
@@ -4,13 +4,43 @@ from __future__ import annotations
 import io
 import os
 import textwrap
-from datetime import datetime
-from typing import Optional
+import threading
+from datetime import date, datetime
+from functools import lru_cache
+from typing import BinaryIO, Optional, Union
 
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import letter
 
-from pypdf import PdfReader, PdfWriter
+from pypdf import PageObject, PdfReader, PdfWriter
+
+from models.roadmap import Roadmap
+
+# Bump whenever the layout below changes so cached PDFs are re-rendered.
+RENDERER_VERSION = "letterhead-5"
+
+DEFAULT_TEMPLATE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "asset",
+    "TaxNerdGPT - CONSUMER PDF SHEET.pdf",
+)
+
+# pypdf readers resolve objects lazily from a shared stream, so merging the
+# cached template page is serialized.
+_template_lock = threading.Lock()
+
+
+@lru_cache(maxsize=4)
+def load_template(template_path: str) -> PdfReader:
+    """
+    Parse the letterhead template once per process and reuse it.
+    """
+    if not os.path.exists(template_path):
+        raise FileNotFoundError(f"Letterhead template not found: {template_path}")
+    template_reader = PdfReader(template_path)
+    if len(template_reader.pages) < 1:
+        raise ValueError("Letterhead template PDF has no pages.")
+    return template_reader
 
 
 def _wrap_lines(text: str, width_chars: int = 95) -> list[str]:
@@ -24,43 +54,46 @@ def _wrap_lines(text: str, width_chars: int = 95) -> list[str]:
     return lines
 
 
-def generate_roadmap_pdf_with_letterhead(
-    roadmap_text: str,
-    *,
-    output_title: str = "Perpetual Life Planner Roadmap",
-    client_name: Optional[str] = None,
-    template_path: str = "backend/assets/TaxNerdGPT - CONSUMER PDF SHEET.pdf",
-) -> bytes:
-    """
-    Creates a PDF where each page uses the provided letterhead PDF as a background,
-    and the roadmap text is drawn on top of it.
+# Line styles understood by _render_letterhead_pages.
+BODY = "body"
+HEADING = "heading"
 
-    Returns: PDF bytes
-    """
-    if not os.path.exists(template_path):
-        raise FileNotFoundError(f"Letterhead template not found: {template_path}")
 
+def _header_lines(
+    output_title: str, client_name: Optional[str], generated_on: Optional[date] = None
+) -> list[str]:
+    # A cached render is dated (generated_on) rather than timestamped, so it stays true all day.
+    generated = generated_on.isoformat() if generated_on else datetime.now().strftime('%Y-%m-%d %H:%M')
+    header_block = [
+        output_title,
+        f"Generated: {generated}",
+    ]
+    if client_name:
+        header_block.insert(1, f"Client: {client_name}")
+    return header_block
+
+
+def _render_letterhead_pages(
+    lines: list[tuple[str, str, int]],
+    template_path: str,
+) -> PdfWriter:
+    """
+    Paginates (style, text, indent) lines onto letterhead pages and returns
+    the PdfWriter, ready to be written out. An empty text is a blank line.
+    """
     # Read the single-page template (letterhead)
-    template_reader = PdfReader(template_path)
-    if len(template_reader.pages) < 1:
-        raise ValueError("Letterhead template PDF has no pages.")
-    template_page = template_reader.pages[0]
+    template_page = load_template(template_path).pages[0]
 
     # Page size (we assume letter; matches your template in most cases)
     page_w, page_h = letter
 
     # Layout: keep content away from header/footer printed on the letterhead
     left_margin = 54
-    right_margin = 54
     top_margin = 140   # push content below the letterhead header
     bottom_margin = 110  # keep above footer legal text
 
-    usable_width = page_w - left_margin - right_margin
     line_height = 14
 
-    # Turn roadmap into wrapped lines
-    lines = _wrap_lines(roadmap_text, width_chars=95)
-
     # We'll paginate lines based on vertical space
     max_lines_per_page = int((page_h - top_margin - bottom_margin) / line_height)
     if max_lines_per_page <= 0:
@@ -69,20 +102,9 @@ def generate_roadmap_pdf_with_letterhead(
     # PDF writer
     writer = PdfWriter()
 
-    # Metadata header lines (optional)
-    header_block = [
-        output_title,
-        f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M')}",
-    ]
-    if client_name:
-        header_block.insert(1, f"Client: {client_name}")
-
-    # Prepend a blank line after metadata
-    all_lines = header_block + [""] + lines
-
     # Create each page overlay and merge onto the template background
-    for page_start in range(0, len(all_lines), max_lines_per_page):
-        chunk = all_lines[page_start: page_start + max_lines_per_page]
+    for page_start in range(0, len(lines), max_lines_per_page):
+        chunk = lines[page_start: page_start + max_lines_per_page]
 
         # Create overlay PDF in memory
         overlay_buf = io.BytesIO()
@@ -95,18 +117,17 @@ def generate_roadmap_pdf_with_letterhead(
         y = page_h - top_margin
 
         # Draw text
-        for ln in chunk:
+        for style, ln, indent in chunk:
             if ln == "":
                 y -= line_height  # blank line
                 continue
 
-            # If it's a heading-like line, bold it a bit
-            if ln.lower().startswith("day ") or ln.startswith("#") or ln.endswith(":"):
+            if style == HEADING:
                 c.setFont("Helvetica-Bold", 12)
-                c.drawString(left_margin, y, ln.replace("#", "").strip())
+                c.drawString(left_margin + indent, y, ln)
                 c.setFont("Helvetica", 11)
             else:
-                c.drawString(left_margin, y, ln)
+                c.drawString(left_margin + indent, y, ln)
 
             y -= line_height
 
@@ -117,13 +138,177 @@ def generate_roadmap_pdf_with_letterhead(
         overlay_reader = PdfReader(overlay_buf)
         overlay_page = overlay_reader.pages[0]
 
-        # Merge overlay text onto the letterhead background
-        base = template_page  # same background each page
-        merged = base  # pypdf merges in-place
+        # Merge the letterhead and the overlay text onto a fresh blank page so
+        # neither the cached template nor earlier pages are modified.
+        merged = PageObject.create_blank_page(
+            width=template_page.mediabox.width, height=template_page.mediabox.height
+        )
+        with _template_lock:
+            merged.merge_page(template_page)
         merged.merge_page(overlay_page)
 
-        writer.add_page(merged)
+        # Compress each page as it is added so the writer keeps small encoded
+        # streams instead of every decoded page for the whole document.
+        writer.add_page(merged).compress_content_streams()
+
+    return writer
 
+
+def _bullet_lines(items: list[str], indent: int = 12) -> list[tuple[str, str, int]]:
+    lines = []
+    for item in items:
+        wrapped = _wrap_lines(item, width_chars=88)
+        lines.append((BODY, f"\u2022 {wrapped[0]}", indent))
+        # Continuation lines hang under the bullet text
+        lines.extend((BODY, ln, indent + 9) for ln in wrapped[1:])
+    return lines
+
+
+def _build_roadmap_writer(
+    roadmap: Union[str, Roadmap],
+    output_title: str,
+    client_name: Optional[str],
+    template_path: str,
+    generated_on: Optional[date] = None,
+) -> PdfWriter:
+    """
+    Lays out the structured roadmap on letterhead pages and returns the
+    PdfWriter, ready to be written out. Plain text is parsed into a Roadmap
+    first; callers that already have one (services.roadmaps) pass it in.
+    """
+    if not isinstance(roadmap, Roadmap):
+        roadmap = Roadmap.from_text(roadmap)
+
+    lines = [(BODY, ln, 0) for ln in _header_lines(output_title, client_name, generated_on)]
+    if roadmap.title:
+        lines += [(BODY, "", 0), (HEADING, roadmap.title, 0)]
+    if roadmap.summary:
+        lines += [(BODY, "", 0)] + [(BODY, ln, 0) for ln in _wrap_lines(roadmap.summary, width_chars=95)]
+    for phase in roadmap.phases:
+        lines += [(BODY, "", 0), (HEADING, phase.title, 0)]
+        if phase.goal:
+            lines += [(BODY, ln, 0) for ln in _wrap_lines(f"Goal: {phase.goal}", width_chars=95)]
+        lines += _bullet_lines(phase.actions)
+        if phase.tips:
+            lines.append((BODY, "Tips:", 0))
+            lines += _bullet_lines(phase.tips)
+    if roadmap.closing:
+        lines += [(BODY, "", 0)] + [(BODY, ln, 0) for ln in _wrap_lines(roadmap.closing, width_chars=95)]
+    return _render_letterhead_pages(lines, template_path)
+
+
+def generate_roadmap_pdf_with_letterhead(
+    roadmap_text: Union[str, Roadmap],
+    *,
+    output_title: str = "Perpetual Life Planner Roadmap",
+    client_name: Optional[str] = None,
+    template_path: str = DEFAULT_TEMPLATE_PATH,
+    generated_on: Optional[date] = None,
+) -> bytes:
+    """
+    Creates a PDF where each page uses the provided letterhead PDF as a background,
+    and the roadmap (text or a structured Roadmap) is drawn on top of it. The
+    header shows the generation time, or just generated_on when given.
+
+    Returns: PDF bytes
+    """
+    out = io.BytesIO()
+    write_roadmap_pdf_with_letterhead(
+        out,
+        roadmap_text,
+        output_title=output_title,
+        client_name=client_name,
+        template_path=template_path,
+        generated_on=generated_on,
+    )
+    return out.getvalue()
+
+
+def write_roadmap_pdf_with_letterhead(
+    stream: BinaryIO,
+    roadmap_text: Union[str, Roadmap],
+    *,
+    output_title: str = "Perpetual Life Planner Roadmap",
+    client_name: Optional[str] = None,
+    template_path: str = DEFAULT_TEMPLATE_PATH,
+    generated_on: Optional[date] = None,
+) -> None:
+    """
+    Same document as generate_roadmap_pdf_with_letterhead, written straight to
+    `stream` (anything with write/tell/flush) instead of being returned, so
+    callers can stream it without holding extra copies of the whole PDF.
+    """
+    writer = _build_roadmap_writer(roadmap_text, output_title, client_name, template_path, generated_on)
+    writer.write(stream)
+
+
+def _build_tax_analysis_writer(
+    analysis: dict,
+    output_title: str,
+    client_name: Optional[str],
+    template_path: str,
+) -> PdfWriter:
+    """
+    Lays out a tax analysis (category -> {question: answer}, as returned by
+    tax_analysis.get_tax_analysis) on letterhead pages.
+    """
+    lines = [(BODY, ln, 0) for ln in _header_lines(output_title, client_name)]
+    for category, details in analysis.items():
+        lines.append((BODY, "", 0))
+        lines.append((HEADING, f"{category}:", 0))
+        for key, value in details.items():
+            answer = str(value).strip() if value is not None else ""
+            wrapped = _wrap_lines(f"{key}: {answer or 'Not provided'}", width_chars=88)
+            lines.append((BODY, wrapped[0], 12))
+            # Continuation lines hang under the answer
+            lines.extend((BODY, ln, 24) for ln in wrapped[1:])
+    return _render_letterhead_pages(lines, template_path)
+
+
+def _tax_analysis_client_name(analysis: dict) -> Optional[str]:
+    name = (analysis.get("Personal Information") or {}).get("Full Name")
+    if name is None:
+        return None
+    return str(name).strip() or None
+
+
+def write_tax_analysis_pdf_with_letterhead(
+    stream: BinaryIO,
+    analysis: dict,
+    *,
+    output_title: str = "TaxNerdGPT Tax Analysis",
+    client_name: Optional[str] = None,
+    template_path: str = DEFAULT_TEMPLATE_PATH,
+) -> None:
+    """
+    Writes a letterhead PDF of the tax analysis questionnaire to `stream`.
+    client_name defaults to the analysis' Full Name.
+    """
+    writer = _build_tax_analysis_writer(
+        analysis,
+        output_title,
+        client_name or _tax_analysis_client_name(analysis),
+        template_path,
+    )
+    writer.write(stream)
+
+
+def generate_tax_analysis_pdf_with_letterhead(
+    analysis: dict,
+    *,
+    output_title: str = "TaxNerdGPT Tax Analysis",
+    client_name: Optional[str] = None,
+    template_path: str = DEFAULT_TEMPLATE_PATH,
+) -> bytes:
+    """
+    Same document as write_tax_analysis_pdf_with_letterhead, returned as bytes.
+    """
     out = io.BytesIO()
-    writer.write(out)
+    write_tax_analysis_pdf_with_letterhead(
+        out,
+        analysis,
+        output_title=output_title,
+        client_name=client_name,
+        template_path=template_path,
+    )
     return out.getvalue()
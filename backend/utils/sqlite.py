@@ -0,0 +1,25 @@
+import sqlite3
+from contextlib import contextmanager
+
+
+@contextmanager
+def connect(path):
+    """
+    Short-lived SQLite connection for one unit of work.
+
+    Connections are cheap, so callers open one per operation instead of
+    sharing a connection across threads. WAL lets readers (status polling)
+    run while a background worker writes.
+    """
+    conn = sqlite3.connect(path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        yield conn
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()